@@ -1,15 +1,25 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Blueprint, request, jsonify, send_file, Response
 from flask_cors import CORS
 import pandas as pd
 import os
 import io
 import json
+import threading
 
 # استيراد الوحدات الأساسية للنظام
 from src.loader import DataLoader
-from src.distributor import Distributor
-from src.exporter import Exporter
 from src.config_manager import ConfigManager # تم إضافة مدير الإعدادات
+from src.upload_cache import UploadCache
+from src.upload_store import UploadStore
+from src.run_store import RunStore
+from src.run_db import RunDatabase
+from src.run_diff import RunDiff
+from src.exporter import Exporter
+from src.pipeline import normalize_quotas, run_distribution
+from src.jobs import JobManager
+from src.scenarios import run_scenarios
+from src.memory import MemoryWindow, frame_memory_bytes
+from src.metrics import StageTimer, registry as metrics_registry
 
 """
 -----------------------------------------------------------
@@ -17,12 +27,26 @@ Main Application Module (app.py)
 
 هذا الملف هو نقطة الدخول (Entry Point) للخادم الخلفي (Backend Server).
 يقوم بتهيئة تطبيق Flask وتعريف الـ Routes الخاصة بالواجهة البرمجية (API).
+
+- الـ Routes معرفة على Blueprint (api)، والتطبيق يُنشأ عبر create_app (Application Factory).
+- التشغيل للتطوير: python app.py (خادم Flask المدمج).
+- التشغيل للإنتاج: gunicorn -c gunicorn.conf.py wsgi:app (عدة عمليات بعدة خيوط، انظر wsgi.py).
+
+الحالة المشتركة بين العمليات (Workers) على القرص، والذاكرة لكل عملية نسخة مؤقتة منها فقط:
+- الملفات المرفوعة (token): UploadStore باسم البصمة، والجداول المحللة في UploadCache.
+- عمليات التوزيع (run_id): RunDatabase (المصدر ورقم النسخة)، والنسخة الكاملة في RunStore
+  تُعاد بناؤها في أي عامل لا يحملها أو يحمل نسخة أقدم (get_run).
+- المهام (job_id): حالتها في RunDatabase.
+- مقاييس /metrics فقط خاصة بكل عملية.
+
+الملفات متعددة الأوراق (ورقة طلبة لكل كلية): /scan تعيد أسماء أوراق الطلبة (sheets)، وكل ورقة
+توزيع مستقل بطلب /distribute (أو /jobs) مع الحقل sheet، ثم /runs/export?run_id=...&run_id=...
+يجمع نتائجها في ملف واحد بورقة لكل كلية (نفس ملف batch.py --sheets).
 -----------------------------------------------------------
 """
 
-app = Flask(__name__)
-# تفعيل CORS للسماح للواجهة الأمامية بالوصول إلى الـ API من نطاق مختلف
-CORS(app)
+# مجموعة الـ Routes (تُسجل في التطبيق داخل create_app)
+api = Blueprint('api', __name__)
 
 # تحديد مسارات الملفات الافتراضية للتشغيل والتطوير
 DATA_PATH = os.path.join(os.getcwd(), 'data', 'input data.xlsx')
@@ -31,17 +55,203 @@ CONFIG_PATH = os.path.join(os.getcwd(), 'data', 'config.json')
 # تهيئة مدير الإعدادات
 config_manager = ConfigManager(CONFIG_PATH)
 
-@app.route('/scan', methods=['POST'])
+# ذاكرة الملفات المحللة (بين /scan و /distribute)
+upload_cache = UploadCache()
+
+# الملفات المرفوعة على القرص (مشتركة بين العمليات، لإعادة تحليلها في عامل آخر)
+UPLOADS_PATH = os.environ.get('SSDS_UPLOADS_DIR') or os.path.join(os.getcwd(), 'data', 'uploads')
+upload_store = UploadStore(UPLOADS_PATH)
+
+# مخزن عمليات التوزيع (لخدمة ملفات النتائج بعد انتهاء الطلب)
+run_store = RunStore()
+
+# قاعدة بيانات العمليات (SQLite) للاستعلام عن قبول طالب والبحث بالاسم، مشتركة بين العمال
+RUNS_DB_PATH = os.environ.get('SSDS_RUNS_DB') or os.path.join(os.getcwd(), 'data', 'runs.sqlite3')
+run_db = RunDatabase(RUNS_DB_PATH)
+
+# مدير المهام غير المتزامنة (Thread Pool محدود داخل نفس العملية، وحالتها في قاعدة البيانات)
+job_manager = JobManager(store=run_db)
+
+# إعادة بناء العمليات من قاعدة البيانات (واحدة في كل مرة لكل عامل)
+_rebuild_lock = threading.Lock()
+
+def load_upload_bytes(content, filename=None, sheet=None):
+    """
+    تحميل محتوى ملف مرفوع (bytes) مع الاستفادة من ذاكرة الملفات المحللة.
+
+    يتم حساب بصمة المحتوى (SHA-256)، فإذا سبق تحليل نفس الملف تُعاد النتيجة مباشرة
+    دون قراءة الإكسل مرة أخرى. القراءة تتم من الذاكرة مباشرة دون ملفات مؤقتة على القرص،
+    لذا لا تتعارض الطلبات المتزامنة فيما بينها. المحتوى يُحفظ أيضاً في UploadStore باسم البصمة
+    ليستخدمه أي عامل آخر. sheet: ورقة الطلبة في ملف إكسل متعدد الأوراق (الافتراضي الأولى).
+
+    Returns:
+        tuple: (token, original_df, processed_df)
+    """
+    token = UploadCache.make_token(content)
+    upload_store.save(token, content, filename)
+
+    key = UploadCache.make_key(token, sheet)
+    cached = upload_cache.get(key)
+    if cached is not None:
+        return (token,) + cached
+
+    # استخدام Loader لقراءة البيانات من الذاكرة (الصيغة تُحدد من اسم الملف أو محتواه)
+    loader = DataLoader(content, filename=filename, sheet=sheet)
+    original_df, processed_df = loader.load()
+    upload_cache.put(key, original_df, processed_df)
+    return token, original_df, processed_df
+
+def read_distribution_params(form):
+    """
+    استلام إعدادات التوزيع من الطلب (Request Parameters)
+
+    Returns:
+        tuple: (mode, distributor_input, active_quotas)
+    """
+    # الوضع: 'EQUAL' (توزيع متساوي) أو 'MANUAL' (يدوي)
+    mode = form.get('mode', 'EQUAL')
+    
+    # المدخلات الإضافية بناءً على الوضع
+    total_capacity = form.get('total_capacity') # للوضع المتساوي
+    
+    # في الوضع اليدوي، نفضل استخدام القيم المحفوظة في ConfigManager إذا لم يرسلها المستخدم صراحة
+    capacities_str = form.get('capacities')     # للوضع اليدوي (JSON string - اختياري اذا اردنا تجاوز المحفوظ)
+    quotas_str = form.get('quotas')             # نسب القبول (اختياري)
+    
+    userInputCapacities = json.loads(capacities_str) if capacities_str else None
+    userInputQuotas = json.loads(quotas_str) if quotas_str else None
+
+    # استخدام النسب المحفوظة إذا لم يرسل المستخدم قيماً جديدة
+    active_quotas = normalize_quotas(userInputQuotas if userInputQuotas else config_manager.get_quotas())
+    
+    # تجهيز مدخلات الموزع
+    distributor_input = None
+    if mode == 'MANUAL':
+        # الأولوية: 1. المدخلات المباشرة 2. القيم المحفوظة في الإعدادات
+        distributor_input = userInputCapacities if userInputCapacities else config_manager.get_manual_capacities_dict()
+    elif mode == 'EQUAL':
+        distributor_input = int(total_capacity) if total_capacity else 0
+
+    return mode, distributor_input, active_quotas
+
+def read_upload_source():
+    """
+    استلام مصدر البيانات من الطلب: ملف مرفوع أو token من /scan
+    (مع الحقل الاختياري sheet لورقة الطلبة، يُقرأ بـ read_upload_sheet).
+
+    Returns:
+        tuple: (content, filename, token, error_response)
+    """
+    token = request.form.get('token')
+    if 'file' not in request.files and not token:
+        return None, None, None, (jsonify({"status": "error", "message": "No file uploaded"}), 400)
+
+    file = request.files.get('file')
+    if file is not None:
+        if file.filename == '':
+            return None, None, None, (jsonify({"status": "error", "message": "No file selected"}), 400)
+        return file.read(), file.filename, None, None
+
+    if UploadCache.make_key(token, read_upload_sheet()) not in upload_cache and token not in upload_store:
+        # انتهت صلاحية البصمة (حُذفت من الذاكرة ومن القرص)، على الواجهة إعادة رفع الملف
+        return None, None, None, (jsonify({"status": "error", "message": "Upload token expired, please upload the file again"}), 410)
+    return None, None, token, None
+
+def read_upload_sheet():
+    """اسم ورقة الطلبة المطلوبة من الطلب (الحقل sheet)، أو None للورقة الأولى."""
+    sheet = (request.form.get('sheet') or '').strip()
+    return sheet or None
+
+def load_upload_source(content, filename, token, sheet=None):
+    """
+    تحميل البيانات من محتوى الملف، أو من الذاكرة المؤقتة (token)، أو من UploadStore
+    إذا كان الملف قد رُفع إلى عامل آخر.
+
+    Returns:
+        tuple: (token, original_df, processed_df)
+    """
+    if content is not None:
+        return load_upload_bytes(content, filename, sheet)
+
+    cached = upload_cache.get(UploadCache.make_key(token, sheet))
+    if cached is not None:
+        return (token,) + cached
+
+    stored = upload_store.load(token)
+    if stored is None:
+        raise LookupError("Upload token expired, please upload the file again")
+    return load_upload_bytes(*stored, sheet)
+
+def run_source(token, mode, capacity_input, quotas, sheet=None):
+    """مصدر عملية التوزيع (يُحفظ معها لإعادة بنائها في عامل آخر)."""
+    return {"token": token, "sheet": sheet, "mode": mode, "capacity_input": capacity_input, "quotas": quotas}
+
+def get_run(run_id):
+    """
+    عملية توزيع بمعرفها، صالحة في أي عامل (Worker).
+
+    النسخة في ذاكرة هذا العامل تُستخدم إذا كان رقم نسختها هو المحفوظ في قاعدة البيانات.
+    وإلا (العملية أُنشئت في عامل آخر، أو أُعيد توزيعها فيه) تُعاد بناؤها: تحميل الملف من UploadStore
+    والتوزيع بالإعدادات المحفوظة، وهو يطابق نتيجة التوزيع وإعادات التوزيع التزايدية عليه.
+
+    Returns:
+        DistributionRun أو None إذا لم توجد العملية (أو حُذف ملفها).
+    """
+    run = run_store.get(run_id)
+    stored = run_db.run_source(run_id)
+    if stored is None:
+        # غير محفوظة (فشل الحفظ، أو حُذفت من قاعدة البيانات): النسخة المحلية فقط إن وجدت
+        return run
+    source, version, created_at = stored
+    if source is None or (run is not None and run.version == version):
+        return run
+
+    with _rebuild_lock:
+        run = run_store.get(run_id)
+        if run is not None and run.version == version:
+            return run
+        try:
+            _, original_df, processed_df = load_upload_source(None, None, source['token'], source.get('sheet'))
+        except LookupError:
+            return None
+        run = run_distribution(original_df, processed_df, source['mode'], source['capacity_input'], source['quotas'])
+        run.run_id = run_id
+        run.created_at = created_at
+        run.source = source
+        run.version = version
+        run_store.add(run)
+        return run
+
+def timed_response(endpoint, timer, payload, rows=0, bytes_in=0):
+    """
+    بناء استجابة JSON مع حقل timings (زمن كل مرحلة بالمللي ثانية)،
+    وتسجيل الطلب (المراحل، الصفوف، البايتات) في مقاييس /metrics.
+    """
+    if timer.enabled:
+        payload["timings"] = timer.to_dict()
+    with timer.stage('serialize'):
+        response = jsonify(payload)
+    bytes_out = len(response.get_data()) if metrics_registry.enabled else 0
+    metrics_registry.record_request(endpoint, timer, rows=rows, bytes_in=bytes_in, bytes_out=bytes_out)
+    return response
+
+@api.route('/scan', methods=['POST'])
 def scan_file():
     """
     نقطة فحص الملف (/scan)
     
-    الهدف: استقبال ملف الإكسل المرفوع من المستخدم، قراءته، واستخراج المعلومات الأساسية منه
+    الهدف: استقبال ملف الطلبة المرفوع (Excel / CSV / Parquet / Arrow)، قراءته، واستخراج المعلومات الأساسية منه
     لعرضها في الواجهة الأمامية قبل بدء التوزيع (مثل عدد الطلاب، قائمة الأقسام المتاحة).
     
+    Form:
+        sheet (اختياري): ورقة الطلبة المطلوبة في ملف إكسل متعدد الأوراق (الافتراضي الأولى).
+
     Returns:
-        JSON: {status, student_count, departments}
+        JSON: {status, token, student_count, departments, sheets}
+        token: بصمة الملف، يمكن إرسالها إلى /distribute بدلاً من إعادة رفع الملف.
+        sheets: أسماء أوراق الطلبة في ملف الإكسل (فارغة للصيغ الأخرى)، لتوزيع كل ورقة بطلب مستقل.
     """
+    timer = StageTimer()
     try:
         if 'file' not in request.files:
             return jsonify({"status": "error", "message": "No file uploaded"}), 400
@@ -50,163 +260,474 @@ def scan_file():
         if file.filename == '':
             return jsonify({"status": "error", "message": "No file selected"}), 400
 
-        # حفظ الملف مؤقتاً للمعالجة
-        temp_path = os.path.join("data", "temp_scan.xlsx")
-        # التأكد من وجود المجلد
-        os.makedirs("data", exist_ok=True)
-        file.save(temp_path)
-
-        # استخدام Loader لقراءة البيانات
-        loader = DataLoader(temp_path)
-        _, processed_df = loader.load()
+        # قراءة الملف (أو استرجاعه من الذاكرة إذا سبق تحليله)
+        with timer.stage('read_upload'):
+            content = file.read()
+        with timer.stage('load'):
+            token, _, processed_df = load_upload_bytes(content, file.filename, read_upload_sheet())
+            # أوراق الطلبة (من ترويسة كل ورقة فقط)
+            sheets = DataLoader(content, filename=file.filename).student_sheets()
         
-        # استخراج الأقسام الفريدة من جميع أعمدة الرغبات
-        choices = pd.concat([processed_df['choice_1'], processed_df['choice_2'], processed_df['choice_3']]).dropna().unique()
-        unique_depts = sorted([d for d in choices if str(d).strip() != ''])
+        # استخراج الأقسام الفريدة من جميع أعمدة الرغبات (من قاموس الأعمدة الفئوية)
+        with timer.stage('departments'):
+            unique_depts = DataLoader.get_departments(processed_df)
         
-        return jsonify({
+        return timed_response('scan', timer, {
             "status": "success",
+            "token": token,
             "student_count": len(processed_df),
-            "departments": unique_depts
-        })
+            "departments": unique_depts,
+            "sheets": sheets
+        }, rows=len(processed_df), bytes_in=len(content))
 
     except Exception as e:
+        metrics_registry.record_request('scan', timer, status='error')
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/distribute', methods=['POST'])
+@api.route('/distribute', methods=['POST'])
 def distribute():
     """
     نقطة أجراء التوزيع (/distribute)
     
     الهدف: تنفيذ عملية التوزيع الكاملة.
-    تستقبل: الملق، وضع التوزيع (EQUAL/MANUAL)، والسعات المحددة.
-    تعيد: ملف إكسل يحتوي على النتائج النهائية.
+    تستقبل: الملف (أو token من /scan)، وضع التوزيع (EQUAL/MANUAL)، والسعات المحددة،
+    واسم ورقة الطلبة (sheet) اختيارياً للملفات متعددة الأوراق.
+    تعيد: الإحصائيات ومعرف العملية (run_id)، وملف الإكسل يُحمل من /runs/<run_id>/export.
     """
+    timer = StageTimer()
     try:
         # 1. استلام الملف (File Handing)
-        if 'file' not in request.files:
-            return jsonify({"status": "error", "message": "No file uploaded"}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"status": "error", "message": "No file selected"}), 400
+        # يمكن إرسال token الناتج عن /scan بدلاً من الملف
+        with timer.stage('read_upload'):
+            content, filename, token, error = read_upload_source()
+        if error:
+            return error
 
         # 2. استلام الإعدادات (Request Parameters)
-        # الوضع: 'EQUAL' (توزيع متساوي) أو 'MANUAL' (يدوي)
-        mode = request.form.get('mode', 'EQUAL')
-        
-        # المدخلات الإضافية بناءً على الوضع
-        total_capacity = request.form.get('total_capacity') # للوضع المتساوي
-        
-        # في الوضع اليدوي، نفضل استخدام القيم المحفوظة في ConfigManager إذا لم يرسلها المستخدم صراحة
-        # ولكن للتكامل، سنفترض أن التوزيع يستخدم الإعدادات المحفوظة إذا كان الوضع MANUAL
-        
-        capacities_str = request.form.get('capacities')     # للوضع اليدوي (JSON string - اختياري اذا اردنا تجاوز المحفوظ)
-        quotas_str = request.form.get('quotas')             # نسب القبول (اختياري)
-        
-        userInputCapacities = json.loads(capacities_str) if capacities_str else None
-        userInputQuotas = json.loads(quotas_str) if quotas_str else None
-
-        # استخدام النسب المحفوظة إذا لم يرسل المستخدم قيماً جديدة
-        active_quotas = userInputQuotas if userInputQuotas else config_manager.get_quotas()
-
-        # Normalize Quotas if provided (or strictly check saved ones)
-        if active_quotas:
-            normalized_quotas = {}
-            for k, v in active_quotas.items():
-                val = float(v)
-                if val > 1.0: val = val / 100.0
-                normalized_quotas[k] = val
-            active_quotas = normalized_quotas
-        
-        # تجهيز مدخلات الموزع
-        distributor_input = None
-        if mode == 'MANUAL':
-            # الأولوية: 1. المدخلات المباشرة 2. القيم المحفوظة في الإعدادات
-            distributor_input = userInputCapacities if userInputCapacities else config_manager.get_manual_capacities_dict()
-        elif mode == 'EQUAL':
-            distributor_input = int(total_capacity) if total_capacity else 0
-
-        # 3. تحميل البيانات (Data Loading)
-        temp_path = os.path.join("data", "temp_upload.xlsx")
-        os.makedirs("data", exist_ok=True)
-        file.save(temp_path)
-
-        loader = DataLoader(temp_path)
-        original_df, processed_df = loader.load()
-        
-        # 4. تنفيذ التوزيع (Core Logic Execution)
-        # نقوم بإنشاء كائن الموزع وتمرير البيانات ونسب القبول النشطة
-        distributor = Distributor(processed_df, {}, active_quotas)
-        
-        # أولاً: حساب السعات
-        distributor.calculate_capacities(mode, distributor_input)
-        
-        # ثانياً: إجراء التوزيع
-        results = distributor.distribute()
-
-        # معالجة تنسيق الأرقام (تقريب المعدل)
-        # نحاول تقريب العمود في البيانات الأصلية قبل التصدير
-        cols_to_round = [c for c in original_df.columns if 'معدل' in str(c) or 'Average' in str(c)]
-        for col in cols_to_round:
-            original_df[col] = pd.to_numeric(original_df[col], errors='coerce').fillna(0)
-            original_df[col] = original_df[col].apply(lambda x: round(x, 2) if isinstance(x, (int, float)) else x)
-        
-        # 5. توليد ملف النتائج (Excel Generation)
-        # استخدام الكلاس المطور Exporter لإنشاء ملف إكسل منسق احترافياً
-        output = Exporter.export_to_buffer(original_df, results)
-        
-        # تحويل الملف إلى Base64 لإرساله مع الـ JSON
-        import base64
-        file_b64 = base64.b64encode(output.getvalue()).decode('utf-8')
-
-        # 6. تحضير البيانات للإرجاع (JSON Response)
-        # دمج النتائج مع البيانات الأصلية للعرض
-        output_df = original_df.copy()
-        output_df['القسم المقبول'] = output_df['ت'].map(results)
-        output_df['القسم المقبول'] = output_df['القسم المقبول'].fillna('غير مقبول')
-        
-        # تحويل البيانات إلى قائمة من القواميس
-        final_data = output_df.fillna('').to_dict(orient='records')
-        
-        # 7. إحصائيات سريعة
-        assigned_count = len([v for v in results.values() if v])
-        total_count = len(processed_df)
-        unassigned_count = total_count - assigned_count
+        mode, distributor_input, active_quotas = read_distribution_params(request.form)
+        sheet = read_upload_sheet()
+
+        # قياس ذروة الذاكرة لهذا الطلب (من بداية التحميل)
+        with MemoryWindow() as memory:
+            # 3. تحميل البيانات (Data Loading)
+            with timer.stage('load'):
+                token, original_df, processed_df = load_upload_source(content, filename, token, sheet)
+
+            # 4. تنفيذ التوزيع (Core Logic Execution)
+            # حساب السعات، التوزيع، تقريب المعدلات والإحصائيات (كل مرحلة تُسجل في المؤقت)
+            run = run_distribution(original_df, processed_df, mode, distributor_input, active_quotas, timer=timer)
+            run.source = run_source(token, mode, distributor_input, active_quotas, sheet)
+
+            # 5. حفظ العملية (Run) لخدمة النتائج لاحقاً:
+            # - صفحات الجدول عبر /runs/<run_id>/results
+            # - ملف الإكسل عبر /runs/<run_id>/export (يُنشأ عند أول طلب تحميل)
+            # - قبول طالب والبحث بالاسم عبر /runs/<run_id>/students (قاعدة البيانات، تُكتب في الخلفية)
+            # - أي عامل آخر يعيد بناءها من مصدرها المحفوظ في قاعدة البيانات (get_run)
+            run_store.add(run)
+            with timer.stage('persist'):
+                run_db.save(run)
         
+        input_bytes = len(content) if content is not None else None
+        return timed_response('distribute', timer, {
+            "status": "success",
+            "run_id": run.run_id,
+            "capacity_plan": run.capacity_plan,
+            "stats": run.stats,
+            "memory": memory.report(input_bytes, frame_memory_bytes(original_df))
+        }, rows=len(processed_df), bytes_in=input_bytes or 0)
+
+    except Exception as e:
+        # في حال حدوث أي خطأ غير متوقع، نعيد رسالة خطأ واضحة
+        metrics_registry.record_request('distribute', timer, status='error')
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/scenarios', methods=['POST'])
+def scenarios():
+    """
+    مقارنة سيناريوهات التوزيع (/scenarios)
+
+    تستقبل ملفاً واحداً (أو token من /scan) وقائمة إعدادات في الحقل 'scenarios' (JSON)،
+    مثل: [{"name": "...", "mode": "EQUAL", "total_capacity": 300, "quotas": {...}}, ...]
+    ويتم تشغيل كل سيناريو بالتوازي على نفس البيانات المحللة.
+
+    Returns:
+        JSON: {status, scenarios: [{name, assigned, unassigned, channels, departments}, ...], timings}
+    """
+    timer = StageTimer()
+    try:
+        with timer.stage('read_upload'):
+            content, filename, token, error = read_upload_source()
+        if error:
+            return error
+
+        configs = json.loads(request.form.get('scenarios') or '[]')
+        if not isinstance(configs, list) or not configs:
+            return jsonify({"status": "error", "message": "No scenarios provided"}), 400
+
+        with timer.stage('load'):
+            _, _, processed_df = load_upload_source(content, filename, token, read_upload_sheet())
+        with timer.stage('scenarios'):
+            summaries = run_scenarios(processed_df, configs)
+
+        return timed_response('scenarios', timer, {
+            "status": "success",
+            "scenarios": summaries
+        }, rows=len(processed_df), bytes_in=len(content) if content is not None else 0)
+
+    except Exception as e:
+        metrics_registry.record_request('scenarios', timer, status='error')
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    إنشاء مهمة توزيع غير متزامنة (/jobs)
+
+    تستقبل نفس مدخلات /distribute، لكنها تعيد معرف المهمة فوراً (202)
+    ويتم التحميل والتوزيع والتصدير في الخلفية. التقدم يُستعلم عنه عبر GET /jobs/<job_id>.
+
+    Returns:
+        JSON: {status, job_id}
+    """
+    try:
+        content, filename, token, error = read_upload_source()
+        if error:
+            return error
+        mode, distributor_input, active_quotas = read_distribution_params(request.form)
+        sheet = read_upload_sheet()
+
+        def execute(job):
+            timer = StageTimer()
+            with MemoryWindow() as memory:
+                job.report('load', 0.0)
+                with timer.stage('load'):
+                    upload_token, original_df, processed_df = load_upload_source(content, filename, token, sheet)
+                job.report('load', 1.0)
+
+                run = run_distribution(original_df, processed_df, mode, distributor_input, active_quotas,
+                                       progress=job.report, build_export=True, timer=timer)
+                run.source = run_source(upload_token, mode, distributor_input, active_quotas, sheet)
+                run_store.add(run)
+                with timer.stage('persist'):
+                    run_db.save(run)
+            input_bytes = len(content) if content is not None else None
+            metrics_registry.record_request('jobs', timer, rows=len(processed_df), bytes_in=input_bytes or 0)
+            result = {"stats": run.stats, "capacity_plan": run.capacity_plan,
+                      "memory": memory.report(input_bytes, frame_memory_bytes(original_df))}
+            if timer.enabled:
+                result["timings"] = timer.to_dict()
+            return run.run_id, result
+
+        job = job_manager.submit(execute)
+        return jsonify({"status": "success", "job_id": job.job_id}), 202
+
+    except RuntimeError as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    حالة مهمة توزيع (/jobs/<job_id>)
+    المهمة المنفذة في عامل آخر تُقرأ من قاعدة البيانات (التقدم يُحدث عند بداية كل مرحلة).
+
+    Returns:
+        JSON: {status, job: {job_id, state, stage, percent, run_id, result, error}}
+    """
+    job = job_manager.get_status(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job})
+
+@api.route('/runs/<run_id>/results', methods=['GET'])
+def run_results(run_id):
+    """
+    صفحة من نتائج عملية توزيع (/runs/<run_id>/results)
+
+    Query Params:
+        page, size: رقم الصفحة وحجمها.
+        sort: حقل الترتيب ('average', 'name', 'id', 'dept')، مع '-' للترتيب التنازلي (الافتراضي '-average')،
+              أو 'relevance' للترتيب حسب قرب المطابقة مع name.
+        dept, channel, status: التصفية حسب القسم المقبول، القناة، أو الحالة ('assigned' / 'unassigned').
+        name: البحث بالاسم (مع توحيد الكتابة العربية: الهمزات، ة/ه، ى/ي، التشكيل).
+
+    Returns:
+        JSON: {status, page, size, total, pages, data}
+    """
+    try:
+        run = get_run(run_id)
+        if run is None:
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+
+        result = run.query(
+            page=request.args.get('page', 1, type=int),
+            size=request.args.get('size', 50, type=int),
+            sort=request.args.get('sort'),
+            dept=request.args.get('dept'),
+            channel=request.args.get('channel'),
+            status=request.args.get('status'),
+            name=request.args.get('name')
+        )
+        return jsonify({"status": "success", **result})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/runs/<run_id>/search', methods=['GET'])
+def search_run(run_id):
+    """
+    البحث عن الطلبة بالاسم في عملية توزيع (/runs/<run_id>/search?q=...)
+
+    يستخدم فهرس الأسماء الموحدة للعملية في الذاكرة (يُبنى عند أول بحث)، ويطابق اختلافات الكتابة العربية
+    وأجزاء الكلمات، مرتبة: مطابق تماماً، ثم يبدأ بالنص، ثم بدايات الكلمات، ثم أجزاء الكلمات.
+    نفس البحث متاح من قاعدة البيانات عبر /runs/<run_id>/students?q= (بعد حذف العملية من الذاكرة).
+
+    Query Params:
+        q: نص البحث.
+        limit: عدد النتائج (الافتراضي 20).
+
+    Returns:
+        JSON: {status, run_id, total, matches: [{id, name, average, channel, dept, match}]}
+    """
+    try:
+        run = get_run(run_id)
+        if run is None:
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+
+        result = run.search(request.args.get('q', ''), request.args.get('limit', type=int))
+        return jsonify({"status": "success", "run_id": run_id, **result})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/runs/<run_id>/redistribute', methods=['POST'])
+def redistribute_run(run_id):
+    """
+    إعادة توزيع تزايدية لعملية سابقة (/runs/<run_id>/redistribute)
+
+    تستقبل نفس إعدادات /distribute (الوضع، السعات، النسب) بدون الملف.
+    يُستأنف التوزيع من أول طالب تتأثر نتيجته بالتعديل، ويُعاد فقط الطلبة الذين تغير قبولهم.
+    التعديل يُحفظ قبل الرد، فيراه أي عامل آخر (يعيد بناء العملية بالإعدادات الجديدة).
+
+    Returns:
+        JSON: {status, run_id, changed, changes: [{id, dept}], capacity_plan, stats}
+    """
+    try:
+        run = get_run(run_id)
+        if run is None:
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+
+        mode, distributor_input, active_quotas = read_distribution_params(request.form)
+
+        persist = None
+        if run.source is not None and run_db.run_source(run_id) is not None:
+            # الحفظ بشرط رقم النسخة: إذا أعاد عامل آخر توزيع نفس العملية أولاً يُرفض الطلب (409)
+            # (العملية التي فشل حفظها تبقى في ذاكرة هذا العامل فقط)
+            source = run_source(run.source['token'], mode, distributor_input, active_quotas, run.source.get('sheet'))
+            def persist(changes):
+                version = run_db.update(run, changes, source)
+                run.source = source
+                return version
+        changes = run.redistribute(mode, distributor_input, active_quotas, persist=persist)
+
         return jsonify({
             "status": "success",
-            "data": final_data,
-            "file_b64": file_b64,
-            "file_name": "distribution_result.xlsx",
-            "stats": {
-                "assigned": assigned_count,
-                "unassigned": unassigned_count,
-                "total": total_count
-            }
+            "run_id": run.run_id,
+            "changed": len(changes),
+            "changes": [{"id": student_id, "dept": dept} for student_id, dept in changes.items()],
+            "capacity_plan": run.capacity_plan,
+            "stats": run.stats
         })
+    except RuntimeError as e:
+        return jsonify({"status": "error", "message": str(e)}), 409
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/runs/<run_id>/students/<student_id>', methods=['GET'])
+def run_student(run_id, student_id):
+    """
+    قبول طالب واحد في عملية توزيع (/runs/<run_id>/students/<student_id>)
+
+    الاستعلام من قاعدة البيانات بالمفتاح الأساسي، لذا يعمل لأي عملية محفوظة
+    حتى بعد حذفها من ذاكرة العامل.
 
+    Returns:
+        JSON: {status, run_id, student: {id, name, average, channel, dept, status, choice_rank, is_faculty_child, cutoff}}
+    """
+    try:
+        error = run_db.write_error(run_id)
+        if error is not None:
+            return jsonify({"status": "error", "message": f"Run could not be saved: {error}"}), 500
+        student = run_db.get_student(run_id, student_id)
+        if student is None:
+            message = "Student not found" if run_db.has_run(run_id) else "Run not found"
+            return jsonify({"status": "error", "message": message}), 404
+        return jsonify({"status": "success", "run_id": run_id, "student": student})
     except Exception as e:
-        # في حال حدوث أي خطأ غير متوقع، نعيد رسالة خطأ واضحة
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@api.route('/runs/<run_id>/students', methods=['GET'])
+def search_run_students(run_id):
+    """
+    البحث عن الطلبة بالاسم في عملية توزيع محفوظة (/runs/<run_id>/students?q=...)
+
+    نفس البحث والترتيب في /runs/<run_id>/search (NameIndex)، لكن من قاعدة البيانات:
+    يعمل بعد حذف العملية من الذاكرة، وكل نتيجة سجل كامل (ترتيب الرغبة، الحد الأدنى للقسم).
+
+    Query Params:
+        q: نص البحث (الاسم أو جزء منه).
+        limit: عدد النتائج (الافتراضي 20، بحد أقصى 100).
+
+    Returns:
+        JSON: {status, run_id, count, matches: [{..., match}]}
+    """
+    try:
+        error = run_db.write_error(run_id)
+        if error is not None:
+            return jsonify({"status": "error", "message": f"Run could not be saved: {error}"}), 500
+        if not run_db.has_run(run_id):
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+        matches = run_db.search_names(run_id, request.args.get('q', ''), request.args.get('limit', type=int))
+        return jsonify({"status": "success", "run_id": run_id, "count": len(matches), "matches": matches})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/runs/<run_id>/diff/<other_run_id>', methods=['GET'])
+def diff_runs(run_id, other_run_id):
+    """
+    الفرق بين عمليتي توزيع (/runs/<run_id>/diff/<other_run_id>)
+
+    run_id هي العملية السابقة و other_run_id اللاحقة (مثلاً بعد تعديل السعات أو النسب).
+    تعيد الطلبة الذين قُبلوا أو خرجوا أو انتقلوا بين الأقسام، وحركة كل قسم وتغير حده الأدنى،
+    وتُرسل على دفعات (Streaming).
+
+    Query Params:
+        format: 'json' (الافتراضي) أو 'csv' (جدول التغييرات فقط).
+
+    Returns:
+        JSON: {status, summary: {total, changed, gained, lost, switched, departments}, changes: [...]}
+        أو ملف CSV: id, name, average, before, after, change
+    """
+    try:
+        output_format = request.args.get('format', 'json').lower()
+        if output_format not in ('json', 'csv'):
+            return jsonify({"status": "error", "message": f"Unknown format: {output_format}"}), 400
+
+        before, after = get_run(run_id), get_run(other_run_id)
+        if before is None or after is None:
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+
+        timer = StageTimer()
+        with timer.stage('diff'):
+            diff = RunDiff.from_runs(before, after)
+        metrics_registry.record_request('diff', timer, rows=diff.total)
+
+        if output_format == 'csv':
+            return Response(
+                diff.iter_csv(),
+                mimetype='text/csv',
+                headers={"Content-Disposition": f"attachment; filename=diff_{run_id}_{other_run_id}.csv"}
+            )
+        return Response(diff.iter_json(), mimetype='application/json')
+    except Exception as e:
+        metrics_registry.record_request('diff', status='error')
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/runs/<run_id>/export', methods=['GET'])
+def export_run(run_id):
+    """
+    تحميل ملف نتائج عملية توزيع (/runs/<run_id>/export)
+
+    الملف يُبنى عند أول طلب (بالكتابة المتدفقة) ثم يُحفظ، ويُرسل كملف ثنائي مباشرة
+    بدلاً من ترميزه Base64 داخل استجابة JSON.
+    """
+    try:
+        run = get_run(run_id)
+        if run is None:
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+
+        timer = StageTimer()
+        with timer.stage('export'):
+            content = run.get_export()
+        metrics_registry.record_request('export', timer, bytes_out=len(content))
+
+        return send_file(
+            io.BytesIO(content),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name='distribution_result.xlsx'
+        )
+    except Exception as e:
+        metrics_registry.record_request('export', status='error')
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/runs/export', methods=['GET'])
+def export_runs():
+    """
+    تحميل نتائج عدة عمليات توزيع في ملف واحد (/runs/export?run_id=...&run_id=...)
+
+    لملف متعدد الأوراق: عملية لكل ورقة (/distribute مع sheet)، وهنا ورقة نتائج لكل عملية باسم ورقتها
+    (أو معرفها) بالترتيب المرسل، ثم أوراق خطط المقاعد (Exporter.export_sheets).
+    """
+    try:
+        run_ids = request.args.getlist('run_id')
+        if not run_ids:
+            return jsonify({"status": "error", "message": "No runs selected"}), 400
+
+        runs = [get_run(run_id) for run_id in run_ids]
+        if any(run is None for run in runs):
+            return jsonify({"status": "error", "message": "Run not found"}), 404
+
+        timer = StageTimer()
+        with timer.stage('export'):
+            content = Exporter.export_sheets([
+                ((run.source or {}).get('sheet') or run.run_id, run.original_df, run.results, run.capacity_plan)
+                for run in runs
+            ]).getvalue()
+        metrics_registry.record_request('export', timer, bytes_out=len(content))
+
+        return send_file(
+            io.BytesIO(content),
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name='distribution_result.xlsx'
+        )
+    except Exception as e:
+        metrics_registry.record_request('export', status='error')
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    مقاييس التشغيل بصيغة Prometheus (/metrics)
+
+    عدد الطلبات وحالتها، الصفوف المعالجة، البايتات الداخلة والخارجة،
+    وتوزيع زمن كل مرحلة (التحميل، الترتيب، دورات التوزيع، التصدير، تحويل JSON).
+    تُعطل بمتغير البيئة SSDS_METRICS=0.
+    المقاييس خاصة بالعامل (Worker) الذي يرد على الطلب، وليست مجموع جميع العمال.
+    """
+    if not metrics_registry.enabled:
+        return jsonify({"status": "error", "message": "Metrics are disabled"}), 404
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
 # ---------------------------------------------------------
 # نقاط اتصال الإعدادات (Configuration Endpoints)
 # ---------------------------------------------------------
 
-@app.route('/config', methods=['GET'])
+@api.route('/config', methods=['GET'])
 def get_config():
     """
     استرجاع الإعدادات الحالية.
     """
     try:
-        # نقوم بإعادة تحميل أحدث نسخة من الملف للتأكد
-        config = config_manager._load_config() 
+        # النسخة المخزنة في الذاكرة (يُعاد تحميلها تلقائياً إذا تغير الملف)
+        config = config_manager.get_config()
         return jsonify({"status": "success", "data": config})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
-@app.route('/config', methods=['POST'])
+@api.route('/config', methods=['POST'])
 def update_config():
     """
     تحديث الإعدادات وحفظها.
@@ -217,23 +738,49 @@ def update_config():
         if not data:
             return jsonify({"status": "error", "message": "No data provided"}), 400
             
-        if 'quotas' in data:
-            config_manager.set_quotas(data['quotas'])
-            
-        if 'departments' in data:
-            config_manager.update_departments(data['departments'])
+        # جميع التعديلات تُحفظ بكتابة واحدة ذرية في نهاية الدفعة
+        with config_manager.batch():
+            if 'quotas' in data:
+                config_manager.set_quotas(data['quotas'])
+                
+            if 'departments' in data:
+                config_manager.update_departments(data['departments'])
 
-        if 'total_capacity' in data:
-            config_manager.set_total_capacity(data['total_capacity'])
+            if 'total_capacity' in data:
+                config_manager.set_total_capacity(data['total_capacity'])
 
-        if 'manual_mode' in data:
-            config_manager.set_manual_mode(data['manual_mode'])
+            if 'manual_mode' in data:
+                config_manager.set_manual_mode(data['manual_mode'])
             
         return jsonify({"status": "success", "message": "Configuration saved"})
         
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def create_app(config=None):
+    """
+    إنشاء تطبيق Flask (Application Factory)
+
+    الخدمات (الإعدادات، ذاكرة الملفات، مخزن العمليات، المهام) على مستوى الوحدة،
+    أي واحدة لكل عملية: في وضع الإنتاج يحصل كل عامل (Worker) على نسخته بعد التفرع (Fork)،
+    والحالة المشتركة بينها على القرص (انظر وصف الوحدة).
+
+    Args:
+        config (dict, optional): إعدادات Flask إضافية (مثل MAX_CONTENT_LENGTH).
+
+    Returns:
+        Flask
+    """
+    app = Flask(__name__)
+    if config:
+        app.config.update(config)
+    # تفعيل CORS للسماح للواجهة الأمامية بالوصول إلى الـ API من نطاق مختلف
+    CORS(app)
+    app.register_blueprint(api)
+    return app
+
+app = create_app()
+
 if __name__ == '__main__':
     # تشغيل الخادم في وضع التطوير
     app.run(debug=True, port=5000)
@@ -0,0 +1,304 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.loader import DataLoader
+from src.config_manager import ConfigManager
+from src.exporter import Exporter
+from src.metrics import StageTimer
+from src.multi_sheet import distribute_sheets
+from src.pipeline import normalize_quotas, round_averages, run_distribution
+
+"""
+-----------------------------------------------------------
+Batch Runner (batch.py)
+
+تشغيل التوزيع لعدة ملفات (ملف لكل كلية) من سطر الأوامر دون Flask، بالتوازي على عدة عمليات
+(Process Pool)، بنفس مراحل التطبيق: DataLoader.load، ثم النسب والسعات من ConfigManager،
+ثم Distributor (عبر run_distribution)، ثم تصدير ملف النتائج.
+
+لكل ملف إدخال يُكتب:
+    <الاسم>_distribution.xlsx   ملف النتائج (نفس تنسيق التصدير في التطبيق)
+    <الاسم>_summary.json        الإحصائيات، خطة المقاعد، الإعدادات المستخدمة، وزمن كل مرحلة
+وفي النهاية يُطبع الإنتاج الكلي (عدد الصفوف في الثانية).
+
+الملفات متعددة الأوراق (--sheets): كل ورقة طلبة في الملف (كلية) توزيع مستقل بسعاتها الخاصة،
+والأوراق تُوزع بالتوازي (src/multi_sheet.py)، والنتائج تُدمج في ملف واحد بورقة نتائج لكل ورقة إدخال.
+سعات كل ورقة من ورقة Settings: الصفوف التي يحدد عمود Sheet فيها اسم الورقة، إضافة للصفوف العامة.
+
+السعات لكل ملف (بالأولوية):
+    1. --total-capacity: توزيع متساوي (EQUAL) بنفس العدد لكل الملفات.
+    2. ورقة Settings داخل ملف الإكسل (Dept_Name / Capacity): توزيع يدوي خاص بالملف.
+    3. ملف الإعدادات (config.json): الأقسام اليدوية إذا كان الوضع اليدوي مفعلاً، وإلا total_capacity.
+
+الاستخدام (من مجلد backend):
+    python batch.py inputs/ --out results/
+    python batch.py "inputs/*.xlsx" other/college.csv --out results/ --workers 4
+    python batch.py university.xlsx --sheets --out results/
+-----------------------------------------------------------
+"""
+
+DEFAULT_CONFIG_PATH = os.path.join(os.getcwd(), 'data', 'config.json')
+
+def collect_inputs(patterns):
+    """
+    جمع ملفات الإدخال من مسارات ملفات أو مجلدات أو أنماط glob، بالصيغ التي يدعمها DataLoader.
+
+    Returns:
+        list: مسارات الملفات (مرتبة، بدون تكرار).
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern) or [pattern]
+        for path in candidates:
+            name = os.path.basename(path)
+            # تجاهل ملفات القفل المؤقتة التي ينشئها Excel (~$name.xlsx)
+            if name.startswith('~$') or not os.path.isfile(path):
+                continue
+            if os.path.splitext(name)[1].lower() in DataLoader.FORMAT_EXTENSIONS:
+                paths.append(os.path.abspath(path))
+    return sorted(set(paths))
+
+def output_names(paths):
+    """اسم أساسي لملفات المخرجات لكل ملف إدخال (يُضاف رقم عند تشابه الأسماء من مجلدات مختلفة)."""
+    names, used = {}, {}
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        used[stem] = used.get(stem, 0) + 1
+        names[path] = stem if used[stem] == 1 else f"{stem}_{used[stem]}"
+    return names
+
+def _settings_department(dept):
+    """
+    اسم القسم من ورقة Settings كقيمة Python (لكتابته في ملف الملخص JSON): 101.0 => 101
+    (عمود Dept_Name فيه خلايا فارغة يُقرأ كأعداد عشرية)، والنصوص كما هي.
+    """
+    if isinstance(dept, np.generic):
+        dept = dept.item()
+    if isinstance(dept, float) and dept.is_integer():
+        return int(dept)
+    return dept
+
+def resolve_capacity(loader, settings, total_capacity=None, sheet=None):
+    """
+    تحديد وضع التوزيع ومدخل السعة لملف واحد أو لورقة واحدة (انظر ترتيب الأولوية في رأس الملف).
+
+    Returns:
+        tuple: (mode, capacity_input, source)
+    """
+    if total_capacity is not None:
+        return 'EQUAL', total_capacity, 'argument'
+
+    # أسماء الأقسام تبقى كما قُرئت (رقمية مثل 101 إذا كانت كذلك في أعمدة الرغبات أيضاً)،
+    # والصفوف بدون قسم أو سعة تُتجاوز
+    sheet_capacities = {_settings_department(dept): int(cap)
+                        for dept, cap in (loader.get_settings(sheet) or {}).items()
+                        if pd.notna(dept) and str(dept).strip() != '' and pd.notna(cap)}
+    if sheet_capacities:
+        return 'MANUAL', sheet_capacities, 'settings_sheet'
+
+    if settings['manual_mode'] and settings['manual_capacities']:
+        return 'MANUAL', settings['manual_capacities'], 'config'
+    # بدون عدد محدد: مقعد لكل طالب (نفس السلوك الافتراضي للموزع)
+    return 'EQUAL', settings['total_capacity'] or None, 'config'
+
+def process_file(path, out_dir, name, settings, total_capacity=None, fast=False, sheets=False, sheet_workers=1):
+    """
+    توزيع ملف واحد وكتابة ملف النتائج والملخص (يُنفذ داخل عملية من Process Pool).
+
+    Returns:
+        dict: الملخص (نفس محتوى ملف JSON)، أو {input, error} عند الفشل.
+    """
+    started = time.perf_counter()
+    timer = StageTimer(enabled=True)
+    try:
+        if sheets:
+            summary = process_workbook(path, out_dir, name, settings, timer, total_capacity, fast, sheet_workers)
+            summary["seconds"] = round(time.perf_counter() - started, 4)
+            return _write_summary(out_dir, name, summary)
+
+        with timer.stage('load'):
+            loader = DataLoader(path, fast=fast)
+            original_df, processed_df = loader.load()
+
+        mode, capacity_input, capacity_source = resolve_capacity(loader, settings, total_capacity)
+        run = run_distribution(original_df, processed_df, mode, capacity_input, settings['quotas'], timer=timer)
+
+        workbook_path = os.path.join(out_dir, f"{name}_distribution.xlsx")
+        with timer.stage('export'):
+            with open(workbook_path, 'wb') as f:
+                Exporter.export_streaming(run.original_df, run.results, run.capacity_plan, output=f)
+
+        summary = {
+            "input": path,
+            "output": workbook_path,
+            "rows": len(processed_df),
+            "mode": mode,
+            "capacity_source": capacity_source,
+            "capacity_input": capacity_input,
+            "stats": run.stats,
+            "capacity_plan": run.capacity_plan,
+            "timings": timer.to_dict(),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+    except Exception as e:
+        summary = {"input": path, "error": f"{type(e).__name__}: {e}",
+                   "seconds": round(time.perf_counter() - started, 4)}
+
+    return _write_summary(out_dir, name, summary)
+
+def process_workbook(path, out_dir, name, settings, timer, total_capacity=None, fast=False, sheet_workers=1):
+    """
+    توزيع ملف متعدد الأوراق: قراءة جميع أوراق الطلبة في فتح واحد، ثم توزيع كل ورقة
+    بالتوازي، ثم تصدير ملف واحد بورقة نتائج لكل ورقة إدخال.
+
+    Returns:
+        dict: الملخص، مع قائمة sheets (الإحصائيات وخطة المقاعد والزمن لكل ورقة).
+    """
+    with timer.stage('load'):
+        loader = DataLoader(path, fast=fast)
+        frames = loader.load_sheets()
+
+    capacity = {sheet: resolve_capacity(loader, settings, total_capacity, sheet) for sheet in frames}
+    with timer.stage('distribute'):
+        outcomes = distribute_sheets(
+            {sheet: processed_df for sheet, (_, processed_df) in frames.items()},
+            {sheet: (mode, capacity_input) for sheet, (mode, capacity_input, _) in capacity.items()},
+            settings['quotas'],
+            max_workers=sheet_workers
+        )
+
+    failed = [f"{o['name']}: {o['error']}" for o in outcomes if 'error' in o]
+    if failed:
+        raise RuntimeError('; '.join(failed))
+
+    workbook_path = os.path.join(out_dir, f"{name}_distribution.xlsx")
+    with timer.stage('export'):
+        with open(workbook_path, 'wb') as f:
+            Exporter.export_sheets([
+                (o['name'], round_averages(frames[o['name']][0]), o['results'], o['capacity_plan'])
+                for o in outcomes
+            ], output=f)
+
+    return {
+        "input": path,
+        "output": workbook_path,
+        "rows": sum(o['rows'] for o in outcomes),
+        "sheets": [{
+            "name": o['name'],
+            "rows": o['rows'],
+            "mode": o['mode'],
+            "capacity_source": capacity[o['name']][2],
+            "capacity_input": o['capacity_input'],
+            "stats": o['stats'],
+            "capacity_plan": o['capacity_plan'],
+            "seconds": o['seconds']
+        } for o in outcomes],
+        "stats": {key: sum(o['stats'][key] for o in outcomes) for key in ('assigned', 'unassigned', 'total')},
+        "timings": timer.to_dict()
+    }
+
+def _write_summary(out_dir, name, summary):
+    with open(os.path.join(out_dir, f"{name}_summary.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+def load_settings(config_path):
+    """قراءة النسب والسعات من ConfigManager مرة واحدة (تُرسل لكل العمليات)."""
+    config_manager = ConfigManager(config_path)
+    return {
+        "quotas": normalize_quotas(config_manager.get_quotas()),
+        "manual_mode": config_manager.get_manual_mode(),
+        "manual_capacities": config_manager.get_manual_capacities_dict(),
+        "total_capacity": config_manager.get_total_capacity()
+    }
+
+def run_batch(paths, out_dir, settings, total_capacity=None, fast=False, workers=None, sheets=False, log=print):
+    """
+    توزيع جميع الملفات بالتوازي.
+
+    Returns:
+        dict: {files, succeeded, failed, rows, seconds, rows_per_second, results}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    names = output_names(paths)
+    available = workers or os.cpu_count() or 1
+    workers = max(1, min(len(paths), available))
+    # ملف واحد متعدد الأوراق: التوازي على مستوى الأوراق بدلاً من الملفات
+    sheet_workers = available if len(paths) == 1 else 1
+
+    started = time.perf_counter()
+    results = []
+    if workers == 1:
+        for path in paths:
+            results.append(process_file(path, out_dir, names[path], settings, total_capacity, fast, sheets, sheet_workers))
+            log(_describe(results[-1]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(process_file, path, out_dir, names[path], settings, total_capacity, fast, sheets)
+                       for path in paths]
+            for future in as_completed(futures):
+                results.append(future.result())
+                log(_describe(results[-1]))
+    seconds = time.perf_counter() - started
+
+    results.sort(key=lambda r: r['input'])
+    rows = sum(r.get('rows', 0) for r in results)
+    failed = sum(1 for r in results if 'error' in r)
+    return {
+        "files": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "workers": workers,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+        "results": results
+    }
+
+def _describe(result):
+    name = os.path.basename(result['input'])
+    if 'error' in result:
+        return f"FAILED {name}: {result['error']}"
+    stats = result['stats']
+    return f"ok     {name}: {stats['assigned']}/{stats['total']} assigned in {result['seconds']:.2f}s"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Distribute many cohort files in parallel without the web server.')
+    parser.add_argument('inputs', nargs='+', help='Input files, directories or glob patterns')
+    parser.add_argument('--out', required=True, help='Output directory for result workbooks and JSON summaries')
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help='Configuration file (quotas and capacities)')
+    parser.add_argument('--total-capacity', type=int, help='Equal distribution with this many seats for every file')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--fast', action='store_true', help='Read only the known columns (DataLoader fast mode)')
+    parser.add_argument('--sheets', action='store_true', help='Distribute every student sheet of each workbook separately')
+    args = parser.parse_args(argv)
+
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        parser.error('No supported input files found')
+
+    report = run_batch(paths, args.out, load_settings(args.config), args.total_capacity, args.fast, args.workers, args.sheets)
+    print(f"\n{report['succeeded']}/{report['files']} files, {report['rows']} rows in {report['seconds']:.2f}s "
+          f"on {report['workers']} workers: {report['rows_per_second']} rows/s")
+    if report['failed']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+"""
+-----------------------------------------------------------
+Synthetic Cohort Generator (cohort.py)
+
+توليد ملفات طلبة تجريبية واقعية (Excel / CSV / Parquet) بنفس عناوين أعمدة DataLoader.COLUMN_MAP،
+لاستخدامها في قياس الأداء (Benchmarks) وتجربة النظام دون بيانات حقيقية.
+
+الإعدادات القابلة للتحكم:
+- عدد الطلبة (من 1k إلى 1M) وعدد الأقسام.
+- توزيع القنوات (مركزي / موازي / شهداء) مع صيغ أسماء مختلفة لكل قناة كما في الملفات الحقيقية.
+- انحياز الرغبات (Choice Skew): شعبية الأقسام تتبع توزيع Zipf، فالقيمة 0 تعني أقساماً متساوية الشعبية.
+- نسبة أبناء التدريسيين ونسبة الرغبات الفارغة.
+
+التوليد حتمي (Reproducible): نفس الإعدادات ونفس البذرة (seed) تعطي نفس الملف دائماً.
+
+الاستخدام (من مجلد backend):
+    python -m benchmarks.cohort --rows 100000 --out data/cohort_100k.xlsx
+-----------------------------------------------------------
+"""
+
+# صيغ أسماء القنوات كما تظهر في ملفات القبول (تُوحّد لاحقاً بواسطة Rules)
+CHANNEL_LABELS = {
+    'مركزي': ['مركزي', 'القبول المركزي', 'القبول العام'],
+    'الموازي': ['الموازي', 'التعليم الموازي', 'موازي مسائي'],
+    'ذوي الشهداء': ['ذوي الشهداء', 'قناة الشهداء', 'مؤسسة الشهداء']
+}
+
+DEPARTMENT_NAMES = [
+    'علوم الحاسوب', 'هندسة البرمجيات', 'نظم المعلومات', 'الذكاء الاصطناعي', 'الأمن السيبراني',
+    'الرياضيات', 'الفيزياء', 'الكيمياء', 'علوم الحياة', 'الإحصاء', 'الجيولوجيا', 'التقنيات الإحيائية',
+    'الهندسة المدنية', 'الهندسة الكهربائية', 'الهندسة الميكانيكية', 'هندسة الاتصالات'
+]
+
+FIRST_NAMES = ['محمد', 'علي', 'حسين', 'أحمد', 'زينب', 'فاطمة', 'مريم', 'حسن', 'سارة', 'نور',
+               'عباس', 'آية', 'يوسف', 'هدى', 'مصطفى', 'رقية', 'كرار', 'إسراء', 'عمر', 'ضحى']
+FATHER_NAMES = ['جاسم', 'كاظم', 'عبد الله', 'صالح', 'جعفر', 'هادي', 'رضا', 'مهدي', 'سلمان', 'إبراهيم']
+FAMILY_NAMES = ['الموسوي', 'الحسيني', 'العبيدي', 'الجبوري', 'التميمي', 'الربيعي', 'الخفاجي', 'الزيدي']
+
+FACULTY_NOTE = 'أبناء الأساتذة'
+OTHER_NOTES = ['', '', '', 'منقول', 'دور ثان']
+
+SUPPORTED_FORMATS = ('xlsx', 'csv', 'parquet')
+
+def department_names(count):
+    """أسماء الأقسام: أسماء واقعية أولاً، ثم أسماء مرقمة إذا زاد العدد."""
+    names = DEPARTMENT_NAMES[:count]
+    names += [f'قسم {i + 1}' for i in range(len(names), count)]
+    return names
+
+def generate_cohort(rows, departments=12, channel_mix=(0.6, 0.3, 0.1), choice_skew=1.0,
+                    faculty_rate=0.02, blank_rate=0.02, seed=0):
+    """
+    توليد جدول طلبة تجريبي.
+
+    Args:
+        rows (int): عدد الطلبة.
+        departments (int): عدد الأقسام (3 على الأقل).
+        channel_mix (tuple): نسب (مركزي، موازي، شهداء)، تُطبّع ليكون مجموعها 1.
+        choice_skew (float): أس توزيع Zipf لشعبية الأقسام (0 = متساوية).
+        faculty_rate (float): نسبة أبناء التدريسيين.
+        blank_rate (float): نسبة الرغبات الثانية والثالثة الفارغة.
+        seed (int): بذرة المولد العشوائي.
+
+    Returns:
+        DataFrame: بعناوين الأعمدة العربية (نفس مفاتيح DataLoader.COLUMN_MAP).
+    """
+    if departments < 3:
+        raise ValueError("At least 3 departments are required")
+
+    rng = np.random.default_rng(seed)
+    names = np.array(department_names(departments), dtype=object)
+
+    # 1. المعدلات: توزيع طبيعي مقصوص بين 50 و 100، بمرتبتين عشريتين
+    averages = np.round(np.clip(rng.normal(78, 9, rows), 50, 100), 2)
+
+    # 2. القنوات وصيغ أسمائها
+    mix = np.asarray(channel_mix, dtype=np.float64)
+    mix = mix / mix.sum()
+    channel_keys = list(CHANNEL_LABELS)
+    channel_idx = rng.choice(len(channel_keys), rows, p=mix)
+    channels = np.empty(rows, dtype=object)
+    for i, key in enumerate(channel_keys):
+        mask = channel_idx == i
+        channels[mask] = rng.choice(CHANNEL_LABELS[key], int(mask.sum()))
+
+    # 3. الرغبات: ثلاثة أقسام مختلفة لكل طالب، مسحوبة حسب الشعبية دون تكرار
+    # (Gumbel Top-k: أكبر ثلاث قيم من log(الوزن) + ضجيج Gumbel)
+    weights = 1.0 / np.arange(1, departments + 1) ** choice_skew
+    keys = np.log(weights) + rng.gumbel(size=(rows, departments))
+    top = np.argpartition(-keys, 2, axis=1)[:, :3]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+    choices = names[top]
+    for col in (1, 2):
+        choices[rng.random(rows) < blank_rate, col] = None
+
+    # 4. الأسماء والملاحظات
+    full_names = (pd.Series(rng.choice(FIRST_NAMES, rows)) + ' ' +
+                  pd.Series(rng.choice(FATHER_NAMES, rows)) + ' ' +
+                  pd.Series(rng.choice(FAMILY_NAMES, rows)))
+    notes = rng.choice(OTHER_NOTES, rows).astype(object)
+    notes[rng.random(rows) < faculty_rate] = FACULTY_NOTE
+
+    return pd.DataFrame({
+        'ت': np.arange(1, rows + 1),
+        'اسم الطالب': full_names.to_numpy(dtype=object),
+        'المعدل': averages,
+        'قناة القبول': channels,
+        'الاختيار الأول': choices[:, 0],
+        'الاختيار الثاني': choices[:, 1],
+        'الاختيار الثالث': choices[:, 2],
+        'ملاحظات': notes
+    })
+
+def settings_frame(df, total_capacity=None):
+    """
+    ورقة الإعدادات (Settings) بسعات متساوية لكل قسم (نفس شكل DataLoader.get_settings).
+    """
+    choice_columns = ['الاختيار الأول', 'الاختيار الثاني', 'الاختيار الثالث']
+    depts = sorted(pd.concat([df[c] for c in choice_columns]).dropna().unique())
+    total = total_capacity if total_capacity is not None else len(df) // 2
+    return pd.DataFrame({'Dept_Name': depts, 'Capacity': [total // max(len(depts), 1)] * len(depts)})
+
+def write_cohort(df, path, with_settings=True):
+    """
+    كتابة الجدول بصيغة حسب امتداد المسار (.xlsx / .csv / .parquet).
+
+    Returns:
+        str: المسار المكتوب.
+    """
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    if ext not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported output format: {ext}")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if ext == 'xlsx':
+        with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='الطلبة')
+            if with_settings:
+                settings_frame(df).to_excel(writer, index=False, sheet_name='Settings')
+    elif ext == 'csv':
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    else:
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError:
+            raise ImportError("Writing Parquet files requires pyarrow (pip install pyarrow)")
+    return path
+
+def cohort_path(directory, rows, file_format, seed=0):
+    """اسم ملف ثابت لكل (حجم، صيغة، بذرة) لإعادة استخدام الملفات المولدة بين القياسات."""
+    return os.path.join(directory, f'cohort_{rows}_s{seed}.{file_format}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic student cohort file.')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--out', required=True, help='Output path (.xlsx, .csv or .parquet)')
+    parser.add_argument('--departments', type=int, default=12)
+    parser.add_argument('--channel-mix', default='60,30,10', help='central,parallel,martyrs shares')
+    parser.add_argument('--choice-skew', type=float, default=1.0)
+    parser.add_argument('--faculty-rate', type=float, default=0.02)
+    parser.add_argument('--blank-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-settings', action='store_true', help='Do not add a Settings sheet to workbooks')
+    args = parser.parse_args(argv)
+
+    df = generate_cohort(
+        args.rows,
+        departments=args.departments,
+        channel_mix=tuple(float(x) for x in args.channel_mix.split(',')),
+        choice_skew=args.choice_skew,
+        faculty_rate=args.faculty_rate,
+        blank_rate=args.blank_rate,
+        seed=args.seed
+    )
+    write_cohort(df, args.out, with_settings=not args.no_settings)
+    print(f"Wrote {len(df)} students to {args.out}")
+
+if __name__ == '__main__':
+    main()
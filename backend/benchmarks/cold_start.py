@@ -0,0 +1,162 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+"""
+-----------------------------------------------------------
+Cold-Start Benchmark (cold_start.py)
+
+قياس زمن بدء العامل (Worker) حتى أول استجابة، وذاكرة كل عامل، بطريقتين:
+- cold: عملية Python جديدة لكل عامل تستورد app من البداية (مثل python app.py أو gunicorn بدون preload).
+- preload: العملية الرئيسية تستورد wsgi مرة واحدة (مع warm_up و gc.freeze)، ثم يتفرع كل عامل
+  منها بـ os.fork (مثل gunicorn مع preload_app). متاح على Linux / macOS فقط.
+
+كل عامل ينفذ نفس التسلسل عبر Flask test client:
+    ready: أول GET /config
+    first_distribute: أول POST /distribute لملف إكسل صغير
+    first_export: أول GET /runs/<run_id>/export
+الأزمنة تُحسب من لحظة إنشاء العامل (بدء العملية أو التفرع)، والذاكرة بعد انتهاء التسلسل:
+rss (كاملة)، و uss (الخاصة بالعامل فقط، وهي ما يضيفه كل عامل إضافي فعلياً).
+
+الاستخدام (من مجلد backend):
+    python -m benchmarks.cold_start --workers 4 --rows 2000 --output cold.json
+-----------------------------------------------------------
+"""
+
+def worker_sequence(path, started):
+    """تسلسل الطلبات الأولى لعامل جديد (started: لحظة إنشاء العامل حسب time.time)."""
+    import app as app_module
+    from src.memory import process_memory
+
+    client = app_module.app.test_client()
+    timings = {}
+
+    client.get('/config')
+    timings['ready'] = time.time() - started
+
+    with open(path, 'rb') as f:
+        content = f.read()
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(content), os.path.basename(path)),
+        'mode': 'EQUAL',
+        'total_capacity': '100'
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"/distribute failed: {response.get_json()}")
+    timings['first_distribute'] = time.time() - started
+
+    client.get(f"/runs/{response.get_json()['run_id']}/export").get_data()
+    timings['first_export'] = time.time() - started
+
+    return {"timings": timings, "memory": process_memory()}
+
+def run_cold(path, workers):
+    """كل عامل عملية Python جديدة."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = []
+    for _ in range(workers):
+        started = time.time()
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.cold_start', '--child', path, repr(started)],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {"master_seconds": None, "workers": samples}
+
+def run_preload(path, workers):
+    """تحميل wsgi مرة واحدة ثم تفرع كل عامل منه."""
+    start = time.perf_counter()
+    import wsgi  # noqa: F401 (الاستيراد نفسه هو التحميل المسبق)
+    master_seconds = time.perf_counter() - start
+
+    samples = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        started = time.time()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                payload = json.dumps(worker_sequence(path, started))
+            except BaseException as e:
+                payload = json.dumps({"error": str(e)})
+            with os.fdopen(write_fd, 'w') as pipe:
+                pipe.write(payload)
+            os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            sample = json.loads(pipe.read())
+        os.waitpid(pid, 0)
+        if 'error' in sample:
+            raise RuntimeError(f"Preloaded worker failed: {sample['error']}")
+        samples.append(sample)
+    return {"master_seconds": round(master_seconds, 4), "workers": samples}
+
+def summarize(result):
+    """الوسيط لكل مقياس عبر العمال."""
+    workers = result['workers']
+    summary = {"master_seconds": result['master_seconds']}
+    for key in ('ready', 'first_distribute', 'first_export'):
+        summary[key] = round(statistics.median(w['timings'][key] for w in workers), 4)
+    for key in ('rss_bytes', 'uss_bytes'):
+        values = [w['memory'][key] for w in workers if w['memory'][key] is not None]
+        summary[key] = int(statistics.median(values)) if values else None
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure worker time-to-first-response and per-worker memory.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=2_000)
+    parser.add_argument('--modes', default='cold,preload', help='Comma-separated: cold,preload')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'STARTED'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(worker_sequence(args.child[0], float(args.child[1]))))
+        return
+
+    from benchmarks.cohort import generate_cohort, write_cohort
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    if 'preload' in modes and not hasattr(os, 'fork'):
+        print("preload mode requires os.fork, skipping", file=sys.stderr)
+        modes.remove('preload')
+
+    report = {"config": {"workers": args.workers, "rows": args.rows}, "modes": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_cohort(generate_cohort(args.rows), os.path.join(directory, 'cohort.xlsx'))
+        # cold أولاً، لأن preload يستورد التطبيق في هذه العملية
+        for mode in sorted(modes, key=lambda m: m != 'cold'):
+            result = run_cold(path, args.workers) if mode == 'cold' else run_preload(path, args.workers)
+            report['modes'][mode] = {"summary": summarize(result), "workers": result['workers']}
+
+    print(f"{'mode':>8} {'master':>8} {'ready':>8} {'distrib':>8} {'export':>8} {'rss MB':>8} {'uss MB':>8}")
+    for mode, data in report['modes'].items():
+        s = data['summary']
+        mb = lambda v: f"{v / 2**20:>8.1f}" if v is not None else f"{'-':>8}"
+        master = f"{s['master_seconds']:>8.3f}" if s['master_seconds'] is not None else f"{'-':>8}"
+        print(f"{mode:>8} {master} {s['ready']:>8.3f} {s['first_distribute']:>8.3f} {s['first_export']:>8.3f} "
+              f"{mb(s['rss_bytes'])} {mb(s['uss_bytes'])}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
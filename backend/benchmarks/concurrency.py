@@ -0,0 +1,121 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.loader import DataLoader
+from src.distributor import Distributor
+from src.rules import Rules
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Concurrency Stress Test (concurrency.py)
+
+اختبار تشغيل عدة توزيعات في نفس الوقت (Thread Pool) على نفس الجدول المعالج،
+كما يحدث في خادم متعدد الخيوط، ومقارنة كل نتيجة بنتيجة نفس الإعدادات عند التشغيل المتسلسل.
+
+السيناريوهات تشمل نسباً تُصفّر قناة (فتُفعّل موازنة الحصص)، ونسباً افتراضية (Rules.QUOTAS)،
+ووضعين (EQUAL / MANUAL) ومحركين (vectorized / reference) وإعادة توزيع تزايدية.
+بعد الانتهاء يُتحقق أيضاً من أن Rules.QUOTAS لم تتغير.
+
+الاستخدام (من مجلد backend):
+    python -m benchmarks.concurrency --rows 5000 --threads 8 --rounds 5
+-----------------------------------------------------------
+"""
+
+def build_frames(processed_df):
+    """
+    الجداول المستخدمة: الجدول كاملاً، وجدول الطلبة المركزيين فقط
+    (خلو الموازي والشهداء من الطلبة يُفعّل موازنة الحصص على النسب الافتراضية).
+    """
+    return {
+        'all': processed_df,
+        'central': processed_df[processed_df['channel'] == 'مركزي']
+    }
+
+def build_scenarios(departments, rows):
+    """سيناريوهات متنوعة: (الاسم، الجدول، الوضع، المدخل، النسب، المحرك، إعادة التوزيع)."""
+    manual = {dept: 20 + 7 * i for i, dept in enumerate(departments)}
+    return [
+        ('default', 'all', 'EQUAL', rows // 2, None, 'vectorized', None),
+        ('balanced_default', 'central', 'EQUAL', rows // 3, None, 'vectorized', None),
+        ('no_parallel', 'all', 'EQUAL', rows // 2, {'مركزي': 0.7, 'الموازي': 0.0, 'ذوي الشهداء': 0.3}, 'vectorized', None),
+        ('central_only', 'all', 'EQUAL', rows // 3, {'مركزي': 1.0, 'الموازي': 0.0, 'ذوي الشهداء': 0.0}, 'vectorized', None),
+        ('manual', 'all', 'MANUAL', manual, {'مركزي': 0.5, 'الموازي': 0.4, 'ذوي الشهداء': 0.1}, 'vectorized', None),
+        ('reference', 'all', 'EQUAL', rows // 4, None, 'reference', None),
+        ('redistribute', 'all', 'EQUAL', rows // 2, None, 'vectorized', ('EQUAL', rows // 3, {'مركزي': 0.8, 'الموازي': 0.1, 'ذوي الشهداء': 0.1})),
+    ]
+
+def run_scenario(frames, scenario):
+    """تشغيل سيناريو واحد بكائن Distributor خاص به، وإرجاع النتيجة النهائية والعدادات."""
+    name, frame, mode, input_value, quotas, engine, redistribution = scenario
+    distributor = Distributor(frames[frame], {}, quotas, engine=engine)
+    distributor.calculate_capacities(mode, input_value)
+    results = distributor.distribute()
+    if redistribution is not None:
+        results = {**results, **distributor.redistribute(*redistribution)}
+    return results, dict(distributor.dept_usage_total), dict(distributor.dept_overloads)
+
+def stress(frames, scenarios, threads=8, rounds=5, seed=0):
+    """
+    مقارنة نتائج التشغيل المتزامن بنتائج التشغيل المتسلسل.
+
+    Returns:
+        tuple: (mismatches, serial_seconds, concurrent_seconds, runs)
+    """
+    start = time.perf_counter()
+    expected = [run_scenario(frames, scenario) for scenario in scenarios]
+    serial_seconds = time.perf_counter() - start
+
+    # كل سيناريو يتكرر rounds مرة بترتيب عشوائي لزيادة التداخل بين الخيوط
+    jobs = [i for i in range(len(scenarios)) for _ in range(rounds)]
+    random.Random(seed).shuffle(jobs)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        outcomes = list(pool.map(lambda i: (i, run_scenario(frames, scenarios[i])), jobs))
+    concurrent_seconds = time.perf_counter() - start
+
+    mismatches = [scenarios[i][0] for i, outcome in outcomes if outcome != expected[i]]
+    return mismatches, serial_seconds, concurrent_seconds, len(jobs)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run distributions concurrently and compare them with serial runs.')
+    parser.add_argument('--rows', type=int, default=5_000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    quotas_before = dict(Rules.QUOTAS)
+
+    # الجدول يُحمّل من الذاكرة عبر DataLoader (نفس الأعمدة الفئوية التي يستخدمها الخادم)
+    content = generate_cohort(args.rows, seed=args.seed).to_csv(index=False).encode('utf-8')
+    _, processed_df = DataLoader(content, filename='cohort.csv').load()
+
+    scenarios = build_scenarios(DataLoader.get_departments(processed_df), args.rows)
+    mismatches, serial_seconds, concurrent_seconds, runs = stress(
+        build_frames(processed_df), scenarios, threads=args.threads, rounds=args.rounds, seed=args.seed)
+
+    print(f"{len(scenarios)} scenarios, serial: {serial_seconds:.3f}s")
+    print(f"{runs} concurrent runs on {args.threads} threads: {concurrent_seconds:.3f}s")
+    print(f"mismatches: {len(mismatches)}" + (f" ({', '.join(sorted(set(mismatches)))})" if mismatches else ''))
+
+    quotas_changed = dict(Rules.QUOTAS) != quotas_before
+    if quotas_changed:
+        print(f"Rules.QUOTAS changed: {quotas_before} -> {dict(Rules.QUOTAS)}")
+
+    if mismatches or quotas_changed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.loader import DataLoader
+from src.distributor import Distributor
+from src.exporter import Exporter
+from src.pipeline import normalize_quotas
+from src.rules import Rules
+from src.run_diff import RunDiff
+from benchmarks.cohort import generate_cohort, write_cohort, cohort_path
+
+"""
+-----------------------------------------------------------
+Benchmark Suite (run_benchmarks.py)
+
+قياس زمن كل مرحلة من مراحل النظام على ملفات تجريبية بأحجام وصيغ مختلفة:
+- load: قراءة الملف وتجهيزه (DataLoader.load).
+- capacities: حساب السعات وخطة المقاعد.
+- prepare / main_pass / vacancy_pass / exception_pass: مراحل التوزيع
+  (من الأزمنة التي يسجلها الموزع في Distributor.timings).
+- export: إنشاء ملف الإكسل الناتج.
+- diff: الفرق بين التوزيع وإعادة التوزيع بسعة أقل بـ 10% (RunDiff مع كتابة JSON كاملة).
+- endpoint: طلب POST /distribute كامل عبر Flask (رفع الملف + التحميل + التوزيع).
+
+النتائج تُحفظ كملف JSON (مع معلومات البيئة) ويمكن مقارنتها بنتائج سابقة عبر --compare.
+
+الاستخدام (من مجلد backend):
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 100000 --formats csv --compare bench.json
+-----------------------------------------------------------
+"""
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_FORMATS = ['xlsx', 'csv', 'parquet']
+STAGES = ['load', 'capacities', 'prepare', 'main_pass', 'vacancy_pass', 'exception_pass', 'export', 'diff', 'endpoint']
+
+def _environment():
+    """معلومات البيئة المرفقة بالنتائج (لتفسير الفروقات بين القياسات)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "excel_engine": DataLoader.get_excel_engine()
+    }
+
+def _distribute_timed(processed_df, total_capacity, quotas, engine):
+    """
+    حساب السعات والتوزيع مع زمن كل مرحلة (من Distributor.timings).
+
+    Returns:
+        tuple: (timings, results, distributor)
+    """
+    start = time.perf_counter()
+    distributor = Distributor(processed_df, {}, dict(quotas), engine=engine)
+    distributor.calculate_capacities('EQUAL', total_capacity)
+    timings = {'capacities': time.perf_counter() - start}
+
+    results = distributor.distribute()
+    # زمن الترتيب يُحسب ضمن مرحلة التجهيز
+    timings['prepare'] = distributor.timings.get('sort', 0.0) + distributor.timings.get('prepare', 0.0)
+    for stage in ('main_pass', 'vacancy_pass', 'exception_pass'):
+        timings[stage] = distributor.timings.get(stage, 0.0)
+    return timings, results, distributor
+
+def _diff_timed(distributor, results, total_capacity):
+    """زمن الفرق بين نتائج التوزيع ونتائج إعادة التوزيع بسعة أقل بـ 10% (إعادة التوزيع غير محسوبة)."""
+    before_cutoffs = distributor.central_cutoffs()
+    after = dict(results)
+    after.update(distributor.redistribute('EQUAL', int(total_capacity * 0.9)))
+
+    start = time.perf_counter()
+    diff = RunDiff(results, after, before_cutoffs, distributor.central_cutoffs(), students=distributor.df)
+    for _ in diff.iter_json():
+        pass
+    return time.perf_counter() - start
+
+def _endpoint_timed(client, content, filename, total_capacity):
+    """زمن طلب POST /distribute كامل (بدون الذاكرة المؤقتة للملفات)."""
+    import app as app_module
+    app_module.upload_cache.clear()
+    start = time.perf_counter()
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(content), filename),
+        'mode': 'EQUAL',
+        'total_capacity': str(total_capacity)
+    })
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise RuntimeError(f"/distribute failed: {response.get_json()}")
+    return elapsed
+
+def bench_file(path, total_capacity, repeat=3, engine='vectorized', endpoint=True):
+    """
+    قياس جميع المراحل لملف واحد.
+
+    Returns:
+        dict: {stage: {median, min, samples}}
+    """
+    samples = {stage: [] for stage in STAGES}
+    client = None
+    if endpoint:
+        import app as app_module
+        client = app_module.app.test_client()
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    quotas = normalize_quotas(dict(Rules.QUOTAS))
+    for _ in range(repeat):
+        start = time.perf_counter()
+        original_df, processed_df = DataLoader(path).load()
+        samples['load'].append(time.perf_counter() - start)
+
+        timings, results, distributor = _distribute_timed(processed_df, total_capacity, quotas, engine)
+        for stage, value in timings.items():
+            samples[stage].append(value)
+
+        start = time.perf_counter()
+        Exporter.export_to_buffer(original_df, results, distributor.plan.to_dict(), streaming=True)
+        samples['export'].append(time.perf_counter() - start)
+
+        samples['diff'].append(_diff_timed(distributor, results, total_capacity))
+
+        if client is not None:
+            samples['endpoint'].append(_endpoint_timed(client, content, os.path.basename(path), total_capacity))
+
+    return {
+        stage: {
+            "median": round(statistics.median(values), 6),
+            "min": round(min(values), 6),
+            "samples": [round(v, 6) for v in values]
+        }
+        for stage, values in samples.items() if values
+    }
+
+def run_suite(sizes, formats, data_dir, repeat=3, engine='vectorized', endpoint=True, seed=0, log=print):
+    """
+    تشغيل القياسات لجميع الأحجام والصيغ (الملفات تُولد مرة واحدة وتُعاد استخدامها).
+
+    Returns:
+        dict: {environment, config, results: [...]}
+    """
+    results = []
+    for rows in sizes:
+        cohort = None
+        for file_format in formats:
+            path = cohort_path(data_dir, rows, file_format, seed)
+            if not os.path.exists(path):
+                if cohort is None:
+                    cohort = generate_cohort(rows, seed=seed)
+                log(f"Generating {path}")
+                write_cohort(cohort, path)
+
+            total_capacity = rows // 2
+            log(f"Benchmarking {rows} rows ({file_format})")
+            stages = bench_file(path, total_capacity, repeat=repeat, engine=engine, endpoint=endpoint)
+            distribute_total = sum(stages[s]['median'] for s in ('prepare', 'main_pass', 'vacancy_pass', 'exception_pass'))
+            results.append({
+                "rows": rows,
+                "format": file_format,
+                "file_bytes": os.path.getsize(path),
+                "total_capacity": total_capacity,
+                "stages": stages,
+                "distribute_rows_per_sec": round(rows / distribute_total) if distribute_total else None
+            })
+
+    return {
+        "environment": _environment(),
+        "config": {"sizes": sizes, "formats": formats, "repeat": repeat, "engine": engine, "seed": seed},
+        "results": results
+    }
+
+def compare(current, baseline):
+    """
+    مقارنة نتيجتين (الوسيط لكل مرحلة): النسبة = الحالي / السابق (أقل من 1 = أسرع).
+
+    Returns:
+        list: [(rows, format, stage, baseline, current, ratio)]
+    """
+    previous = {(r['rows'], r['format']): r['stages'] for r in baseline.get('results', [])}
+    rows = []
+    for result in current['results']:
+        old_stages = previous.get((result['rows'], result['format']))
+        if not old_stages:
+            continue
+        for stage, values in result['stages'].items():
+            if stage not in old_stages:
+                continue
+            old, new = old_stages[stage]['median'], values['median']
+            rows.append((result['rows'], result['format'], stage, old, new, round(new / old, 3) if old else None))
+    return rows
+
+def _print_table(report):
+    print(f"{'rows':>9} {'format':>8} " + ' '.join(f'{s:>14}' for s in STAGES))
+    for result in report['results']:
+        cells = [f"{result['stages'][s]['median']:>14.4f}" if s in result['stages'] else f"{'-':>14}" for s in STAGES]
+        print(f"{result['rows']:>9} {result['format']:>8} " + ' '.join(cells))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark load, distribution passes, export and /distribute.')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help='Comma-separated row counts (1000 .. 1000000)')
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS), help='Comma-separated formats: xlsx,csv,parquet')
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--engine', default='vectorized', choices=Distributor.ENGINES)
+    parser.add_argument('--no-endpoint', action='store_true', help='Skip the full /distribute request')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Baseline JSON to compare against')
+    args = parser.parse_args(argv)
+
+    report = run_suite(
+        sizes=[int(s) for s in args.sizes.split(',') if s],
+        formats=[f.strip() for f in args.formats.split(',') if f.strip()],
+        data_dir=args.data_dir,
+        repeat=max(1, args.repeat),
+        engine=args.engine,
+        endpoint=not args.no_endpoint,
+        seed=args.seed,
+        log=lambda message: print(message, file=sys.stderr)
+    )
+    _print_table(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n{'rows':>9} {'format':>8} {'stage':>15} {'baseline':>10} {'current':>10} {'ratio':>7}")
+        for rows, file_format, stage, old, new, ratio in compare(report, baseline):
+            print(f"{rows:>9} {file_format:>8} {stage:>15} {old:>10.4f} {new:>10.4f} {ratio if ratio is not None else '-':>7}")
+
+if __name__ == '__main__':
+    main()
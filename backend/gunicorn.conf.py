@@ -0,0 +1,42 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import multiprocessing
+import os
+
+"""
+-----------------------------------------------------------
+Gunicorn Configuration (gunicorn.conf.py)
+
+إعدادات التشغيل للإنتاج (Linux / macOS):
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+- preload_app: تحميل التطبيق والمكتبات مرة واحدة في العملية الرئيسية ثم التفرع (انظر wsgi.py).
+- gthread: العامل يخدم عدة طلبات بخيوط (Threads)، والتوزيع آمن للتزامن داخل العملية.
+
+عامل لكل معالج افتراضياً (cpu_count): الحالة التي تعتمد عليها الطلبات المتتابعة مشتركة بين العمال
+على القرص، فيمكن أن يصل أي طلب إلى أي عامل دون توجيه ثابت (Sticky Sessions):
+- token من /scan: الملف محفوظ في SSDS_UPLOADS_DIR (UploadStore) ويُحلل من جديد عند الحاجة.
+- run_id: مصدر العملية ورقم نسختها في قاعدة البيانات (SSDS_RUNS_DB)، وتُعاد بناؤها في العامل الآخر.
+- job_id: حالة المهمة في قاعدة البيانات.
+مقاييس /metrics فقط خاصة بكل عامل.
+
+المتغيرات (Environment):
+    SSDS_BIND     عنوان الاستماع (الافتراضي 0.0.0.0:5000)
+    SSDS_WORKERS  عدد العمليات (الافتراضي عدد المعالجات)
+    SSDS_THREADS  عدد الخيوط لكل عملية (الافتراضي 8)
+    SSDS_TIMEOUT  المهلة القصوى للطلب بالثواني (الافتراضي 300، للملفات الكبيرة)
+-----------------------------------------------------------
+"""
+
+bind = os.environ.get('SSDS_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SSDS_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('SSDS_THREADS', 8))
+timeout = int(os.environ.get('SSDS_TIMEOUT', 300))
+preload_app = True
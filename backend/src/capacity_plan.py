@@ -0,0 +1,148 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+from types import MappingProxyType
+import numpy as np
+from src.rules import Rules
+
+class CapacityPlan:
+    """
+    خطة المقاعد (Capacity Plan)
+
+    جدول ثابت (Immutable) يحتوي على حدود المقاعد لكل قسم ولكل قناة، محسوبة مرة واحدة
+    عند حساب السعات. جميع دورات التوزيع (الأساسية، الشواغر، الاستثناءات) تقرأ منه مباشرة
+    بدلاً من إعادة حساب تقسيم النسب عند كل فحص.
+
+    قاعدة التقسيم:
+    - سعة القناة = floor(السعة الكلية للقسم * نسبة القناة).
+    - القناة المركزية تأخذ الباقي، ليكون مجموع مقاعد القنوات = السعة الكلية دائماً.
+    """
+
+    CENTRAL = 'مركزي'
+    CHANNELS = Rules.CHANNELS
+
+    def __init__(self, capacities, quotas):
+        """
+        Args:
+            capacities (dict): {اسم_القسم: السعة_الكلية}.
+            quotas (dict): نسب القبول لكل قناة بعد موازنة الحصص.
+        """
+        departments = tuple(capacities.keys())
+        channels = list(quotas.keys())
+        for ch_name in self.CHANNELS:
+            if ch_name not in channels:
+                channels.append(ch_name)
+
+        self._departments = departments
+        self._channels = tuple(channels)
+        self._dept_index = MappingProxyType({d: i for i, d in enumerate(departments)})
+        self._channel_index = MappingProxyType({c: i for i, c in enumerate(channels)})
+        self._capacities = MappingProxyType({d: int(capacities[d]) for d in departments})
+        self._quotas = MappingProxyType({k: float(v) for k, v in quotas.items()})
+
+        # حساب جدول الحدود (قسم × قناة)
+        caps = np.array([self._capacities[d] for d in departments], dtype=np.int64)
+        limits = np.zeros((len(departments), len(channels)), dtype=np.int64)
+        others = np.zeros(len(departments), dtype=np.int64)
+        for ch_name, q_val in self._quotas.items():
+            seats = np.floor(caps * q_val).astype(np.int64)
+            limits[:, self._channel_index[ch_name]] = seats
+            if ch_name != self.CENTRAL:
+                others += seats
+        limits[:, self._channel_index[self.CENTRAL]] = caps - others
+        limits.setflags(write=False)
+        caps.setflags(write=False)
+
+        self._totals = caps
+        self._limits = limits
+        self._lookup = MappingProxyType({
+            dept: MappingProxyType({ch: int(limits[d, c]) for ch, c in self._channel_index.items()})
+            for dept, d in self._dept_index.items()
+        })
+
+    # ---------------------------------------------------------
+    # القراءة (Lookups) - جميعها O(1)
+    # ---------------------------------------------------------
+
+    @property
+    def departments(self):
+        return self._departments
+
+    @property
+    def channels(self):
+        return self._channels
+
+    @property
+    def dept_index(self):
+        return self._dept_index
+
+    @property
+    def channel_index(self):
+        return self._channel_index
+
+    @property
+    def capacities(self):
+        return self._capacities
+
+    @property
+    def quotas(self):
+        return self._quotas
+
+    @property
+    def totals(self):
+        """مصفوفة السعات الكلية بترتيب departments (للقراءة فقط)."""
+        return self._totals
+
+    @property
+    def limits(self):
+        """مصفوفة الحدود (قسم × قناة) بترتيب departments و channels (للقراءة فقط)."""
+        return self._limits
+
+    def __contains__(self, dept):
+        return dept in self._dept_index
+
+    def __len__(self):
+        return len(self._departments)
+
+    def limit(self, dept, channel):
+        """عدد المقاعد المخصصة لقناة معينة في قسم معين (0 للقسم أو القناة غير المعروفة)."""
+        seats = self._lookup.get(dept)
+        if seats is None:
+            return 0
+        return seats.get(channel, 0)
+
+    def total(self, dept):
+        """السعة الكلية للقسم (0 للقسم غير المعروف)."""
+        return self._capacities.get(dept, 0)
+
+    # ---------------------------------------------------------
+    # التسلسل (Serialization)
+    # ---------------------------------------------------------
+
+    def to_dict(self):
+        """
+        تحويل الخطة إلى قاموس قابل للتحويل إلى JSON (لعرضها في الاستجابة وملف التصدير).
+        """
+        return {
+            "quotas": dict(self._quotas),
+            "channels": list(self._channels),
+            "departments": [
+                {
+                    "name": dept,
+                    "capacity": self._capacities[dept],
+                    "seats": dict(self._lookup[dept])
+                }
+                for dept in self._departments
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """إعادة بناء الخطة من قاموس ناتج عن to_dict."""
+        capacities = {d['name']: d['capacity'] for d in data.get('departments', [])}
+        return cls(capacities, data.get('quotas', {}))
@@ -7,10 +7,19 @@ Proprietary and confidential.
 -----------------------------------------------------------
 """
 
+import copy
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from src.rules import Rules
 
+try:
+    import fcntl  # قفل الملفات بين العمليات (غير متوفر على Windows)
+except ImportError:
+    fcntl = None
+
 class ConfigManager:
     """
     مدير الإعدادات (Configuration Manager)
@@ -20,18 +29,40 @@ class ConfigManager:
     - نسب القبول (Quotas).
     - سعات الأقسام (Department Capacities).
     - حالة تفعيل الأقسام (Active/Inactive).
+
+    التخزين المؤقت والكتابة الآمنة:
+    - تُحفظ نسخة من الإعدادات في الذاكرة، ولا يُعاد قراءة الملف إلا إذا تغير
+      (وقت التعديل mtime أو الحجم)، مثلاً عند حفظه من عامل (Worker) آخر.
+    - التعديلات تتم داخل batch(): قفل (بين الخيوط، وبين العمليات عبر fcntl إن توفر)،
+      ثم قراءة أحدث نسخة، ثم كتابة واحدة ذرية (ملف مؤقت + إعادة تسمية) لكل دفعة.
+    - النسخة في الذاكرة لا تُعدّل مباشرة بل تُستبدل بعد الحفظ، فالقراءة لا تحتاج قفلاً
+      ولا ترى إعدادات نصف محدثة.
     """
     
     def __init__(self, config_path):
         self.config_path = config_path
+        self.lock_path = config_path + '.lock'
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._draft = None
+        self._signature = None
         self.config = self._load_config()
 
+    def _file_signature(self):
+        """بصمة الملف (وقت التعديل بالنانوثانية، الحجم)، أو None إذا لم يوجد."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
     def _load_config(self):
         """
         تحميل الإعدادات من الملف.
         في حال عدم وجود الملف، يتم إنشاء إعدادات افتراضية.
         """
-        if not os.path.exists(self.config_path):
+        self._signature = self._file_signature()
+        if self._signature is None:
             return self._get_default_config()
         
         try:
@@ -41,53 +72,143 @@ class ConfigManager:
             print(f"Error loading config: {e}")
             return self._get_default_config()
 
+    def _refresh(self):
+        """
+        إعادة تحميل الإعدادات فقط إذا تغير الملف منذ آخر قراءة أو كتابة.
+
+        Returns:
+            dict: النسخة الحالية من الإعدادات.
+        """
+        if self._file_signature() != self._signature:
+            with self._lock:
+                if self._file_signature() != self._signature:
+                    self.config = self._load_config()
+        return self.config
+
     def _get_default_config(self):
         """
         الإعدادات الافتراضية للنظام.
         """
         return {
-            "quotas": Rules.QUOTAS, # استخدام النسب الموجودة في Rules كافتراضي
-            "departments": []       # {name: str, capacity: int, is_active: bool}
+            "quotas": dict(Rules.QUOTAS), # نسخة من النسب الموجودة في Rules كافتراضي
+            "departments": []             # {name: str, capacity: int, is_active: bool}
         }
 
+    def get_config(self):
+        """
+        الإعدادات الحالية (من الذاكرة، مع إعادة التحميل إذا تغير الملف).
+        النسخة المعادة للقراءة فقط.
+        """
+        return self._refresh()
+
+    @contextmanager
+    def _file_lock(self):
+        """قفل حصري على ملف جانبي (config.json.lock) بين العمليات التي تتشارك نفس الإعدادات."""
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def batch(self):
+        """
+        دفعة تعديلات تُحفظ بكتابة واحدة عند نهايتها.
+
+        with config_manager.batch() as config:
+            config['quotas'] = {...}
+            config['total_capacity'] = 200
+
+        الدفعات المتداخلة (مثل استدعاء set_quotas داخل دفعة) تُدمج في الدفعة الخارجية.
+        في حال حدوث خطأ داخل الدفعة لا يُحفظ أي تعديل منها، وفي حال فشل الكتابة
+        يُمرر الخطأ وتبقى النسخة في الذاكرة كما هي.
+        """
+        with self._lock:
+            if self._batch_depth:
+                self._batch_depth += 1
+                try:
+                    yield self._draft
+                finally:
+                    self._batch_depth -= 1
+                return
+
+            with self._file_lock():
+                # البدء من أحدث نسخة على القرص (قد يكون عامل آخر قد حفظ تعديلاته)
+                self._draft = copy.deepcopy(self._refresh())
+                self._batch_depth = 1
+                try:
+                    yield self._draft
+                    # الكتابة أولاً: إذا فشلت يبقى ما في الذاكرة مطابقاً للملف ويصل الخطأ للمستدعي
+                    self._write_file(self._draft)
+                    self.config = self._draft
+                    self._signature = self._file_signature()
+                finally:
+                    self._batch_depth = 0
+                    self._draft = None
+
     def save_config(self):
         """
-        حفظ الإعدادات الحالية إلى الملف.
+        حفظ الإعدادات الحالية (self.config) إلى الملف.
+
+        Raises:
+            OSError: إذا تعذرت الكتابة (مثل امتلاء القرص أو مجلد للقراءة فقط).
+        """
+        with self._lock:
+            self._write_file(self.config)
+            self._signature = self._file_signature()
+
+    def _write_file(self, config):
+        """
+        كتابة ذرية (Atomic Write) للإعدادات: الكتابة إلى ملف مؤقت في نفس المجلد ثم استبدال الملف الأصلي به،
+        فلا يقرأ أي عامل آخر ملفاً نصف مكتوب. أي خطأ يُمرر للمستدعي بعد حذف الملف المؤقت.
         """
+        # التأكد من وجود المجلد
+        directory = os.path.dirname(self.config_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.tmp', dir=directory)
         try:
-            # التأكد من وجود المجلد
-            os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-            
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
 
     # ---------------------------------------------------------
     # واجهات التعامل مع البيانات (Getters & Setters)
     # ---------------------------------------------------------
 
     def get_quotas(self):
-        return self.config.get('quotas', Rules.QUOTAS)
+        return self._refresh().get('quotas', dict(Rules.QUOTAS))
 
     def set_quotas(self, quotas):
         """
         تحديث نسب القبول.
         Ex: {'مركزي': 0.60, ...}
         """
-        self.config['quotas'] = quotas
-        self.save_config()
+        with self.batch() as config:
+            config['quotas'] = quotas
 
     def get_departments(self):
-        return self.config.get('departments', [])
+        return self._refresh().get('departments', [])
 
     def update_departments(self, departments_list):
         """
         تحديث قائمة الأقسام وسعاتها.
         departments_list: List of dicts [{'name': 'SE', 'capacity': 100, 'is_active': True}, ...]
         """
-        self.config['departments'] = departments_list
-        self.save_config()
+        with self.batch() as config:
+            config['departments'] = departments_list
 
     def get_manual_capacities_dict(self):
         """
@@ -103,15 +224,15 @@ class ConfigManager:
         return cap_dict
 
     def get_total_capacity(self):
-        return self.config.get('total_capacity', 0)
+        return self._refresh().get('total_capacity', 0)
 
     def set_total_capacity(self, capacity):
-        self.config['total_capacity'] = int(capacity)
-        self.save_config()
+        with self.batch() as config:
+            config['total_capacity'] = int(capacity)
 
     def get_manual_mode(self):
-        return self.config.get('manual_mode', False)
+        return self._refresh().get('manual_mode', False)
 
     def set_manual_mode(self, is_manual):
-        self.config['manual_mode'] = bool(is_manual)
-        self.save_config()
+        with self.batch() as config:
+            config['manual_mode'] = bool(is_manual)
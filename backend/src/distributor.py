@@ -7,9 +7,12 @@ Proprietary and confidential.
 -----------------------------------------------------------
 """
 
-import math
+import time
+import numpy as np
 import pandas as pd
 from src.rules import Rules
+from src.capacity_plan import CapacityPlan
+from src.loader import DataLoader
 
 class Distributor:
     """
@@ -24,9 +27,25 @@ class Distributor:
     3. ترتيب الطلبة تنازلياً (Priority Queueing based on Score).
     4. التوزيع الأساسي (Main Allocation Loop).
     5. معالجة الاستثناءات (Exception Handling - Faculty Children).
+
+    التزامن (Reentrancy): المدخلات (السعات والنسب) تُنسخ عند الإنشاء ولا تُعدّل،
+    والجدول يُقرأ فقط، وكل الحالة (العدادات، الخطة، الترتيب) خاصة بالكائن.
+    لذا يمكن تشغيل عدة توزيعات في نفس الوقت (Thread Pool) على نفس الجدول،
+    بشرط أن يكون لكل توزيع كائن Distributor خاص به.
+
+    محركات التنفيذ (Engines):
+    - 'vectorized' (الافتراضي): ترميز الأقسام والقنوات كأعداد صحيحة مرة واحدة،
+      وحفظ حدود المقاعد والعدادات في مصفوفات NumPy.
+    - 'reference': التنفيذ الأصلي المعتمد على iterrows، يبقى كمرجع لاختبارات التطابق.
     """
 
-    def __init__(self, processed_df, capacities=None, quotas=None):
+    ENGINES = ('vectorized', 'reference')
+
+    # عدد الطلبة بين كل نقطتي استئناف (Checkpoint Interval)
+    # عند كل نقطة تُحفظ نسخة من العدادات ويُرسل تقرير التقدم.
+    CHECKPOINT_INTERVAL = 4_096
+
+    def __init__(self, processed_df, capacities=None, quotas=None, engine='vectorized'):
         """
         تهيئة الموزع.
         
@@ -34,21 +53,53 @@ class Distributor:
             processed_df (DataFrame): بيانات الطلبة المعالجة.
             capacities (dict, optional): سعات الأقسام المحددة مسبقاً (للوضع اليدوي).
             quotas (dict, optional): نسب القبول لكل قناة (الافتراضي من Rules.QUOTAS).
+            engine (str, optional): محرك التوزيع 'vectorized' أو 'reference'.
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown distribution engine: {engine}")
+
         self.df = processed_df
-        self.capacities = capacities if capacities else {}
-        self.quotas = quotas if quotas else Rules.QUOTAS
+
+        # ترتيب الطلبة تنازلياً حسب المعدل كمصفوفة مواقع (Sort Order)
+        # بدلاً من نسخة مرتبة كاملة من الجدول - يُحسب في distribute
+        self.order = None
+        self.capacities = dict(capacities) if capacities else {}
+
+        # النسب المطلوبة (نسخة خاصة لا تُعدّل)، والنسب الفعلية بعد موازنة الحصص تُحسب منها في _build_plan
+        self.requested_quotas = dict(quotas) if quotas else dict(Rules.QUOTAS)
+        self.quotas = dict(self.requested_quotas)
+        self.engine = engine
         
         # متتبعات الاستخدام (Usage Trackers)
         # لتتبع عدد المقاعد المحجوزة في كل قسم لكل قناة لحظياً.
         # {DeptName: {'مركزي': 50, 'موازي': 20, ...}}
         self.dept_channel_usage = {} 
+
+        # نفس العدادات كمصفوفة (قسم × قناة) بترتيب أقسام وقنوات المحرك السريع، تُملأ بعد distribute بالمحرك السريع
+        self.usage = None
+
+        # عداد إجمالي المقاعد المشغولة لكل قسم (Running Total Counter)
+        # يغني دورة الشواغر عن جمع عدادات القنوات عند كل فحص.
+        self.dept_usage_total = {}
+
+        # خطة المقاعد الثابتة (CapacityPlan) - تُبنى في calculate_capacities
+        self.plan = None
+
+        # حالة المحرك السريع المحفوظة بعد distribute (لإعادة التوزيع التزايدية)
+        self._state = None
+
+        # زمن كل مرحلة من آخر distribute/redistribute بالثواني (للقياس عبر /metrics)
+        self.timings = {}
         
         # متتبع أدنى معدل (Minimum Score Tracker)
         # نحتفظ بأقل معدل تم قبوله في القناة المركزية لكل قسم.
         # يستخدم لاحقاً لتطبيق استثناء أبناء الأساتذة (معدل الطالب >= الحد الأدنى - 5).
         self.dept_min_scores = {}
 
+        # عداد التجاوزات (Overload Counter)
+        # عدد الطلبة الذين أُدخلوا إلى كل قسم باستثناء أبناء التدريسيين (بتجاوز السعة).
+        self.dept_overloads = {}
+
     def calculate_capacities(self, mode='EQUAL', input_value=None):
         """
         حساب السعة الاستيعابية (Capacity Calculation Logic)
@@ -66,15 +117,14 @@ class Distributor:
             mode (str): 'EQUAL' أو 'MANUAL'.
             input_value (int/dict): إجمالي المقاعد (للـ EQUAL) أو قاموس السعات (للـ MANUAL).
         """
-        # 1. تحديد جميع الأقسام الفريدة المذكورة في رغبات الطلبة
-        # نستخدم دمج الأعمدة الثلاثة للحصول على قائمة شاملة
-        choices = pd.concat([self.df['choice_1'], self.df['choice_2'], self.df['choice_3']]).dropna().unique()
-        unique_depts = sorted([d for d in choices if str(d).strip() != ''])
+        # 1. تحديد جميع الأقسام الفريدة المذكورة في رغبات الطلبة (من الأعمدة الثلاثة)
+        unique_depts = DataLoader.get_departments(self.df)
         
         self.capacities = {}
         num_depts = len(unique_depts)
         
         if num_depts == 0:
+            self._build_plan()
             return
 
         # استراتيجية التوزيع اليدوي
@@ -100,89 +150,149 @@ class Distributor:
             # يضع قيمة آمنة (100) لتجنب الأقسام الصفرية
             self.capacities = {dept: 100 for dept in unique_depts}
 
-        # تهئة العدادات بعد تحديد السعة
+        # بناء خطة المقاعد الثابتة وتهيئة العدادات
+        self._build_plan()
+
+    def _balance_quotas(self):
+        """
+        موازنة الحصص الذكية (Smart Quota Balancing)
+
+        التحقق من وجود طلبة في القنوات المختلفة.
+        إذا كانت قناة معينة خالية تماماً من الطلبة (مثل الموازي)، فلا داعي لحجز مقاعد لها.
+        يتم تحويل حصتها إلى القناة المركزية لتعظيم الاستفادة من المقاعد.
+
+        Returns:
+            dict: النسب بعد الموازنة (قاموس جديد، النسب المطلوبة تبقى كما هي).
+        """
+        quotas = dict(self.requested_quotas)
+
+        # حساب عدد الطلبة لكل قناة في البيانات الحالية
+        channel_counts = Rules.normalize_channels(self.df['channel']).value_counts()
+        
+        total_students = len(self.df)
+        if total_students > 0:
+            # القنوات التي يجب التحقق منها (غير المركزي)
+            for ch_name in ['الموازي', 'ذوي الشهداء']:
+                count = channel_counts.get(ch_name, 0)
+                
+                # إذا لم يوجد أي طالب في هذه القناة، وكانت لها نسبة محجوزة
+                if count == 0 and quotas.get(ch_name, 0) > 0:
+                    transfer_amount = quotas[ch_name]
+                    # تصفير حصة القناة الفارغة
+                    quotas[ch_name] = 0.0
+                    # إضافة الحصة إلى المركزي
+                    quotas['مركزي'] = quotas.get('مركزي', 0) + transfer_amount
+        return quotas
+
+    def _build_plan(self):
+        """
+        بناء خطة المقاعد (CapacityPlan) بعد موازنة الحصص، ثم تصفير العدادات.
+        تقسيم المقاعد على القنوات يُحسب هنا مرة واحدة فقط.
+        """
+        self.quotas = self._balance_quotas()
+        self.plan = CapacityPlan(self.capacities, self.quotas)
+
         # تصفير العدادات لكل قسم وقناة
+        self.dept_channel_usage = {}
+        self.dept_usage_total = {}
+        self.dept_min_scores = {}
+        self.dept_overloads = {}
         for dept in self.capacities:
-            self.dept_channel_usage[dept] = {k: 0 for k in self.quotas.keys()}
+            self.dept_channel_usage[dept] = {k: 0 for k in self.plan.channels}
+            self.dept_usage_total[dept] = 0
             self.dept_min_scores[dept] = 100.0 # نبدأ بقيمة عالية للتناقص
+            self.dept_overloads[dept] = 0
+
+    def central_cutoffs(self):
+        """
+        الحد الأدنى للقبول المركزي لكل قسم (من dept_min_scores).
+
+        Returns:
+            dict: {اسم_القسم: أقل_معدل} للأقسام التي قُبل فيها طالب مركزي واحد على الأقل فقط.
+        """
+        return {
+            dept: round(float(self.dept_min_scores[dept]), 4)
+            for dept, usage in self.dept_channel_usage.items()
+            if usage.get('مركزي', 0)
+        }
 
     def _check_capacity(self, dept, channel_type):
         """
         التحقق من توفر مقعد شاغر (Slot Availability Check)
         
         تتحقق هذه الدالة مما إذا كان هناك مجال لقبول طالب جديد في قسم معين وقناة معينة.
-        
-        المنطق:
-        - السعة القصوى للقناة = السعة الكلية للقسم * نسبة القناة.
+        حدود المقاعد تُقرأ من خطة المقاعد (CapacityPlan) المحسوبة مسبقاً:
+        - السعة القصوى للقناة = floor(السعة الكلية للقسم * نسبة القناة).
         - القبول المركزي يحصل على "باقي" المقاعد لضمان عدم ضياع الكسور العشرية.
         
         Returns:
             bool: True إذا وجد مقعد شاغر، False إذا امتلأ.
         """
-        if dept not in self.capacities: return False
-        
-        total_cap = self.capacities[dept]
-        quota_percent = self.quotas.get(channel_type, 0)
-        
-        # حساب السعة النظرية لهذه القناة (Floor لتقريب الكسور للأسفل)
-        max_seats = math.floor(total_cap * quota_percent)
-        
-        # التعامل مع الكسور (Remainder Handling)
-        # القناة المركزية تأخذ كل ما تبقى من القنوات الأخرى
-        # هذا يضمن أن مجموع المقاعد الفرعية = المقاعد الكلية دائماً
-        if channel_type == 'مركزي':
-            others = 0
-            for q_name, q_val in self.quotas.items():
-                if q_name != 'مركزي':
-                    # جمع سعات القنوات الأخرى
-                    others += math.floor(total_cap * q_val)
-            # المركزي = الكلي - مجموع الباقين
-            max_seats = total_cap - others
+        if dept not in self.plan: return False
 
         current_usage = self.dept_channel_usage[dept][channel_type]
         
-        return current_usage < max_seats
+        return current_usage < self.plan.limit(dept, channel_type)
 
-    def distribute(self):
+    def distribute(self, progress=None):
         """
         تنفيذ عملية التوزيع (Execute Distribution Pipeline)
         
         هذه هي الدالة الرئيسية التي تدير العملية كاملة.
+        المحركان يعيدان نفس النتيجة تماماً، والاختيار بينهما يتم عبر self.engine.
+
+        Args:
+            progress (callable, optional): دالة تقرير التقدم progress(stage, fraction)
+                حيث stage أحد 'main_pass' أو 'vacancy_pass' أو 'exception_pass'، و fraction بين 0 و 1.
         
         Returns:
             dict: {id: AssignedDepartment}
         """
         # 1. الترتيب (Pre-sorting)
         # الفرز حسب المعدل تنازلياً هو جوهر العدالة في النظام.
-        self.df = self.df.sort_values(by=['average'], ascending=False)
-        
-        # --- [Smart Quota Balancing] ---
-        # التحقق من وجود طلبة في القنوات المختلفة.
-        # إذا كانت قناة معينة خالية تماماً من الطلبة (مثل الموازي)، فلا داعي لحجز مقاعد لها.
-        # يتم تحويل حصتها إلى القناة المركزية لتعظيم الاستفادة من المقاعد.
+        # يُحفظ الترتيب كمواقع صفوف فقط (نفس خوارزمية sort_values) دون نسخ الجدول.
+        self.timings = {}
+        started = time.perf_counter()
+        self.order = self.sort_order(self.df)
+        self.timings['sort'] = time.perf_counter() - started
         
-        # حساب عدد الطلبة لكل قناة في البيانات الحالية
-        channel_counts = self.df['channel'].apply(Rules.get_normalized_channel).value_counts()
-        
-        total_students = len(self.df)
-        if total_students > 0:
-            # القنوات التي يجب التحقق منها (غير المركزي)
-            for ch_name in ['الموازي', 'ذوي الشهداء']:
-                count = channel_counts.get(ch_name, 0)
-                
-                # إذا لم يوجد أي طالب في هذه القناة، وكانت لها نسبة محجوزة
-                if count == 0 and self.quotas.get(ch_name, 0) > 0:
-                    transfer_amount = self.quotas[ch_name]
-                    # تصفير حصة القناة الفارغة
-                    self.quotas[ch_name] = 0.0
-                    # إضافة الحصة إلى المركزي
-                    self.quotas['مركزي'] = self.quotas.get('مركزي', 0) + transfer_amount
-                    # print(f"Smart Balancing: Transferred {transfer_amount*100}% from {ch_name} to Central due to zero demand.")
+        # خطة المقاعد (تتضمن موازنة الحصص الذكية) إذا لم تُحسب السعات مسبقاً
+        if self.plan is None:
+            self._build_plan()
+
+        report = progress if progress else (lambda stage, fraction: None)
+        if self.engine == 'reference':
+            return self._distribute_reference(report)
+        return self._distribute_vectorized(report)
+
+    @staticmethod
+    def sort_order(df):
+        """
+        مواقع الطلبة مرتبة تنازلياً حسب المعدل (مطابقة لترتيب df.sort_values).
+        يتم نسخ عمود المعدل فقط، لا الجدول كاملاً.
+
+        Returns:
+            ndarray: مواقع الصفوف (int64) بالترتيب.
+        """
+        averages = pd.Series(df['average'].to_numpy())
+        return averages.sort_values(ascending=False).index.to_numpy(dtype=np.int64)
+
+    def _distribute_reference(self, report):
+        """
+        المحرك المرجعي (Reference Engine)
 
+        التنفيذ الأصلي المعتمد على iterrows و _check_capacity.
+        بطيء على الملفات الكبيرة، لكنه يبقى المرجع لاختبارات التطابق مع المحرك السريع.
+        """
         assigned_results = {} # النتائج: {رقم_الطالب: القسم}
+
+        # المحرك المرجعي يعمل على نسخة مرتبة (ليس مساراً سريعاً، فالنسخة مقبولة هنا)
+        sorted_df = self.df.take(self.order)
         
         # 2. حلقة التوزيع الرئيسية (Main Pass)
-        for index, row in self.df.iterrows():
+        report('main_pass', 0.0)
+        started = time.perf_counter()
+        for index, row in sorted_df.iterrows():
             student_id = row['id']
             # تحديد قناة الطالب (توحيد الاسم)
             channel = Rules.get_normalized_channel(row['channel'])
@@ -199,6 +309,7 @@ class Distributor:
                 if self._check_capacity(choice, channel):
                     # حجز المقعد
                     self.dept_channel_usage[choice][channel] += 1
+                    self.dept_usage_total[choice] += 1
                     assigned_dept = choice
                     
                     # تسجيل أدنى معدل (للأغراض الإحصائية + استثناء أبناء الأساتذة)
@@ -210,12 +321,16 @@ class Distributor:
             
             assigned_results[student_id] = assigned_dept
 
+        report('main_pass', 1.0)
+        self.timings['main_pass'] = time.perf_counter() - started
+        started = time.perf_counter()
+
         # 3. دورة ملء الشواغر (Vacancies Fill Pass) - [New Logic]
         # في حال بقيت مقاعد شاغرة (لأن طلاب الموازي/الشهداء لم يملؤوا حصتهم)،
         # نقوم بتوزيع الطلاب غير المقبولين على هذه المقاعد المتبقية بغض النظر عن الحصة.
         # هذا يضمن عدم ضياع المقاعد (100% إشغال).
         
-        for index, row in self.df.iterrows():
+        for index, row in sorted_df.iterrows():
             student_id = row['id']
             # إذا تم قبوله مسبقاً، تجاوز
             if student_id in assigned_results and assigned_results[student_id] is not None:
@@ -226,15 +341,14 @@ class Distributor:
             
             for choice in choices:
                 if not choice or pd.isna(choice): continue
-                if choice not in self.capacities: continue
+                if choice not in self.plan: continue
                 
                 # التحقق من السعة الكلية فقط (Actual Physical Capacity)
-                total_limit = self.capacities[choice]
-                current_total_usage = sum(self.dept_channel_usage[choice].values())
-                
-                if current_total_usage < total_limit:
+                # العداد الإجمالي يُحدث مع كل حجز، فلا حاجة لجمع عدادات القنوات
+                if self.dept_usage_total[choice] < self.plan.total(choice):
                     # يوجد مقعد شاغر! قم بتعيينه للطالب
                     self.dept_channel_usage[choice][channel] += 1
+                    self.dept_usage_total[choice] += 1
                     assigned_results[student_id] = choice
                     
                     # تحديث الحد الأدنى للمركزي إذا لزم الأمر
@@ -243,33 +357,445 @@ class Distributor:
                             self.dept_min_scores[choice] = row['average']
                     break
 
+        report('vacancy_pass', 1.0)
+        self.timings['vacancy_pass'] = time.perf_counter() - started
+        started = time.perf_counter()
+
         # 4. حلقة معالجة الاستثناءات (Exception Pass - Faculty Children)
-        # نعيد المرور على الطلبة لتطبيق قاعدة "ابن التدريسي".
+        # نمر على أبناء التدريسيين فقط (فهرس مسبق) لتطبيق قاعدة "ابن التدريسي".
         # يتم التحقق مما إذا كان الطالب يستحق قسماً أفضل مما حصل عليه (أو إذا لم يقبل أصلاً).
-        
-        for index, row in self.df.iterrows():
+        # ملاحظة: هذا الاستثناء يتجاوز السعة (Overload Injection)، ويُسجل في العدادات:
+        # يُحرر مقعد الطالب في قسمه السابق ويُضاف إلى القسم الجديد، مع عداد للتجاوزات.
+        faculty_df = sorted_df[sorted_df['is_faculty_child'].to_numpy(dtype=bool)]
+        for index, row in faculty_df.iterrows():
             student_id = row['id']
-            
-            # التحقق فقط إذا لم يتم قبوله (أو يمكن تحسين منطقه - هنا نركز على غير المقبولين والمقبولين برغبة دنيا)
-            # للتبسيط الحالي، الكود الأصلي يتحقق من غير المقبولين، 
-            # لكن التحسين المنطقي هو التحقق من "الترقية" (Upgrade) أيضاً.
-            # سنستخدم الدالة المساعدة في Rules.
-            
-            # هل يستحق الترقية؟
-            # ملاحظة: هذا الاستثناء يتجاوز السعة (Overload Injection)
-            if row['is_faculty_child']:
-               better_choice = Rules.apply_faculty_child_exception(row, self.dept_min_scores)
-               
-               # إذا وجد خيار أفضل مما هو معين له حالياً (بافتراض أن assigned_dept هو None أو رغبة أدنى)
-               # هنا، ببساطة إذا وجدنا استحقاقاً سنعتمده فوراً.
-               if better_choice:
-                   # هل هذا الخيار أفضل من الحالي؟ (تحتاج منطق مقارنة ترتيب الرغبات)
-                   # الكود الحالي يفترض التعيين إذا لم يكن معيناً، لنلتزم بالمنطق الأساسي المعدل:
-                   current = assigned_results.get(student_id)
-                   
-                   # إذا لم يكن مقبولاً أو كان مقبولاً في رغبة أدنى (يمكن إضافتها لاحقاً)
-                   # حالياً: سنطبق الاستثناء بقوة التجاوز
-                   assigned_results[student_id] = better_choice
-                   # print(f"Faculty Child Exception Applied: {row['name']} -> {better_choice}")
+            better_choice = Rules.apply_faculty_child_exception(row, self.dept_min_scores)
+
+            # إذا وجدنا استحقاقاً نعتمده فوراً (بقوة التجاوز)
+            if better_choice:
+                current = assigned_results.get(student_id)
+                if better_choice != current:
+                    channel = Rules.get_normalized_channel(row['channel'])
+                    if current:
+                        self.dept_channel_usage[current][channel] -= 1
+                        self.dept_usage_total[current] -= 1
+                    self.dept_channel_usage[better_choice][channel] += 1
+                    self.dept_usage_total[better_choice] += 1
+                    self.dept_overloads[better_choice] += 1
+                assigned_results[student_id] = better_choice
 
+        report('exception_pass', 1.0)
+        self.timings['exception_pass'] = time.perf_counter() - started
         return assigned_results
+
+    def _encode_choices(self, depts):
+        """
+        ترميز أعمدة الرغبات كأعداد صحيحة (Choice Encoding)
+
+        كل رغبة تتحول إلى فهرس القسم في قائمة depts، و -1 للرغبة الفارغة
+        أو للقسم غير الموجود في السعات (نفس حالات التجاوز في المحرك المرجعي).
+
+        Returns:
+            ndarray: مصفوفة (عدد الطلبة × 3).
+        """
+        columns = [self.df[col] for col in DataLoader.CHOICE_COLUMNS]
+        dtype = columns[0].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and all(c.dtype == dtype for c in columns):
+            # الأعمدة فئوية بقاموس مشترك (من DataLoader): تحويل رموز القاموس إلى فهارس depts
+            # عبر جدول بحث واحد، والرمز -1 (القيمة المفقودة) يقابل آخر عنصر في الجدول
+            lookup = np.append(pd.Index(depts).get_indexer(dtype.categories), -1).astype(np.int64)
+            choice_codes = np.column_stack([lookup[c.cat.codes.to_numpy()] for c in columns])
+        else:
+            choice_codes = np.column_stack([
+                pd.Categorical(c, categories=depts).codes.astype(np.int64) for c in columns
+            ])
+
+        # الرغبات ذات القيمة "الفارغة" منطقياً (مثل 0) يتجاوزها المحرك المرجعي أيضاً
+        falsy = [i for i, d in enumerate(depts) if not d]
+        if falsy:
+            choice_codes[np.isin(choice_codes, falsy)] = -1
+        return choice_codes
+
+    def _distribute_vectorized(self, report):
+        """
+        المحرك السريع (Vectorized, Integer-Coded Engine)
+
+        الخطوات:
+        1. ترميز الأقسام والقنوات كأعداد صحيحة صغيرة مرة واحدة.
+        2. قراءة جدول حدود المقاعد (قسم × قناة) من خطة المقاعد بدلاً من إعادة حساب floor عند كل فحص.
+        3. تنفيذ نفس الدورات الثلاث (الأساسية، الشواغر، الاستثناءات) على مصفوفات بسيطة.
+
+        أثناء الدورة الأساسية تُحفظ نقاط استئناف (Checkpoints) تسمح لـ redistribute
+        بإعادة التوزيع بعد تعديل السعات أو النسب دون البدء من أول الترتيب.
+
+        Returns:
+            dict: {id: AssignedDepartment} مطابق لنتيجة المحرك المرجعي.
+        """
+        started = time.perf_counter()
+        state = self._prepare_state()
+        self._state = state
+        self.timings['prepare'] = time.perf_counter() - started
+
+        self._main_pass(state, 0, report)
+        assigned = self._finish_passes(state, report)
+        state['final'] = assigned
+
+        depts = state['depts']
+        return {student_id: (depts[d] if d >= 0 else None) for student_id, d in zip(state['ids'], assigned.tolist())}
+
+    def _prepare_state(self):
+        """
+        ترميز بيانات الطلبة (بترتيب self.order) وتجهيز حالة المحرك السريع.
+        الترميز يُحفظ كمصفوفات NumPy مضغوطة، ويُحوّل لقوائم بايثون عند كل دورة فقط.
+        """
+        plan = self.plan
+        depts = list(plan.departments)
+        channels = list(plan.channels)
+
+        # القناة الموحدة (عمود فئوي) تتحول لفهارس قنوات الخطة عبر جدول بحث صغير
+        channel_lookup = np.array([plan.channel_index[ch] for ch in Rules.CHANNELS], dtype=np.int64)
+        order = self.order
+        channel_codes = channel_lookup[Rules.normalize_channels(self.df['channel']).cat.codes.to_numpy()[order]]
+        num_slots = len(depts) * len(channels)
+
+        return {
+            'depts': depts,
+            'channels': channels,
+            'central': plan.channel_index['مركزي'],
+            'ids': self.df['id'].to_numpy()[order].tolist(),
+            'choices': self._encode_choices(depts)[order],
+            'channel_codes': channel_codes,
+            'averages': self.df['average'].to_numpy(dtype=np.float64)[order],
+            'faculty_rows': np.flatnonzero(self.df['is_faculty_child'].to_numpy(dtype=bool)[order]),
+            'limit_flat': plan.limits.ravel().tolist(),
+            'cap_list': plan.totals.tolist(),
+            # حالة الدورة الأساسية (تُبنى في _main_pass)
+            'assigned': [],
+            'checkpoints': [], # [(usage_flat, dept_totals, min_scores)] عند بداية كل دفعة
+            'taken': [[] for _ in range(num_slots)], # مواقع حجز مقاعد كل (قسم، قناة) بالترتيب
+            'first_reject': [-1] * num_slots, # أول موقع رُفض فيه طالب لامتلاء (قسم، قناة)
+            'vacancy': None, # مدخلات ونتيجة آخر دورة شواغر (تُبنى في _finish_passes)
+            'final': None
+        }
+
+    def _main_pass(self, state, start, report):
+        """
+        حلقة التوزيع الرئيسية (Main Pass) بدءاً من الموقع start في الترتيب.
+
+        الحلقة تعمل على قوائم مسطحة (dept * num_channels + channel)
+        لأن الوصول لعناصر NumPy مفردة من بايثون أبطأ من القوائم العادية.
+        تتم على دفعات (CHECKPOINT_INTERVAL): عند بداية كل دفعة تُحفظ نسخة من العدادات
+        ويُرسل تقرير التقدم، فلا توجد كلفة إضافية داخل الحلقة سوى تسجيل مواقع الحجز والرفض.
+
+        Args:
+            start (int): موقع البداية، يجب أن يكون بداية دفعة (مضاعف CHECKPOINT_INTERVAL).
+        """
+        started = time.perf_counter()
+        interval = self.CHECKPOINT_INTERVAL
+        block = start // interval
+        num_channels = len(state['channels'])
+        central = state['central']
+        limit_flat = state['limit_flat']
+        taken = state['taken']
+        first_reject = state['first_reject']
+
+        # استعادة العدادات من نقطة الاستئناف، وحذف كل ما سُجل بعدها
+        if block == 0:
+            num_depts = len(state['depts'])
+            usage_flat = [0] * (num_depts * num_channels)
+            dept_totals = [0] * num_depts
+            min_scores = [100.0] * num_depts
+        else:
+            usage, totals, mins = state['checkpoints'][block]
+            usage_flat, dept_totals, min_scores = usage[:], totals[:], mins[:]
+        del state['checkpoints'][block:]
+        for positions in taken:
+            while positions and positions[-1] >= start:
+                positions.pop()
+        for slot, position in enumerate(first_reject):
+            if position >= start:
+                first_reject[slot] = -1
+
+        choice_rows = state['choices'][start:].tolist()
+        channel_list = state['channel_codes'][start:].tolist()
+        average_list = state['averages'][start:].tolist()
+        num_rows = len(state['ids'])
+        assigned = state['assigned'][:start] + [-1] * (num_rows - start)
+
+        for block_start in range(start, num_rows, interval):
+            state['checkpoints'].append((usage_flat[:], dept_totals[:], min_scores[:]))
+            report('main_pass', block_start / num_rows)
+            for i in range(block_start, min(block_start + interval, num_rows)):
+                k = i - start
+                ch = channel_list[k]
+                for d in choice_rows[k]:
+                    if d < 0:
+                        continue
+                    slot = d * num_channels + ch
+                    if usage_flat[slot] < limit_flat[slot]:
+                        usage_flat[slot] += 1
+                        dept_totals[d] += 1
+                        assigned[i] = d
+                        taken[slot].append(i)
+                        if ch == central and average_list[k] < min_scores[d]:
+                            min_scores[d] = average_list[k]
+                        break
+                    if first_reject[slot] < 0:
+                        first_reject[slot] = i
+        report('main_pass', 1.0)
+        self.timings['main_pass'] = time.perf_counter() - started
+
+        state['assigned'] = assigned
+        state['main_counters'] = (usage_flat, dept_totals, min_scores)
+
+    def _finish_passes(self, state, report, previous=None):
+        """
+        دورتا الشواغر والاستثناءات بعد الدورة الأساسية، على نسخة من عداداتها
+        (لتبقى نتيجة الدورة الأساسية صالحة لإعادة التوزيع لاحقاً).
+
+        Args:
+            previous (dict, optional): مدخلات ونتيجة دورة الشواغر السابقة (state['vacancy'])،
+                لإعادتها على الطلبة المتأثرين فقط (عند redistribute).
+
+        Returns:
+            ndarray: رمز القسم المقبول لكل طالب بالترتيب (-1 لغير المقبول).
+        """
+        started = time.perf_counter()
+        num_channels = len(state['channels'])
+        central = state['central']
+        depts = state['depts']
+
+        usage_flat, dept_totals, mins = state['main_counters']
+        main_assigned = np.array(state['assigned'], dtype=np.int64)
+
+        choices = state['choices']
+        channel_codes = state['channel_codes']
+        averages = state['averages']
+
+        # 4. دورة ملء الشواغر (Vacancies Fill Pass) - على غير المقبولين فقط
+        candidates = main_assigned < 0
+        seats = self._vacancy_pass(state, candidates, dept_totals, previous)
+        state['vacancy'] = {'candidates': candidates, 'seats': seats, 'totals': dept_totals, 'caps': state['cap_list']}
+
+        # تسجيل مقاعد الشواغر في العدادات دفعة واحدة
+        rows = np.flatnonzero(seats >= 0)
+        seat_depts = seats[rows]
+        seat_channels = channel_codes[rows]
+        usage = np.array(usage_flat, dtype=np.int64)
+        np.add.at(usage, seat_depts * num_channels + seat_channels, 1)
+        totals = np.array(dept_totals, dtype=np.int64) + np.bincount(seat_depts, minlength=len(depts))
+        min_scores = np.array(mins, dtype=np.float64)
+        central_seats = seat_channels == central
+        np.minimum.at(min_scores, seat_depts[central_seats], averages[rows][central_seats])
+        assigned = np.where(candidates, seats, main_assigned)
+
+        report('vacancy_pass', 1.0)
+        self.timings['vacancy_pass'] = time.perf_counter() - started
+        started = time.perf_counter()
+
+        # 5. حلقة الاستثناءات (Exception Pass - Faculty Children)
+        # الحد الأدنى للقبول لا يتغير خلال هذه الدورة، فتُفحص الشروط لجميع أبناء التدريسيين
+        # ولجميع رغباتهم دفعة واحدة: معدل الطالب >= (أقل معدل مركزي للقسم - 5)
+        overloads = np.zeros(len(depts), dtype=np.int64)
+
+        rows = state['faculty_rows']
+        if len(rows) and len(depts):
+            row_choices = choices[rows]
+            thresholds = min_scores[np.maximum(row_choices, 0)] - 5
+            eligible = (row_choices >= 0) & (averages[rows][:, None] >= thresholds)
+            has_choice = eligible.any(axis=1)
+            rows = rows[has_choice]
+            better = row_choices[has_choice, eligible[has_choice].argmax(axis=1)]
+
+            # تسجيل التجاوزات في العدادات: تحرير المقعد السابق وحجز القسم الجديد
+            current = assigned[rows]
+            moved = better != current
+            channels_moved = channel_codes[rows][moved]
+            previous_depts = current[moved]
+            had_seat = previous_depts >= 0
+            np.add.at(usage, previous_depts[had_seat] * num_channels + channels_moved[had_seat], -1)
+            np.add.at(totals, previous_depts[had_seat], -1)
+            np.add.at(usage, better[moved] * num_channels + channels_moved, 1)
+            np.add.at(totals, better[moved], 1)
+            np.add.at(overloads, better[moved], 1)
+
+            assigned[rows] = better
+        report('exception_pass', 1.0)
+        self.timings['exception_pass'] = time.perf_counter() - started
+
+        # مزامنة العدادات مع الحالة المعتمدة في الكلاس (لبقية المستهلكين)
+        self.usage = usage.reshape(len(depts), num_channels)
+        for d, dept in enumerate(depts):
+            self.dept_channel_usage[dept] = {ch: int(self.usage[d, c]) for c, ch in enumerate(state['channels'])}
+            self.dept_usage_total[dept] = int(totals[d])
+            self.dept_min_scores[dept] = float(min_scores[d])
+            self.dept_overloads[dept] = int(overloads[d])
+
+        return assigned
+
+    def _vacancy_pass(self, state, candidates, main_totals, previous=None):
+        """
+        دورة ملء الشواغر: القسم الذي يحجزه كل طالب لم يُقبل في الدورة الأساسية (حسب الترتيب)
+        في أول رغبة ما زال عدد مقاعدها المشغولة أقل من سعتها.
+
+        القسم الممتلئ بعد الدورة الأساسية يبقى ممتلئاً، فالطلبة الذين امتلأت جميع رغباتهم
+        يُستبعدون دفعة واحدة دون المرور عليهم.
+
+        مع previous (نتيجة الدورة السابقة، عند redistribute) يُعاد القرار فقط للطلبة الذين لم يكونوا
+        مرشحين سابقاً، أو الذين تتضمن رغباتهم قسماً متأثراً: تغيرت سعته أو عداده بعد الدورة الأساسية
+        (ما لم يكن ممتلئاً في المرتين)، أو تغير قرار شاغر فيه. بقية الطلبة يأخذون قرارهم السابق،
+        لأن عدادات رغباتهم حتى موقعهم لم تتغير.
+
+        Returns:
+            ndarray: رمز القسم لكل طالب بالترتيب (-1 لمن لم يحجز مقعداً في هذه الدورة).
+        """
+        cap_list = state['cap_list']
+        choices = state['choices']
+        num_depts = len(cap_list)
+        seats = np.full(len(candidates), -1, dtype=np.int64)
+
+        # الأقسام التي فيها شواغر بعد الدورة الأساسية (العنصر الأخير يقابل الرغبة الفارغة -1)
+        vacant = np.append(np.array(main_totals) < np.array(cap_list), False)
+        rows = np.flatnonzero(candidates & vacant[choices].any(axis=1))
+        row_choices = choices[rows].tolist()
+
+        if previous is None:
+            dept_totals = list(main_totals)
+            row_seats = [-1] * len(rows)
+            for k, choice_list in enumerate(row_choices):
+                for d in choice_list:
+                    if d < 0:
+                        continue
+                    if dept_totals[d] < cap_list[d]:
+                        dept_totals[d] += 1
+                        row_seats[k] = d
+                        break
+            seats[rows] = row_seats
+            return seats
+
+        previous_seats = previous['seats']
+        kept = candidates & previous['candidates'] # مرشحون في المرتين
+        kept_rows = rows[kept[rows]]
+        seats[kept_rows] = previous_seats[kept_rows]
+
+        # الأقسام المتأثرة من البداية
+        previous_totals = np.array(previous['totals'])
+        previous_caps = np.array(previous['caps'])
+        was_vacant = np.append(previous_totals < previous_caps, False)
+        dirty = (vacant | was_vacant) & np.append(
+            (np.array(main_totals) != previous_totals) | (np.array(cap_list) != previous_caps), False)
+        # ومقاعد الطلبة الذين لم يعودوا يحجزون مقعداً سابقاً (قُبلوا في الدورة الأساسية أو امتلأت رغباتهم)
+        released = previous['candidates'] & (previous_seats >= 0)
+        released[kept_rows] = False
+        dirty[previous_seats[released]] = True
+        dirty = dirty.tolist()
+
+        # عداد القسم غير المتأثر عند الموقع i = عداده بعد الدورة الأساسية + مقاعده السابقة قبل i
+        seated = np.flatnonzero(previous_seats >= 0)
+        by_dept = np.argsort(previous_seats[seated], kind='stable')
+        bounds = np.searchsorted(previous_seats[seated][by_dept], np.arange(num_depts + 1))
+        seated = seated[by_dept]
+
+        def seat_count(d, i):
+            return main_totals[d] + int(np.searchsorted(seated[bounds[d]:bounds[d + 1]], i))
+
+        # عدادات الأقسام المتأثرة (تُحدّث بقرارات الطلبة المعاد توزيعهم فقط)
+        running = {d: main_totals[d] for d in range(num_depts) if dirty[d]}
+
+        for i, choice_list, was_kept, old in zip(rows.tolist(), row_choices, kept[rows].tolist(),
+                                                 previous_seats[rows].tolist()):
+            if was_kept and not any(dirty[d] for d in choice_list):
+                continue
+            seat = -1
+            for d in choice_list:
+                if d < 0:
+                    continue
+                if (running[d] if dirty[d] else seat_count(d, i)) < cap_list[d]:
+                    seat = d
+                    break
+            seats[i] = seat
+            if not was_kept:
+                old = -1
+
+            # تغير القرار: القسمان السابق والجديد يصبحان متأثرين من هذا الموقع
+            if seat != old:
+                for d in (old, seat):
+                    if d >= 0 and not dirty[d]:
+                        running[d] = seat_count(d, i)
+                        dirty[d] = True
+            if seat >= 0 and dirty[seat]:
+                running[seat] += 1
+        return seats
+
+    def _first_affected_position(self, state, new_limits):
+        """
+        أول موقع في الترتيب قد يتغير قراره بعد تعديل حدود المقاعد.
+
+        لكل (قسم، قناة) تغير حدها:
+        - زيادة الحد: أول طالب رُفض لامتلاء هذه الخانة قد يُقبل الآن.
+        - تقليل الحد إلى L: الطالب الذي حجز المقعد رقم L+1 لن يجده الآن.
+        قبل هذا الموقع تبقى جميع قرارات الدورة الأساسية كما هي تماماً.
+
+        Returns:
+            int أو None إذا لم يتأثر أي قرار في الدورة الأساسية.
+        """
+        position = None
+        for slot, (old, new) in enumerate(zip(state['limit_flat'], new_limits)):
+            if new > old:
+                candidate = state['first_reject'][slot]
+            elif new < old and len(state['taken'][slot]) > new:
+                candidate = state['taken'][slot][new]
+            else:
+                continue
+            if candidate >= 0 and (position is None or candidate < position):
+                position = candidate
+        return position
+
+    def redistribute(self, mode='EQUAL', input_value=None, quotas=None, progress=None):
+        """
+        إعادة التوزيع التزايدية (Incremental Re-distribution)
+
+        بعد تعديل السعات أو نسب القبول، تُستأنف الدورة الأساسية من أقرب نقطة استئناف
+        قبل أول موقع متأثر بدلاً من إعادة التوزيع كاملاً، ثم تُعاد دورة الشواغر للطلبة المتأثرين فقط
+        (راجع _vacancy_pass) ودورة الاستثناءات (على أبناء التدريسيين فقط). النتيجة مطابقة لتوزيع كامل بالإعدادات الجديدة.
+
+        Args:
+            mode (str): 'EQUAL' أو 'MANUAL'.
+            input_value (int/dict): إجمالي المقاعد أو قاموس السعات.
+            quotas (dict, optional): نسب القبول الجديدة (الافتراضي: النسب الحالية).
+            progress (callable, optional): دالة تقرير التقدم (كما في distribute).
+
+        Returns:
+            dict: {id: AssignedDepartment} للطلبة الذين تغير قبولهم فقط.
+
+        Raises:
+            RuntimeError: إذا لم يُنفذ distribute مسبقاً بالمحرك السريع.
+        """
+        state = self._state
+        if state is None or state['final'] is None:
+            raise RuntimeError("redistribute requires a previous distribute() with the vectorized engine")
+
+        report = progress if progress else (lambda stage, fraction: None)
+        self.timings = {}
+        if quotas:
+            self.requested_quotas = dict(quotas)
+        self.calculate_capacities(mode, input_value)
+
+        # حدود المقاعد الجديدة بنفس ترتيب القنوات المرمزة في الحالة المحفوظة
+        plan = self.plan
+        new_limits = [plan.limit(dept, ch) for dept in state['depts'] for ch in state['channels']]
+
+        start = self._first_affected_position(state, new_limits)
+        state['limit_flat'] = new_limits
+        state['cap_list'] = plan.totals.tolist()
+        if start is not None:
+            self._main_pass(state, start - start % self.CHECKPOINT_INTERVAL, report)
+
+        previous = state['final']
+        assigned = self._finish_passes(state, report, previous=state['vacancy'])
+        state['final'] = assigned
+
+        depts = state['depts']
+        ids = state['ids']
+        changed = np.flatnonzero(previous != assigned)
+        return {ids[i]: (depts[d] if d >= 0 else None) for i, d in zip(changed.tolist(), assigned[changed].tolist())}
@@ -8,6 +8,7 @@ Proprietary and confidential.
 """
 
 import pandas as pd
+import datetime
 import io
 
 class Exporter:
@@ -22,20 +23,34 @@ class Exporter:
     - تمييز الطلاب غير المقبولين باللون الأحمر (Conditional Formatting).
     """
 
+    SHEET_NAME = 'توزيع الطلبة'
+    PLAN_SHEET_NAME = 'خطة المقاعد'
+    RESULT_COLUMN = 'القسم المقبول'
+    UNASSIGNED_LABEL = 'غير مقبول'
+
+    # عدد الصفوف التي تتم معالجتها في كل دفعة في وضع الكتابة المتدفقة
+    STREAM_CHUNK_SIZE = 10_000
+
     @staticmethod
-    def export_to_buffer(original_df, results_map):
+    def export_to_buffer(original_df, results_map, capacity_plan=None, streaming=False):
         """
         تصدير البيانات إلى ذاكرة (Buffer) بتنسيق إكسل متقدم.
         
         Args:
             original_df (DataFrame): البيانات الأصلية.
             results_map (dict): نتائج التوزيع {id: assigned_dept}.
+            capacity_plan (dict, optional): خطة المقاعد المستخدمة (CapacityPlan.to_dict) لعرضها في ورقة مستقلة.
+            streaming (bool): استخدام وضع الكتابة المتدفقة بذاكرة ثابتة (export_streaming).
             
         Returns:
             BytesIO: ملف الإكسل كـ Binary Stream.
         """
+        if streaming:
+            return Exporter.export_streaming(original_df, results_map, capacity_plan)
+
         # 1. دمج النتائج مع البيانات الأصلية
-        output_df = original_df.copy()
+        # نسخة سطحية: إضافة عمود النتيجة لا تعدل الجدول الأصلي ولا تنسخ بقية أعمدته
+        output_df = original_df.copy(deep=False)
         output_df['القسم المقبول'] = output_df['ت'].map(results_map)
         output_df['القسم المقبول'] = output_df['القسم المقبول'].fillna('غير مقبول')
 
@@ -56,29 +71,8 @@ class Exporter:
         # تنسيق عام: اتجاه النص من اليمين لليسار
         worksheet.right_to_left() 
         
-        # تنسيق الترويسة (Header Format)
-        header_fmt = workbook.add_format({
-            'bold': True,
-            'text_wrap': True,
-            'valign': 'vcenter',
-            'align': 'center',
-            'fg_color': '#4F81BD', # أزرق احترافي
-            'font_color': '#FFFFFF', # نص أبيض
-            'border': 1
-        })
-        
-        # تنسيق الخلايا العادية (Center Alignment)
-        cell_fmt = workbook.add_format({
-            'valign': 'vcenter',
-            'align': 'center',
-            'border': 1
-        })
-        
-        # تنسيق التحذير (للطلاب غير المقبولين)
-        warning_fmt = workbook.add_format({
-            'bg_color': '#FFC7CE', # أحمر فاتح
-            'font_color': '#9C0006' # نص أحمر غامق
-        })
+        # التنسيقات المشتركة مع export_streaming و export_sheets (الترويسة، الخلايا، التحذير لغير المقبولين)
+        header_fmt, cell_fmt, _, warning_fmt = Exporter._add_formats(workbook)
 
         # 5. تطبيق التنسيقات على الأعمدة
         
@@ -105,8 +99,203 @@ class Exporter:
             'format': warning_fmt
         })
 
-        # 7. إغلاق وحفظ الملف
+        # 7. ورقة خطة المقاعد (Capacity Plan Sheet)
+        if capacity_plan:
+            Exporter._write_capacity_plan(workbook, capacity_plan, header_fmt, cell_fmt)
+
+        # 8. إغلاق وحفظ الملف
         writer.close()
         output.seek(0)
         
         return output
+
+    @staticmethod
+    def _add_formats(workbook):
+        """إنشاء التنسيقات المشتركة (الترويسة، الخلايا، التحذير، التاريخ)."""
+        header_fmt = workbook.add_format({
+            'bold': True,
+            'text_wrap': True,
+            'valign': 'vcenter',
+            'align': 'center',
+            'fg_color': '#4F81BD',
+            'font_color': '#FFFFFF',
+            'border': 1
+        })
+        cell_fmt = workbook.add_format({
+            'valign': 'vcenter',
+            'align': 'center',
+            'border': 1
+        })
+        date_fmt = workbook.add_format({
+            'valign': 'vcenter',
+            'align': 'center',
+            'border': 1,
+            'num_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        warning_fmt = workbook.add_format({
+            'bg_color': '#FFC7CE',
+            'font_color': '#9C0006'
+        })
+        return header_fmt, cell_fmt, date_fmt, warning_fmt
+
+    @staticmethod
+    def export_streaming(original_df, results_map, capacity_plan=None, output=None):
+        """
+        تصدير متدفق بذاكرة ثابتة (Streaming, Constant-Memory Export)
+
+        نفس تنسيق export_to_buffer، لكن:
+        - يستخدم خيار constant_memory في xlsxwriter، فيُكتب كل صف إلى القرص المؤقت فور اكتماله.
+        - لا يتم إنشاء نسخة مدمجة من الجدول، بل يُحسب عمود النتيجة لكل دفعة صفوف على حدة.
+        - عرض الأعمدة يُحسب أثناء نفس دورة الكتابة (Single Pass) ويُطبق في النهاية.
+
+        Args:
+            original_df (DataFrame): البيانات الأصلية.
+            results_map (dict): نتائج التوزيع {id: assigned_dept}.
+            capacity_plan (dict, optional): خطة المقاعد المستخدمة لعرضها في ورقة مستقلة.
+            output (file-like, optional): وجهة الكتابة (الافتراضي BytesIO جديد).
+
+        Returns:
+            BytesIO: ملف الإكسل كـ Binary Stream.
+        """
+        import xlsxwriter
+
+        output = output if output is not None else io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        formats = Exporter._add_formats(workbook)
+        Exporter._write_results_sheet(workbook, Exporter.SHEET_NAME, original_df, results_map, formats)
+
+        # ورقة خطة المقاعد
+        if capacity_plan:
+            header_fmt, cell_fmt = formats[0], formats[1]
+            Exporter._write_capacity_plan(workbook, capacity_plan, header_fmt, cell_fmt)
+
+        workbook.close()
+        output.seek(0)
+        return output
+
+    @staticmethod
+    def export_sheets(sheets, output=None):
+        """
+        تصدير نتائج ملف متعدد الأوراق (ورقة لكل كلية) في ملف إكسل واحد بالكتابة المتدفقة.
+
+        لكل ورقة إدخال ورقة نتائج بنفس اسمها وبنفس تنسيق export_streaming،
+        ثم أوراق خطط المقاعد ("خطة المقاعد - اسم الورقة") بعد جميع أوراق النتائج.
+
+        Args:
+            sheets (list): [(اسم_الورقة, original_df, results_map, capacity_plan)] بترتيب الأوراق.
+            output (file-like, optional): وجهة الكتابة (الافتراضي BytesIO جديد).
+
+        Returns:
+            BytesIO: ملف الإكسل كـ Binary Stream.
+        """
+        import xlsxwriter
+
+        output = output if output is not None else io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        formats = Exporter._add_formats(workbook)
+        used = set()
+
+        for name, original_df, results_map, _ in sheets:
+            Exporter._write_results_sheet(workbook, Exporter._sheet_title(name, used), original_df, results_map, formats)
+
+        for name, _, _, capacity_plan in sheets:
+            if capacity_plan:
+                title = Exporter._sheet_title(f"{Exporter.PLAN_SHEET_NAME} - {name}", used)
+                Exporter._write_capacity_plan(workbook, capacity_plan, formats[0], formats[1], sheet_name=title)
+
+        workbook.close()
+        output.seek(0)
+        return output
+
+    @staticmethod
+    def _sheet_title(name, used):
+        """
+        اسم ورقة صالح وفريد في Excel: بدون الرموز غير المسموحة ([]:*?/ والشرطة العكسية) وبحد أقصى 31 حرفاً
+        (ويُضاف رقم عند التكرار، والمقارنة بدون حساسية لحالة الأحرف كما في Excel).
+        """
+        title = ''.join('_' if c in '[]:*?/\\' else c for c in str(name)).strip() or 'Sheet'
+        title = title[:31]
+        candidate, index = title, 2
+        while candidate.lower() in used:
+            suffix = f" ({index})"
+            candidate = title[:31 - len(suffix)] + suffix
+            index += 1
+        used.add(candidate.lower())
+        return candidate
+
+    @staticmethod
+    def _write_results_sheet(workbook, sheet_name, original_df, results_map, formats):
+        """
+        كتابة ورقة نتائج واحدة بالترتيب على دفعات (تُستخدم في export_streaming و export_sheets).
+
+        Args:
+            workbook: كتاب xlsxwriter (بوضع constant_memory، لذا تُكتب الصفوف بالترتيب).
+            sheet_name (str): اسم الورقة.
+            original_df (DataFrame): البيانات الأصلية.
+            results_map (dict): نتائج التوزيع {id: assigned_dept}.
+            formats (tuple): ناتج _add_formats.
+        """
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.right_to_left()
+        header_fmt, cell_fmt, date_fmt, warning_fmt = formats
+
+        # 1. الترويسة
+        headers = [str(c) for c in original_df.columns] + [Exporter.RESULT_COLUMN]
+        widths = [len(h) for h in headers]
+        for col_num, value in enumerate(headers):
+            worksheet.write(0, col_num, value, header_fmt)
+
+        # 2. كتابة الصفوف بالترتيب على دفعات
+        row_num = 0
+        total_rows = len(original_df)
+        for start in range(0, total_rows, Exporter.STREAM_CHUNK_SIZE):
+            chunk = original_df.iloc[start:start + Exporter.STREAM_CHUNK_SIZE]
+            assigned = chunk['ت'].map(results_map).fillna(Exporter.UNASSIGNED_LABEL).tolist()
+
+            for values, result in zip(chunk.itertuples(index=False, name=None), assigned):
+                row_num += 1
+                for col_num, value in enumerate(values + (result,)):
+                    # الخلايا الفارغة (NaN / None / NaT) تُترك فارغة مع تنسيق الخلية
+                    if value is None or value is pd.NA or value != value:
+                        worksheet.write_blank(row_num, col_num, None, cell_fmt)
+                        continue
+                    if isinstance(value, datetime.datetime):
+                        worksheet.write_datetime(row_num, col_num, value, date_fmt)
+                    else:
+                        worksheet.write(row_num, col_num, value, cell_fmt)
+                    length = len(str(value))
+                    if length > widths[col_num]:
+                        widths[col_num] = length
+
+        # 3. ضبط عرض الأعمدة (محسوب أثناء الكتابة)
+        for col_num, width in enumerate(widths):
+            worksheet.set_column(col_num, col_num, width + 2)
+
+        # 4. تنسيق شرطي لتمييز غير المقبولين (عمود النتيجة هو الأخير)
+        result_col_idx = len(headers) - 1
+        worksheet.conditional_format(1, result_col_idx, total_rows, result_col_idx, {
+            'type': 'text',
+            'criteria': 'containing',
+            'value': Exporter.UNASSIGNED_LABEL,
+            'format': warning_fmt
+        })
+
+    @staticmethod
+    def _write_capacity_plan(workbook, capacity_plan, header_fmt, cell_fmt, sheet_name=None):
+        """
+        كتابة ورقة "خطة المقاعد" التي توضح تقسيم مقاعد كل قسم على القنوات كما استخدمه الموزع.
+        """
+        worksheet = workbook.add_worksheet(sheet_name or Exporter.PLAN_SHEET_NAME)
+        worksheet.right_to_left()
+
+        channels = capacity_plan.get('channels', [])
+        headers = ['القسم', 'السعة الكلية'] + [f"{ch} ({capacity_plan['quotas'].get(ch, 0) * 100:g}%)" for ch in channels]
+        for col_num, value in enumerate(headers):
+            worksheet.write(0, col_num, value, header_fmt)
+            worksheet.set_column(col_num, col_num, max(len(value), 12) + 2, cell_fmt)
+
+        for row_num, dept in enumerate(capacity_plan.get('departments', []), start=1):
+            worksheet.write(row_num, 0, dept['name'])
+            worksheet.write(row_num, 1, dept['capacity'])
+            for col_num, ch in enumerate(channels, start=2):
+                worksheet.write(row_num, col_num, dept['seats'].get(ch, 0))
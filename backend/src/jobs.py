@@ -0,0 +1,180 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class Job:
+    """
+    مهمة توزيع غير متزامنة (Asynchronous Distribution Job)
+
+    تحتفظ بحالة المهمة ومرحلتها الحالية ونسبة الإنجاز، ومعرف العملية (run_id) عند الانتهاء.
+    الحالات: queued → running → done / failed.
+    on_change (اختياري) يُستدعى عند تغير الحالة أو المرحلة (لحفظها خارج العملية).
+    """
+
+    # وزن كل مرحلة من إجمالي نسبة الإنجاز (المجموع 100)
+    STAGE_WEIGHTS = OrderedDict([
+        ('load', 20),
+        ('capacities', 5),
+        ('main_pass', 40),
+        ('vacancy_pass', 10),
+        ('exception_pass', 5),
+        ('export', 20)
+    ])
+
+    def __init__(self, on_change=None):
+        self.job_id = uuid.uuid4().hex
+        self.created_at = time.time()
+        self.finished_at = None
+        self.state = 'queued'
+        self.stage = None
+        self.percent = 0.0
+        self.run_id = None
+        self.result = None
+        self.error = None
+        self.on_change = on_change
+        self._lock = threading.Lock()
+
+    def report(self, stage, fraction):
+        """
+        تحديث التقدم (يُمرر كدالة progress إلى مراحل التوزيع).
+        النسبة الكلية = مجموع أوزان المراحل السابقة + جزء من وزن المرحلة الحالية.
+        """
+        done = 0
+        for name, weight in self.STAGE_WEIGHTS.items():
+            if name == stage:
+                break
+            done += weight
+        weight = self.STAGE_WEIGHTS.get(stage, 0)
+        with self._lock:
+            changed = stage != self.stage
+            self.stage = stage
+            # النسبة لا تتراجع (بعض المراحل قد تُتخطى)
+            self.percent = max(self.percent, round(done + weight * min(max(fraction, 0.0), 1.0), 1))
+        if changed:
+            self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "state": self.state,
+                "stage": self.stage,
+                "percent": self.percent,
+                "run_id": self.run_id,
+                "result": self.result,
+                "error": self.error
+            }
+
+class JobManager:
+    """
+    مدير المهام (Job Manager)
+
+    ينفذ مهام التوزيع على مجموعة محدودة من الخيوط (Bounded Thread Pool) داخل نفس العملية،
+    دون الحاجة إلى وسيط خارجي (Broker). المهام المنتهية تبقى متاحة للاستعلام حتى يتم حذفها
+    عند تجاوز الحد الأقصى للمهام المحفوظة (الأقدم أولاً).
+
+    مع store (مثل RunDatabase) تُحفظ حالة كل مهمة عند تغير حالتها أو مرحلتها،
+    فيمكن الاستعلام عنها (get_status) من أي عامل وليس فقط العامل الذي ينفذها.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, max_jobs=64, store=None):
+        """
+        Args:
+            max_workers (int): عدد المهام التي تُنفذ في نفس الوقت.
+            max_pending (int): أقصى عدد من المهام في الانتظار أو قيد التنفيذ.
+            max_jobs (int): أقصى عدد من المهام المحفوظة (بما فيها المنتهية).
+            store (optional): مخزن مشترك بين العمال، فيه save_job(job) و get_job(job_id).
+        """
+        self.max_pending = max_pending
+        self.max_jobs = max_jobs
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ssds-job')
+        self._jobs = OrderedDict() # {job_id: Job}
+        self._lock = threading.Lock()
+
+    def _active_count(self):
+        return sum(1 for job in self._jobs.values() if job.state in ('queued', 'running'))
+
+    def submit(self, func):
+        """
+        إضافة مهمة جديدة.
+
+        Args:
+            func (callable): دالة التنفيذ func(job)، تستدعي job.report للتقدم
+                وتعيد (run_id, result_dict).
+
+        Returns:
+            Job: المهمة الجديدة.
+
+        Raises:
+            RuntimeError: إذا كانت قائمة الانتظار ممتلئة.
+        """
+        with self._lock:
+            if self._active_count() >= self.max_pending:
+                raise RuntimeError("Job queue is full, please try again later")
+            job = Job(on_change=self.store.save_job if self.store is not None else None)
+            self._jobs[job.job_id] = job
+            self._evict()
+
+        job._changed()
+        self._executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job, func):
+        with job._lock:
+            job.state = 'running'
+        job._changed()
+        try:
+            run_id, result = func(job)
+            with job._lock:
+                job.run_id = run_id
+                job.result = result
+                job.percent = 100.0
+                job.state = 'done'
+        except Exception as e:
+            traceback.print_exc()
+            with job._lock:
+                job.error = str(e)
+                job.state = 'failed'
+        finally:
+            job.finished_at = time.time()
+            job._changed()
+
+    def _evict(self):
+        """حذف أقدم المهام المنتهية عند تجاوز الحد الأقصى (المهام الجارية لا تُحذف)."""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].state in ('done', 'failed'):
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_status(self, job_id):
+        """
+        حالة مهمة (Job.to_dict): من هذه العملية، أو من المخزن المشترك إذا نُفذت في عامل آخر.
+
+        Returns:
+            dict أو None إذا لم توجد.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.get_job(job_id) if self.store is not None else None
@@ -8,13 +8,17 @@ Proprietary and confidential.
 """
 
 import pandas as pd
+import importlib.util
+import io
 import os
+import numpy as np
+from src.rules import Rules
 
 class DataLoader:
     """
     كلاس تحميل ومعالجة البيانات (Data Loader Class)
     
-    هذا الكلاس مسؤول عن قراءة ملفات الإكسل، تنظيف البيانات، وتجهيزها للمعالجة بواسطة الموزع.
+    هذا الكلاس مسؤول عن قراءة ملفات الطلبة (Excel, CSV, Parquet, Arrow)، تنظيف البيانات، وتجهيزها للمعالجة بواسطة الموزع.
     يقوم بتحويل الأسماء العربية للأعمدة إلى مفاتيح إنجليزية داخلية لسهولة التعامل برمجياً.
     """
     
@@ -33,42 +37,208 @@ class DataLoader:
         'ملاحظات': 'notes'
     }
 
-    def __init__(self, file_path):
+    # ---------------------------------------------------------
+    # أنواع الأعمدة المعلنة مسبقاً (Declared Dtypes) - للوضع السريع
+    # ---------------------------------------------------------
+    # الأعمدة النصية تُقرأ كنصوص مباشرة بدل استنتاج النوع بعد القراءة.
+    # المعدل لا يُعلن هنا لأنه قد يحتوي على نصوص (مثل "غائب") ويتم تحويله لاحقاً بـ to_numeric.
+    TEXT_COLUMNS = ['اسم الطالب', 'قناة القبول', 'الاختيار الأول', 'الاختيار الثاني', 'الاختيار الثالث', 'ملاحظات']
+
+    # أعمدة الرغبات (تُخزن كأعمدة فئوية تشترك في قاموس أقسام واحد)
+    CHOICE_COLUMNS = ['choice_1', 'choice_2', 'choice_3']
+
+    SETTINGS_SHEET = 'Settings'
+    SETTINGS_SHEET_COLUMN = 'Sheet'
+
+    # أعمدة ورقة الطلبة (لاكتشاف أوراق الطلبة في الملفات متعددة الأوراق)
+    SHEET_REQUIRED_COLUMNS = ['ت', 'المعدل', 'الاختيار الأول']
+
+    # ---------------------------------------------------------
+    # صيغ الملفات المدعومة (Supported Input Formats)
+    # ---------------------------------------------------------
+    # يتم تحديد الصيغة من البايتات الأولى (Magic Bytes)، ثم من امتداد الملف.
+    FORMAT_EXTENSIONS = {
+        '.xlsx': 'excel', '.xlsm': 'excel', '.xls': 'excel',
+        '.csv': 'csv', '.txt': 'csv',
+        '.parquet': 'parquet', '.pq': 'parquet',
+        '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'
+    }
+    FORMAT_MAGIC = [
+        (b'PK\x03\x04', 'excel'),          # xlsx (ملف مضغوط ZIP)
+        (b'\xd0\xcf\x11\xe0', 'excel'),     # xls (OLE2)
+        (b'PAR1', 'parquet'),
+        (b'ARROW1', 'arrow'),              # Arrow IPC File / Feather v2
+        (b'\xff\xff\xff\xff', 'arrow'),     # Arrow IPC Stream
+    ]
+
+    # عدد الصفوف في كل دفعة عند قراءة CSV
+    CSV_CHUNK_SIZE = 100_000
+
+    def __init__(self, source, fast=False, filename=None, sheet=None):
         """
         تهيئة الكلاس.
         Args:
-            file_path (str): المسار الكامل لملف الإكسل المراد معالجته.
+            source (str | bytes | file-like): المسار الكامل لملف الإكسل، أو محتواه كـ bytes،
+                أو كائن ملف (مثل ملف الطلب المرفوع) للقراءة مباشرة من الذاكرة دون حفظه على القرص.
+            fast (bool): وضع القراءة السريع، يقرأ فقط الأعمدة المعروفة في COLUMN_MAP مع أنواع معلنة مسبقاً.
+                ملاحظة: الأعمدة الإضافية لا تظهر في original_df (وبالتالي في ملف التصدير) في هذا الوضع.
+            filename (str, optional): اسم الملف الأصلي (عند القراءة من الذاكرة) لتحديد الصيغة من الامتداد.
+            sheet (str, optional): اسم ورقة الطلبة في ملف إكسل متعدد الأوراق (الافتراضي الورقة الأولى).
+                الصيغ الأخرى تحتوي جدولاً واحداً فيُتجاهل.
         """
-        self.file_path = file_path
+        self.source = source
+        self.file_path = source if isinstance(source, (str, os.PathLike)) else None
+        self.filename = filename if filename else self.file_path
+        self.fast = fast
+        self.sheet = sheet
+        self.file_format = None
         self.original_df = None  # نسخة أصلية للحفاظ على البيانات عند التصدير
         self.processed_df = None # نسخة للمعالجة داخل النظام
+        self._settings_df = None # ورقة الإعدادات (تُقرأ مع البيانات في نفس فتح الملف)
+        self._settings_loaded = False
+
+    @staticmethod
+    def get_excel_engine():
+        """
+        اختيار محرك قراءة الإكسل (Excel Reader Backend)
+
+        يُفضل calamine (مكتوب بلغة Rust وأسرع بعدة مرات) إذا كان مثبتاً،
+        وإلا نعود إلى openpyxl (والذي تستخدمه pandas في وضع القراءة فقط Read-Only).
+        """
+        if importlib.util.find_spec('python_calamine') is not None:
+            return 'calamine'
+        return 'openpyxl'
+
+    def _open_source(self):
+        """
+        تجهيز المصدر للقراءة بواسطة pandas.
+
+        - المسار: يُعاد كما هو بعد التأكد من وجوده.
+        - bytes: يُغلف في BytesIO.
+        - كائن ملف: يُعاد إلى بدايته ليمكن قراءته أكثر من مرة (البيانات ثم الإعدادات).
+          الكائنات غير القابلة للإرجاع (Non-seekable) تُقرأ مرة واحدة إلى الذاكرة.
+        """
+        if self.file_path is not None:
+            if not os.path.exists(self.file_path):
+                raise FileNotFoundError(f"Input file not found: {self.file_path}")
+            return self.file_path
+
+        if isinstance(self.source, (bytes, bytearray, memoryview)):
+            self.source = io.BytesIO(self.source)
+        elif not (hasattr(self.source, 'seekable') and self.source.seekable()):
+            self.source = io.BytesIO(self.source.read())
+
+        self.source.seek(0)
+        return self.source
 
     def load(self):
         """
         دالة التحميل الرئيسية (Main Load Function)
         
         تقوم بالخطوات التالية:
-        1. قراءة ملف الإكسل.
+        1. قراءة الملف (Excel / CSV / Parquet / Arrow) من المسار أو من الذاكرة مباشرة،
+           مع ورقة الإعدادات في نفس الفتح لملفات الإكسل. ورقة الطلبة: sheet إن حُددت،
+           وإلا الورقة الأولى (أو أول ورقة طلبة إذا لم تكن الأولى كذلك).
         2. تنظيف أسماء الأعمدة (إزالة المسافات الزائدة).
-        3. إنشاء نسخة معالجة (Processed DataFrame).
+        3. إنشاء جدول معالج مضغوط (Processed DataFrame) يشارك الأعمدة غير المعدلة مع الأصل.
         4. إعادة تسمية الأعمدة وفقاً للخريطة (COLUMN_MAP).
-        5. تنظيف ومعالجة البيانات (تحويل المعدل لأرقام، اكتشاف أبناء الأساتذة).
+        5. تنظيف ومعالجة البيانات (تحويل المعدل لأرقام، توحيد القنوات، ترميز الرغبات، اكتشاف أبناء الأساتذة).
         
         Returns:
             original_df: البيانات الخام (لاستخدامها لاحقاً في التصدير بنفس التنسيق).
             processed_df: البيانات الجاهزة للتوزيع.
         """
-        if not os.path.exists(self.file_path):
-            raise FileNotFoundError(f"Input file not found: {self.file_path}")
+        # 1. قراءة البيانات حسب صيغة الملف
+        source = self._open_source()
+        self.file_format = self.detect_format()
+        if self.file_format == 'csv':
+            df = self._read_csv(source)
+        elif self.file_format == 'parquet':
+            df = self._read_parquet(source)
+        elif self.file_format == 'arrow':
+            df = self._read_arrow(source)
+        else:
+            # فتح الملف مرة واحدة لقراءة ورقة الطلبة وورقة الإعدادات معاً
+            with pd.ExcelFile(source, engine=self.get_excel_engine()) as workbook:
+                df = self._read_students_sheet(workbook, self.sheet if self.sheet is not None else 0)
+                if self.sheet is None and not self._is_students_sheet(df.columns):
+                    # الورقة الأولى ليست ورقة طلبة (مثل ورقة تعليمات): أول ورقة طلبة في الملف
+                    for sheet in workbook.sheet_names[1:]:
+                        if sheet != self.SETTINGS_SHEET and self._is_students_sheet(workbook.parse(sheet, nrows=0).columns):
+                            df = self._read_students_sheet(workbook, sheet)
+                            break
+                self._read_settings_sheet(workbook)
 
-        # 1. قراءة البيانات
-        df = pd.read_excel(self.file_path)
-        
+        self.original_df, self.processed_df = self._prepare(df)
+        return self.original_df, self.processed_df
+
+    def load_sheets(self):
+        """
+        تحميل جميع أوراق الطلبة من ملف إكسل واحد (ورقة لكل كلية) في فتح واحد للملف.
+
+        ورقة الطلبة هي كل ورقة تحتوي ترويستها على أعمدة SHEET_REQUIRED_COLUMNS (عدا ورقة Settings)،
+        وتُعالج كل ورقة بنفس خطوات load. الصيغ الأخرى (CSV / Parquet / Arrow) تحتوي جدولاً واحداً
+        يُعاد باسم الملف.
+
+        Returns:
+            dict: {اسم_الورقة: (original_df, processed_df)} بنفس ترتيب الأوراق في الملف.
+        """
+        source = self._open_source()
+        self.file_format = self.detect_format()
+        if self.file_format != 'excel':
+            name = os.path.splitext(os.path.basename(str(self.filename)))[0] if self.filename else 'Sheet1'
+            return {name: self.load()}
+
+        frames = {}
+        with pd.ExcelFile(source, engine=self.get_excel_engine()) as workbook:
+            for sheet in workbook.sheet_names:
+                if sheet == self.SETTINGS_SHEET:
+                    continue
+                df = self._read_students_sheet(workbook, sheet)
+                if self._is_students_sheet(df.columns):
+                    frames[sheet] = df
+            self._read_settings_sheet(workbook)
+
+        if not frames:
+            raise ValueError("No student sheets found (expected columns: " + ', '.join(self.SHEET_REQUIRED_COLUMNS) + ")")
+        return {sheet: self._prepare(df) for sheet, df in frames.items()}
+
+    def student_sheets(self):
+        """
+        أسماء أوراق الطلبة في ملف إكسل (بنفس قاعدة load_sheets)، بقراءة ترويسة كل ورقة فقط.
+
+        Returns:
+            list: أسماء الأوراق بترتيبها في الملف، أو قائمة فارغة للصيغ الأخرى (جدول واحد).
+        """
+        source = self._open_source()
+        self.file_format = self.detect_format()
+        if self.file_format != 'excel':
+            return []
+
+        with pd.ExcelFile(source, engine=self.get_excel_engine()) as workbook:
+            return [sheet for sheet in workbook.sheet_names
+                    if sheet != self.SETTINGS_SHEET and self._is_students_sheet(workbook.parse(sheet, nrows=0).columns)]
+
+    @classmethod
+    def _is_students_sheet(cls, columns):
+        headers = {str(c).strip() for c in columns}
+        return all(col in headers for col in cls.SHEET_REQUIRED_COLUMNS)
+
+    def _prepare(self, df):
+        """
+        تجهيز جدول طلبة مقروء (الخطوات 2-4 من load).
+
+        Returns:
+            tuple: (original_df, processed_df)
+        """
         # 2. تنظيف ترويسة الأعمدة (Sanitize Headers)
         df.columns = df.columns.str.strip()
         
-        # حفظ النسخة الأصلية
-        self.original_df = df.copy()
+        # حفظ النسخة الأصلية (بالمرجع فقط، دون نسخ)
+        # الجدول المعالج يُبنى بإعادة التسمية ثم استبدال بعض الأعمدة بأعمدة جديدة،
+        # فالأعمدة غير المعدلة (الاسم، الرقم، الملاحظات...) تبقى مشتركة بين الجدولين
+        # ولا يُعدّل أي منهما في مكانه (Copy-on-Write).
+        original_df = df
 
         # 3. إعادة التسمية (Renaming)
         # يتم تغيير الأسماء العربية إلى إنجليزية الداخلية فقط للأعمدة المعروفة
@@ -78,35 +248,209 @@ class DataLoader:
         
         # أ) التأكد من أن حقل المعدل رقمي (Numeric Validation)
         # يتم تحويل القيم غير الرقمية إلى 0 لتجنب الأخطاء الحسابية لاحقاً
-        df['average'] = pd.to_numeric(df['average'], errors='coerce').fillna(0)
+        # ويُخزن بدقة float32 (تكفي للمعدلات، وبنصف الحجم)
+        df['average'] = pd.to_numeric(df['average'], errors='coerce').fillna(0).astype(np.float32)
         
-        # ب) تنظيف حقل قناة القبول
+        # ب) توحيد حقل قناة القبول مرة واحدة لجميع الطلبة (عمود فئوي بالقنوات القياسية)
+        # النص الأصلي للقناة يبقى في original_df للعرض والتصدير
         if 'channel' in df.columns:
-            df['channel'] = df['channel'].astype(str).str.strip()
+            df['channel'] = Rules.normalize_channels(df['channel'])
+
+        # ج) ترميز الرغبات الثلاث كأعمدة فئوية بقاموس أقسام مشترك
+        self.encode_departments(df)
 
-        # ج) اكتشاف صفة "ابن تدريسي" (Feature Extraction)
+        # د) اكتشاف صفة "ابن تدريسي" (Feature Extraction)
         # المنطق: البحث عن عبارة "أبناء الأساتذة" داخل حقل الملاحظات
         if 'notes' in df.columns:
             df['is_faculty_child'] = df['notes'].astype(str).str.contains("أبناء الأساتذة", na=False)
         else:
             df['is_faculty_child'] = False
 
-        self.processed_df = df
-        return self.original_df, self.processed_df
+        return original_df, df
+
+    @classmethod
+    def encode_departments(cls, df):
+        """
+        ترميز أعمدة الرغبات كأعمدة فئوية (Categorical) تشترك في قاموس أقسام واحد مرتب.
+        الرغبات الفارغة (أو المسافات فقط) تصبح قيماً مفقودة (NaN)، وهي حالات يتجاوزها الموزع أصلاً.
+        """
+        columns = [c for c in cls.CHOICE_COLUMNS if c in df.columns]
+        if not columns:
+            return df
+        values = pd.unique(pd.concat([df[c] for c in columns], ignore_index=True).dropna())
+        departments = sorted(d for d in values if str(d).strip() != '')
+        dtype = pd.CategoricalDtype(categories=departments)
+        for col in columns:
+            df[col] = df[col].astype(dtype)
+        return df
+
+    @staticmethod
+    def id_positions(id_column, ids):
+        """
+        مواقع الطلبة في جدول حسب أرقامهم (-1 لغير الموجود).
+        الرقم المكرر في الملف (خطأ في البيانات) يشير إلى أول صف له، بدلاً من فشل البحث
+        (get_indexer يتطلب أرقاماً فريدة).
+
+        Returns:
+            ndarray: المواقع بنفس ترتيب ids.
+        """
+        index = pd.Index(id_column)
+        if index.is_unique:
+            return index.get_indexer(ids)
+        first = ~index.duplicated()
+        positions = index[first].get_indexer(ids)
+        return np.where(positions >= 0, np.flatnonzero(first)[positions], -1)
 
-    def get_settings(self):
+    @classmethod
+    def get_departments(cls, df):
+        """
+        قائمة الأقسام الفريدة المذكورة في رغبات الطلبة (مرتبة).
+        مع الأعمدة الفئوية تُقرأ من رموز الأعمدة مباشرة دون المرور على النصوص.
+
+        Returns:
+            list: أسماء الأقسام.
+        """
+        columns = [df[c] for c in cls.CHOICE_COLUMNS]
+        dtype = columns[0].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and all(c.dtype == dtype for c in columns):
+            used = np.unique(np.concatenate([c.cat.codes.to_numpy() for c in columns]))
+            choices = dtype.categories[used[used >= 0]]
+        else:
+            choices = pd.concat(columns).dropna().unique()
+        return sorted([d for d in choices if str(d).strip() != ''])
+
+    def detect_format(self):
+        """
+        تحديد صيغة الملف (Format Detection)
+
+        الأولوية للبايتات الأولى من المحتوى (Magic Bytes) لأنها لا تخطئ في الصيغ الثنائية
+        حتى لو كان امتداد الملف خاطئاً، ثم امتداد الملف. الملف غير المعروف يُعامل كـ CSV.
+
+        Returns:
+            str: 'excel' أو 'csv' أو 'parquet' أو 'arrow'.
+        """
+        source = self._open_source()
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                head = f.read(8)
+        else:
+            head = source.read(8)
+            source.seek(0)
+
+        for magic, file_format in self.FORMAT_MAGIC:
+            if head.startswith(magic):
+                return file_format
+
+        if self.filename:
+            ext = os.path.splitext(str(self.filename))[1].lower()
+            if ext in self.FORMAT_EXTENSIONS:
+                return self.FORMAT_EXTENSIONS[ext]
+        return 'csv'
+
+    def _projected_columns(self, columns):
+        """الأعمدة المطلوب قراءتها: جميع الأعمدة، أو أعمدة COLUMN_MAP فقط في الوضع السريع."""
+        if not self.fast:
+            return list(columns)
+        return [c for c in columns if str(c).strip() in self.COLUMN_MAP]
+
+    def _read_csv(self, source):
+        """
+        قراءة ملف CSV على دفعات (Chunked).
+        الأعمدة النصية تُعلن كنصوص حتى تبقى أنواع الدفعات متطابقة عند دمجها.
+        """
+        usecols = (lambda col: str(col).strip() in self.COLUMN_MAP) if self.fast else None
+        dtypes = {col: str for col in self.TEXT_COLUMNS}
+        chunks = pd.read_csv(source, usecols=usecols, dtype=dtypes, encoding='utf-8-sig',
+                             chunksize=self.CSV_CHUNK_SIZE)
+        frames = list(chunks)
+        if not frames:
+            return pd.read_csv(source, usecols=usecols, encoding='utf-8-sig', nrows=0)
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _import_pyarrow():
+        """استيراد pyarrow (اعتمادية اختيارية لملفات Parquet و Arrow)."""
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Reading Parquet/Arrow files requires pyarrow (pip install pyarrow)")
+        return pyarrow
+
+    def _read_parquet(self, source):
+        """قراءة ملف Parquet (مع قراءة الأعمدة المطلوبة فقط في الوضع السريع)."""
+        pa = self._import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(source)
+        columns = self._projected_columns(parquet_file.schema_arrow.names)
+        return parquet_file.read(columns=columns).to_pandas()
+
+    def _read_arrow(self, source):
+        """قراءة ملف Arrow IPC (بصيغة File/Feather أو Stream)."""
+        pa = self._import_pyarrow()
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            table = pa.ipc.open_stream(source).read_all()
+        return table.select(self._projected_columns(table.column_names)).to_pandas()
+
+    def _read_students_sheet(self, workbook, sheet=0):
+        """
+        قراءة ورقة الطلبة (الورقة الأولى افتراضياً).
+        في الوضع السريع: يتم إسقاط الأعمدة غير المعروفة (Column Projection) وإعلان أنواع النصوص مسبقاً.
+        """
+        if not self.fast:
+            return workbook.parse(sheet)
+
+        # العناوين قد تحتوي على مسافات زائدة، لذا تتم المطابقة بعد التنظيف
+        usecols = lambda col: str(col).strip() in self.COLUMN_MAP
+        dtypes = {col: str for col in self.TEXT_COLUMNS}
+        return workbook.parse(sheet, usecols=usecols, dtype=dtypes)
+
+    def _read_settings_sheet(self, workbook):
+        """قراءة ورقة الإعدادات (إن وجدت) وحفظها لاستخدامها في get_settings دون فتح الملف مجدداً."""
+        if self.SETTINGS_SHEET in workbook.sheet_names:
+            self._settings_df = workbook.parse(self.SETTINGS_SHEET)
+        self._settings_loaded = True
+
+    def get_settings(self, sheet=None):
         """
         استخراج الإعدادات اليدوية (Settings Exploitation)
         
         تحاول هذه الدالة قراءة ورقة عمل باسم 'Settings' من نفس ملف الإكسل (إن وجدت).
+        إذا تم استدعاء load() مسبقاً، تُستخدم الورقة المقروءة معه دون فتح الملف مرة أخرى.
         تستخدم عادةً لتحديد السعات (Capacities) لكل قسم يدوياً.
+
+        في الملفات متعددة الأوراق، عمود اختياري Sheet يحدد ورقة الطلبة التي ينطبق عليها الصف:
+        الصفوف بدون ورقة تنطبق على الجميع، وصفوف الورقة المطلوبة تتقدم عليها لنفس القسم.
+
+        Args:
+            sheet (str, optional): اسم ورقة الطلبة (لقراءة سعاتها الخاصة من عمود Sheet).
         
         Returns:
             dict: {اسم_القسم: السعة} أو None في حال عدم وجود الورقة.
         """
         try:
-            settings_df = pd.read_excel(self.file_path, sheet_name='Settings')
+            # ورقة الإعدادات خاصة بملفات الإكسل فقط
+            if self.detect_format() != 'excel':
+                return None
+            if not self._settings_loaded:
+                with pd.ExcelFile(self._open_source(), engine=self.get_excel_engine()) as workbook:
+                    self._read_settings_sheet(workbook)
+            settings_df = self._settings_df
+            if settings_df is None:
+                return None
             if 'Dept_Name' in settings_df.columns and 'Capacity' in settings_df.columns:
+                 if self.SETTINGS_SHEET_COLUMN in settings_df.columns:
+                     # الصفوف العامة أولاً ثم صفوف الورقة المطلوبة (لتتقدم عليها)
+                     target = settings_df[self.SETTINGS_SHEET_COLUMN].astype('string').str.strip()
+                     general = settings_df[target.isna() | (target == '')]
+                     specific = settings_df[target == str(sheet)] if sheet is not None else settings_df.iloc[:0]
+                     settings_df = pd.concat([general, specific])
+                     if settings_df.empty:
+                         return None
                  # تحويل الجدول إلى قاموس {Dept: Cap}
                  return dict(zip(settings_df['Dept_Name'], settings_df['Capacity']))
         except:
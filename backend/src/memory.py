@@ -0,0 +1,176 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import sys
+import threading
+
+"""
+-----------------------------------------------------------
+Memory Usage Module (memory.py)
+
+قياس ذروة استهلاك الذاكرة (Peak RSS) للعملية، لعرضها مع نتيجة كل طلب توزيع.
+
+- على Linux: تُقرأ الذروة من /proc/self/status (VmHWM)، ويمكن تصفيرها قبل الطلب
+  عبر /proc/self/clear_refs لتصبح ذروة هذا الطلب فقط.
+- على غيره: ذروة العملية منذ بدايتها من resource.getrusage.
+- إذا لم يتوفر أي منهما (مثل Windows): القيمة None.
+
+الذروة خاصة بالعملية كاملة، والطلبات المتزامنة (خيوط نفس العامل) تتشارك نفس القياس.
+لذلك يتم القياس عبر MemoryWindow: الذروة لا تُصفر إلا إذا لم يكن هناك طلب آخر قيد القياس،
+وزيادة الذاكرة (peak_growth_bytes) لا تُنسب للطلب إلا إذا لم يتداخل معه أي طلب آخر.
+-----------------------------------------------------------
+"""
+
+def _read_status_field(field):
+    """قراءة حقل ذاكرة (بالبايت) من /proc/self/status، أو None إذا لم يتوفر."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def reset_peak_rss():
+    """
+    تصفير ذروة الذاكرة قبل بدء طلب جديد (Linux فقط).
+
+    Returns:
+        int أو None: الذاكرة المقيمة الحالية (خط الأساس للطلب) بالبايت.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+    return _read_status_field('VmRSS')
+
+def peak_rss_bytes():
+    """
+    ذروة الذاكرة المقيمة (Peak Resident Set Size) بالبايت.
+
+    Returns:
+        int أو None إذا تعذر القياس.
+    """
+    peak = _read_status_field('VmHWM')
+    if peak is not None:
+        return peak
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # الوحدة: كيلوبايت على Linux، وبايت على macOS
+    return int(peak) if sys.platform == 'darwin' else int(peak) * 1024
+
+def process_memory(pid='self'):
+    """
+    تفصيل ذاكرة عملية (Linux فقط) من /proc/<pid>/smaps_rollup:
+    - rss: الذاكرة المقيمة كاملة (تشمل الصفحات المشتركة مع العمليات الأخرى).
+    - pss: الحصة التناسبية (الصفحات المشتركة مقسومة على عدد العمليات التي تشاركها).
+    - uss: الذاكرة الخاصة بالعملية فقط (ما يُحرر فعلاً عند إنهائها).
+
+    مفيد لقياس ذاكرة كل عامل (Worker) بعد التفرع من عملية رئيسية حمّلت المكتبات مسبقاً.
+
+    Returns:
+        dict: {rss_bytes, pss_bytes, uss_bytes}، والقيم None إذا تعذر القياس.
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+    except OSError:
+        pass
+    private = [fields.get('Private_Clean'), fields.get('Private_Dirty')]
+    return {
+        "rss_bytes": fields.get('Rss'),
+        "pss_bytes": fields.get('Pss'),
+        "uss_bytes": sum(private) if None not in private else None
+    }
+
+def frame_memory_bytes(*frames):
+    """حجم الجداول في الذاكرة (memory_usage(deep=True)) بالبايت."""
+    return int(sum(df.memory_usage(deep=True).sum() for df in frames))
+
+class MemoryWindow:
+    """
+    نافذة قياس الذاكرة لطلب واحد (Per-Request Memory Window)
+
+    with MemoryWindow() as window:
+        ... تحميل وتوزيع ...
+    report = window.report(input_bytes, input_memory_bytes)
+
+    النوافذ المتزامنة تُعد تحت قفل: تصفير الذروة يتم فقط عند فتح نافذة دون نوافذ أخرى مفتوحة،
+    والنافذة التي تداخلت مع غيرها (بدأت أثناءها أو بدأت غيرها أثناءها) تعيد ذروة العملية فقط
+    دون نسبة الزيادة إلى الطلب، لأن الطلبات الأخرى ساهمت فيها.
+    """
+
+    _lock = threading.Lock()
+    _active = 0  # عدد النوافذ المفتوحة
+    _opened = 0  # عدد النوافذ المفتوحة منذ بدء العملية (لكشف التداخل)
+
+    def __init__(self):
+        self.baseline = None
+        self.peak = None
+        self.exclusive = False
+        self._opened_at = None
+
+    def __enter__(self):
+        cls = MemoryWindow
+        with cls._lock:
+            alone = cls._active == 0
+            self.baseline = reset_peak_rss() if alone else _read_status_field('VmRSS')
+            self.exclusive = alone
+            cls._active += 1
+            cls._opened += 1
+            self._opened_at = cls._opened
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        cls = MemoryWindow
+        with cls._lock:
+            self.peak = peak_rss_bytes()
+            self.exclusive = self.exclusive and cls._opened == self._opened_at
+            cls._active -= 1
+        return False
+
+    def report(self, input_bytes=None, input_memory_bytes=None):
+        """ملخص الذاكرة لهذا الطلب (بعد إغلاق النافذة)، انظر memory_report."""
+        return memory_report(self.baseline if self.exclusive else None, input_bytes, input_memory_bytes, peak=self.peak)
+
+def memory_report(baseline=None, input_bytes=None, input_memory_bytes=None, peak=None):
+    """
+    ملخص الذاكرة لطلب واحد.
+
+    Args:
+        baseline (int, optional): الذاكرة قبل الطلب (ناتج reset_peak_rss)، أو None إذا تداخل الطلب مع غيره.
+        input_bytes (int, optional): حجم الملف المرفوع.
+        input_memory_bytes (int, optional): حجم البيانات المحملة في الذاكرة (frame_memory_bytes).
+        peak (int, optional): الذروة المقاسة (الافتراضي: القراءة الحالية).
+
+    Returns:
+        dict: {scope, input_bytes, input_memory_bytes, peak_rss_bytes, peak_growth_bytes, growth_to_input}
+        حيث peak_growth_bytes = الذروة - خط الأساس (ما أضافه الطلب فوق ذاكرة العملية)،
+        و growth_to_input = الزيادة / حجم البيانات في الذاكرة.
+        scope = 'request' إذا كانت الزيادة خاصة بالطلب، أو 'process' (ذروة العملية فقط، والزيادة None).
+    """
+    peak = peak if peak is not None else peak_rss_bytes()
+    growth = max(peak - baseline, 0) if peak is not None and baseline is not None else None
+    return {
+        "scope": 'request' if growth is not None else 'process',
+        "input_bytes": input_bytes,
+        "input_memory_bytes": input_memory_bytes,
+        "peak_rss_bytes": peak,
+        "peak_growth_bytes": growth,
+        "growth_to_input": round(growth / input_memory_bytes, 2) if growth is not None and input_memory_bytes else None
+    }
@@ -0,0 +1,188 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+"""
+-----------------------------------------------------------
+Metrics Module (metrics.py)
+
+قياس زمن مراحل كل طلب (Per-Stage Timings) وعدادات التشغيل (Counters)،
+وعرضها بصيغة Prometheus عبر /metrics، وكحقل timings في استجابة كل طلب.
+
+- StageTimer: مؤقت لطلب واحد، يجمع زمن كل مرحلة (with timer.stage('load'): ...).
+- MetricsRegistry: سجل مشترك للعملية (عدد الطلبات، الصفوف، البايتات، توزيع أزمنة المراحل).
+
+التعطيل: متغير البيئة SSDS_METRICS=0 يعطل القياس، فتصبح المراحل سياقات فارغة
+(nullcontext) ولا يُحدّث السجل، أي أن الكلفة شبه معدومة.
+-----------------------------------------------------------
+"""
+
+ENABLED = os.environ.get('SSDS_METRICS', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+_NULL_STAGE = nullcontext()
+
+class _Stage:
+    """سياق قياس مرحلة واحدة."""
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+class StageTimer:
+    """
+    مؤقت مراحل طلب واحد (Per-Request Stage Timer)
+
+    الأزمنة تُحفظ بالثواني، وتُعرض بالمللي ثانية في to_dict.
+    المرحلة التي تتكرر يُجمع زمنها.
+    """
+
+    def __init__(self, enabled=None):
+        self.enabled = ENABLED if enabled is None else enabled
+        self.timings = {}
+
+    def stage(self, name):
+        """سياق قياس مرحلة: with timer.stage('load'): ..."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name, seconds):
+        if self.enabled:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def update(self, timings, prefix=''):
+        """إضافة أزمنة محسوبة مسبقاً (مثل Distributor.timings) بالثواني."""
+        if self.enabled:
+            for name, seconds in timings.items():
+                self.add(prefix + name, seconds)
+
+    def to_dict(self):
+        """الأزمنة بالمللي ثانية (لحقل timings في الاستجابة)."""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()}
+
+class MetricsRegistry:
+    """
+    سجل المقاييس (Metrics Registry)
+
+    عدادات (Counters) ومدرجات تكرارية (Histograms) بتسميات (Labels)،
+    محمية بقفل واحد، وتُعرض بصيغة Prometheus النصية.
+    """
+
+    # حدود فئات زمن المراحل بالثواني
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    HELP = {
+        'ssds_requests_total': ('counter', 'Requests handled, by endpoint and status.'),
+        'ssds_rows_processed_total': ('counter', 'Student rows processed, by endpoint.'),
+        'ssds_bytes_in_total': ('counter', 'Uploaded bytes received, by endpoint.'),
+        'ssds_bytes_out_total': ('counter', 'Response bytes sent, by endpoint.'),
+        'ssds_stage_seconds': ('histogram', 'Duration of each request stage in seconds.')
+    }
+
+    def __init__(self, enabled=None):
+        self.enabled = ENABLED if enabled is None else enabled
+        self._counters = {}   # {(name, labels): value}
+        self._histograms = {} # {(name, labels): [bucket_counts, sum, count]}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * len(self.BUCKETS), 0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    entry[0][i] += 1
+            entry[1] += seconds
+            entry[2] += 1
+
+    def record_request(self, endpoint, timer=None, status='success', rows=0, bytes_in=0, bytes_out=0):
+        """تسجيل طلب كامل: الحالة، أزمنة مراحله، والصفوف والبايتات."""
+        if not self.enabled:
+            return
+        self.inc('ssds_requests_total', endpoint=endpoint, status=status)
+        if rows:
+            self.inc('ssds_rows_processed_total', rows, endpoint=endpoint)
+        if bytes_in:
+            self.inc('ssds_bytes_in_total', bytes_in, endpoint=endpoint)
+        if bytes_out:
+            self.inc('ssds_bytes_out_total', bytes_out, endpoint=endpoint)
+        if timer is not None:
+            for stage, seconds in timer.timings.items():
+                self.observe('ssds_stage_seconds', seconds, endpoint=endpoint, stage=stage)
+
+    @staticmethod
+    def _format_labels(labels, extra=None):
+        items = list(labels) + (list(extra) if extra else [])
+        if not items:
+            return ''
+        escaped = []
+        for key, value in items:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{key}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self):
+        """
+        المقاييس بصيغة Prometheus النصية (Text Exposition Format 0.0.4).
+
+        Returns:
+            str
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, [list(e[0]), e[1], e[2]]) for key, e in self._histograms.items())
+
+        lines = []
+        described = set()
+        def describe(name):
+            if name not in described:
+                metric_type, help_text = self.HELP.get(name, ('untyped', ''))
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                described.add(name)
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f'{name}{self._format_labels(labels)} {value}')
+
+        for (name, labels), (buckets, total, count) in histograms:
+            describe(name)
+            for bound, bucket_count in zip(self.BUCKETS, buckets):
+                lines.append(f'{name}_bucket{self._format_labels(labels, [("le", bound)])} {bucket_count}')
+            lines.append(f'{name}_bucket{self._format_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{name}_sum{self._format_labels(labels)} {total:.6f}')
+            lines.append(f'{name}_count{self._format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+# السجل المشترك للعملية
+registry = MetricsRegistry()
@@ -0,0 +1,93 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from src.distributor import Distributor
+
+"""
+-----------------------------------------------------------
+Multi-Sheet Distribution Module (multi_sheet.py)
+
+توزيع ملف متعدد الأوراق (ورقة طلبة لكل كلية): كل ورقة توزيع مستقل بموزع خاص بها
+وسعاتها الخاصة، وتُنفذ الأوراق بالتوازي على عدة عمليات (Process Pool)، فيقترب الزمن الكلي
+من زمن أكبر ورقة بدلاً من مجموع أزمنة الأوراق.
+
+- القراءة تتم مرة واحدة في العملية الرئيسية (DataLoader.load_sheets).
+- كل عملية تستلم الجدول المعالج للورقة فقط (المضغوط بالأعمدة الفئوية)، وتعيد النتائج والإحصائيات.
+- الأوراق الأكبر تُرسل أولاً، لكي لا تبدأ أكبر ورقة متأخرة بعد انتهاء الأوراق الصغيرة.
+
+تُستخدم في batch.py --sheets. الخادم لا يستخدمها: كل ورقة فيه طلب /distribute مستقل (الحقل sheet)
+ينتج عملية كاملة (النتائج، البحث، إعادة التوزيع)، والتوازي من خيوط الخادم وعماله.
+-----------------------------------------------------------
+"""
+
+def distribute_sheet(name, processed_df, mode, capacity_input, quotas):
+    """
+    توزيع ورقة واحدة (يُنفذ داخل عملية من Process Pool).
+
+    Returns:
+        dict: {name, rows, mode, capacity_input, results, capacity_plan, stats, seconds}
+        أو {name, error} عند الفشل.
+    """
+    started = time.perf_counter()
+    try:
+        distributor = Distributor(processed_df, {}, quotas)
+        distributor.calculate_capacities(mode, capacity_input)
+        results = distributor.distribute()
+
+        # الإحصائيات من عدادات الموزع (نفس طريقة run_distribution)
+        assigned_count = sum(distributor.dept_usage_total.values())
+        return {
+            "name": name,
+            "rows": len(processed_df),
+            "mode": mode,
+            "capacity_input": capacity_input,
+            "results": results,
+            "capacity_plan": distributor.plan.to_dict(),
+            "stats": {
+                "assigned": assigned_count,
+                "unassigned": len(processed_df) - assigned_count,
+                "total": len(processed_df)
+            },
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+    except Exception as e:
+        return {"name": name, "error": f"{type(e).__name__}: {e}"}
+
+def distribute_sheets(sheets, capacity_inputs, quotas, max_workers=None):
+    """
+    توزيع جميع الأوراق بالتوازي.
+
+    Args:
+        sheets (dict): {اسم_الورقة: processed_df} (من DataLoader.load_sheets).
+        capacity_inputs (dict): {اسم_الورقة: (mode, capacity_input)} لكل ورقة.
+        quotas (dict): نسب القبول (نفسها لجميع الأوراق).
+        max_workers (int, optional): عدد العمليات (الافتراضي: عدد المعالجات).
+
+    Returns:
+        list: نتيجة كل ورقة (ناتج distribute_sheet) بنفس ترتيب الأوراق.
+    """
+    if not sheets:
+        return []
+
+    names = list(sheets)
+    # الأوراق الأكبر أولاً (Longest Processing Time First)
+    schedule = sorted(names, key=lambda name: len(sheets[name]), reverse=True)
+    workers = min(len(names), max_workers or os.cpu_count() or 1)
+
+    if workers <= 1:
+        outcomes = {name: distribute_sheet(name, sheets[name], *capacity_inputs[name], quotas) for name in schedule}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(distribute_sheet, name, sheets[name], *capacity_inputs[name], quotas)
+                       for name in schedule}
+            outcomes = {name: future.result() for name, future in futures.items()}
+
+    return [outcomes[name] for name in names]
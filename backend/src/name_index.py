@@ -0,0 +1,187 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import importlib.util
+import re
+import numpy as np
+import pandas as pd
+
+"""
+-----------------------------------------------------------
+Name Index Module (name_index.py)
+
+البحث السريع عن الطلبة بالاسم مع مراعاة اختلافات كتابة الأسماء العربية.
+
+التوحيد (Normalization) قبل الفهرسة والبحث:
+- حذف التشكيل (الحركات والشدة والسكون) والتطويل (ـ).
+- أ / إ / آ / ٱ => ا، ة => ه، ى => ي.
+- توحيد المسافات، وبدون حساسية لحالة الأحرف اللاتينية.
+فيطابق البحث عن "اسامه" الاسم "أُسامة".
+
+الفهرس (يُبنى مرة واحدة لكل عملية، من عمود name في البيانات المعالجة):
+- الأسماء الموحدة الفريدة مرتبة أبجدياً، وكل طالب يشير إلى اسمه برمز (Code).
+- قاموس الكلمات (Vocabulary) مرتب، مع قوائم الأسماء لكل كلمة (Postings) متجاورة في مصفوفة واحدة،
+  فالكلمات التي تبدأ بنص البحث نطاق متصل يُحدد بالبحث الثنائي (searchsorted).
+- البحث داخل الكلمة (Substring) يتم على القاموس فقط (أصغر بكثير من عدد الطلبة).
+
+ترتيب النتائج (Ranking):
+    0 exact:        الاسم مطابق تماماً
+    1 prefix:       الاسم يبدأ بنص البحث
+    2 word_prefix:  كل كلمة في البحث بداية لكلمة في الاسم (مثل "محمد ع" => "علي محمد عباس")
+    3 contains:     كل كلمة في البحث جزء من كلمة في الاسم
+ثم أبجدياً، ثم حسب ترتيب الطالب في الملف.
+-----------------------------------------------------------
+"""
+
+# التشكيل (الحركات، الشدة، السكون، الألف الخنجرية، علامات القرآن) والتطويل
+ARABIC_DIACRITICS = '[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]'
+ALEF_VARIANTS = '[\u0623\u0625\u0622\u0671]' # أ إ آ ٱ
+
+# نوع النصوص في الفهرس: مع pyarrow (اعتمادية اختيارية) يتم تقسيم الأسماء إلى كلمات وترميزها
+# داخل Arrow دون إنشاء قوائم Python لكل اسم (أسرع بعشر مرات تقريباً)
+if importlib.util.find_spec('pyarrow') is not None:
+    import pyarrow
+    INDEX_TEXT_DTYPE = pd.ArrowDtype(pyarrow.string())
+else:
+    INDEX_TEXT_DTYPE = 'string'
+
+_DIACRITICS_PATTERN = re.compile(ARABIC_DIACRITICS)
+_ALEF_PATTERN = re.compile(ALEF_VARIANTS)
+
+# أعلى محرف في Unicode، لتحديد نهاية نطاق البداية (Prefix Range)
+_PREFIX_END = '\U0010ffff'
+
+def normalize_names(names):
+    """
+    توحيد كتابة الأسماء العربية (Vectorized).
+
+    Args:
+        names: قائمة أو Series أو ndarray من الأسماء (القيم الفارغة تصبح '').
+
+    Returns:
+        ndarray: الأسماء الموحدة (object).
+    """
+    return _normalized_series(names).to_numpy(dtype=object)
+
+def _normalized_series(names):
+    keys = pd.Series(names, dtype='string').fillna('')
+    keys = keys.str.replace(ARABIC_DIACRITICS, '', regex=True)
+    keys = keys.str.replace(ALEF_VARIANTS, 'ا', regex=True)
+    keys = keys.str.replace('ة', 'ه', regex=False) # ة => ه
+    keys = keys.str.replace('ى', 'ي', regex=False) # ى => ي
+    keys = keys.str.strip().str.lower()
+    # توحيد المسافات (بالتعبير النمطي) للأسماء التي تحتاجه فقط، لأنه الأبطأ
+    messy = keys.str.contains(r'\s\s|[^\S ]', regex=True)
+    if messy.any():
+        keys[messy] = keys[messy].str.replace(r'\s+', ' ', regex=True)
+    return keys
+
+def normalize_name(name):
+    """توحيد اسم واحد (نص البحث)، بنفس قواعد normalize_names دون كلفة إنشاء Series."""
+    if name is None or pd.isna(name):
+        return ''
+    text = _ALEF_PATTERN.sub('ا', _DIACRITICS_PATTERN.sub('', str(name)))
+    text = text.replace('ة', 'ه').replace('ى', 'ي')
+    return ' '.join(text.lower().split())
+
+class NameIndex:
+    """
+    فهرس البحث بالاسم (Normalized Prefix / Substring Name Index)
+    """
+
+    MATCH_LABELS = ('exact', 'prefix', 'word_prefix', 'contains')
+    NO_MATCH = len(MATCH_LABELS)
+
+    def __init__(self, names):
+        """
+        Args:
+            names: أسماء الطلبة بترتيب الصفوف (مثل processed_df['name']).
+        """
+        # الأسماء الفريدة مرتبة أبجدياً، ورمز كل طالب = موقع اسمه فيها
+        codes, uniques = pd.factorize(_normalized_series(names), sort=True)
+        unique_names = pd.Series(uniques, dtype=INDEX_TEXT_DTYPE)
+        self._row_names = codes.astype(np.int64)
+        self._names = unique_names.to_numpy(dtype=object)
+
+        # قاموس الكلمات المرتب، وقوائم الأسماء لكل كلمة متجاورة حسب ترتيب القاموس
+        words = unique_names.str.split(' ').explode()
+        word_codes, vocabulary = pd.factorize(words, sort=True)
+        order = np.argsort(word_codes, kind='stable')
+        self._vocabulary = np.asarray(vocabulary, dtype=object)
+        self._vocabulary_text = pd.Series(vocabulary, dtype=INDEX_TEXT_DTYPE)
+        self._posting_words = word_codes[order]
+        self._posting_names = words.index.to_numpy()[order]
+        self._offsets = np.searchsorted(self._posting_words, np.arange(len(self._vocabulary) + 1))
+
+    def __len__(self):
+        return len(self._row_names)
+
+    def _prefix_range(self, sorted_values, prefix):
+        """نطاق القيم التي تبدأ بالنص في مصفوفة مرتبة: (البداية، النهاية)."""
+        lo, hi = np.searchsorted(sorted_values, [prefix, prefix + _PREFIX_END])
+        return int(lo), int(hi)
+
+    def _name_scores(self, query):
+        """درجة المطابقة لكل اسم فريد (NO_MATCH لغير المطابق)، أو None لنص بحث فارغ."""
+        query = normalize_name(query)
+        if not query:
+            return None
+
+        count = len(self._names)
+        matched = np.ones(count, dtype=bool)
+        word_prefixed = np.ones(count, dtype=bool)
+        for token in query.split(' '):
+            # الكلمات التي تبدأ بالنص: نطاق متصل من القاموس => شريحة متصلة من القوائم
+            lo, hi = self._prefix_range(self._vocabulary, token)
+            prefix_hit = np.zeros(count, dtype=bool)
+            prefix_hit[self._posting_names[self._offsets[lo]:self._offsets[hi]]] = True
+
+            # الكلمات التي تحتوي النص: بحث في القاموس فقط
+            word_hit = self._vocabulary_text.str.contains(token, regex=False).to_numpy(dtype=bool)
+            contains_hit = np.zeros(count, dtype=bool)
+            contains_hit[self._posting_names[word_hit[self._posting_words]]] = True
+
+            matched &= contains_hit | prefix_hit
+            word_prefixed &= prefix_hit
+
+        scores = np.full(count, self.NO_MATCH, dtype=np.int8)
+        scores[matched] = 3
+        scores[matched & word_prefixed] = 2
+        lo, hi = self._prefix_range(self._names, query)
+        scores[lo:hi] = 1
+        if lo < hi and self._names[lo] == query:
+            scores[lo] = 0
+        return scores
+
+    def mask(self, query):
+        """
+        قناع الطلبة المطابقين (لتصفية جدول النتائج).
+
+        Returns:
+            ndarray (bool) بطول عدد الطلبة، أو None لنص بحث فارغ.
+        """
+        scores = self._name_scores(query)
+        if scores is None:
+            return None
+        return (scores < self.NO_MATCH)[self._row_names]
+
+    def rank(self, query):
+        """
+        مواقع الطلبة المطابقين مرتبة حسب الدرجة ثم الاسم ثم ترتيب الملف.
+
+        Returns:
+            tuple: (positions, scores)، أو (None, None) لنص بحث فارغ.
+        """
+        scores = self._name_scores(query)
+        if scores is None:
+            return None, None
+        row_scores = scores[self._row_names]
+        positions = np.flatnonzero(row_scores < self.NO_MATCH)
+        row_scores = row_scores[positions]
+        order = np.lexsort((positions, self._row_names[positions], row_scores))
+        return positions[order], row_scores[order]
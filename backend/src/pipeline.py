@@ -0,0 +1,104 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import pandas as pd
+from src.distributor import Distributor
+from src.metrics import StageTimer
+from src.run_store import DistributionRun
+
+"""
+-----------------------------------------------------------
+Distribution Pipeline Module (pipeline.py)
+
+مراحل عملية التوزيع الكاملة بعد تحميل البيانات:
+حساب السعات، التوزيع، تقريب المعدلات، الإحصائيات، والتصدير (اختياري).
+تستخدمه نقطة /distribute ونظام المهام غير المتزامنة (Jobs) بنفس المنطق.
+-----------------------------------------------------------
+"""
+
+# مراحل التوزيع بالترتيب (تستخدم في تقارير التقدم)
+STAGES = ['load', 'capacities', 'main_pass', 'vacancy_pass', 'exception_pass', 'export']
+
+def normalize_quotas(quotas):
+    """
+    توحيد نسب القبول: القيم الأكبر من 1 تعتبر نسبة مئوية (مثلاً 60 => 0.60).
+    """
+    if not quotas:
+        return quotas
+    normalized_quotas = {}
+    for k, v in quotas.items():
+        val = float(v)
+        if val > 1.0: val = val / 100.0
+        normalized_quotas[k] = val
+    return normalized_quotas
+
+def round_averages(original_df):
+    """
+    معالجة تنسيق الأرقام (تقريب المعدل) في البيانات الأصلية قبل العرض والتصدير.
+    تعمل على نسخة سطحية، لأن الجدول قد يكون مشتركاً مع ذاكرة الملفات المحللة.
+    """
+    original_df = original_df.copy(deep=False)
+    cols_to_round = [c for c in original_df.columns if 'معدل' in str(c) or 'Average' in str(c)]
+    for col in cols_to_round:
+        original_df[col] = pd.to_numeric(original_df[col], errors='coerce').fillna(0)
+        original_df[col] = original_df[col].apply(lambda x: round(x, 2) if isinstance(x, (int, float)) else x)
+    return original_df
+
+def run_distribution(original_df, processed_df, mode, capacity_input, quotas, progress=None, build_export=False, timer=None):
+    """
+    تنفيذ عملية التوزيع على بيانات محملة مسبقاً.
+
+    Args:
+        original_df (DataFrame): البيانات الأصلية (للعرض والتصدير).
+        processed_df (DataFrame): البيانات المعالجة (للتوزيع).
+        mode (str): 'EQUAL' أو 'MANUAL'.
+        capacity_input (int/dict): إجمالي المقاعد أو قاموس السعات.
+        quotas (dict): نسب القبول النشطة.
+        progress (callable, optional): دالة تقرير التقدم progress(stage, fraction).
+        build_export (bool): إنشاء ملف الإكسل فوراً بدلاً من إنشائه عند أول طلب تحميل.
+        timer (StageTimer, optional): مؤقت الطلب لتسجيل زمن كل مرحلة (بما فيها مراحل الموزع الداخلية).
+
+    Returns:
+        DistributionRun: نتيجة العملية (النتائج، خطة المقاعد، الإحصائيات).
+    """
+    report = progress if progress else (lambda stage, fraction: None)
+    timer = timer if timer is not None else StageTimer(enabled=False)
+
+    # 1. حساب السعات
+    report('capacities', 0.0)
+    with timer.stage('capacities'):
+        distributor = Distributor(processed_df, {}, normalize_quotas(quotas))
+        distributor.calculate_capacities(mode, capacity_input)
+    report('capacities', 1.0)
+
+    # 2. التوزيع (الدورات الثلاث تقرر تقدمها بنفسها، والموزع يقيس زمن كل منها)
+    results = distributor.distribute(progress=progress)
+    timer.update(distributor.timings)
+    capacity_plan = distributor.plan.to_dict()
+
+    # 3. إحصائيات سريعة (من عدادات الموزع، وهي تشمل تجاوزات أبناء التدريسيين)
+    with timer.stage('stats'):
+        assigned_count = sum(distributor.dept_usage_total.values())
+        total_count = len(processed_df)
+        stats = {
+            "assigned": assigned_count,
+            "unassigned": total_count - assigned_count,
+            "total": total_count
+        }
+
+        # الموزع يُحفظ مع العملية لإعادة التوزيع التزايدية لاحقاً
+        run = DistributionRun(round_averages(original_df), results, capacity_plan, stats, processed_df, distributor)
+
+    # 4. التصدير (اختياري)
+    if build_export:
+        report('export', 0.0)
+        with timer.stage('export'):
+            run.get_export()
+        report('export', 1.0)
+
+    return run
@@ -7,6 +7,8 @@ Proprietary and confidential.
 -----------------------------------------------------------
 """
 
+from types import MappingProxyType
+import numpy as np
 import pandas as pd
 
 class Rules:
@@ -27,11 +29,26 @@ class Rules:
     # مركزي: القبول العام (60%)
     # ذوي الشهداء: حصة مؤسسة الشهداء (10%)
     # الموازي: التعليم الموازي الخاص (30%)
-    QUOTAS = {
+    # القاموس للقراءة فقط (MappingProxyType) لأنه مشترك بين جميع الطلبات في العملية،
+    # ومن يحتاج تعديله يأخذ نسخة: dict(Rules.QUOTAS).
+    QUOTAS = MappingProxyType({
         'مركزي': 0.60,       # Central / General Channel
         'ذوي الشهداء': 0.10, # Martyrs Channel
         'الموازي': 0.30      # Parallel / Private Education Channel
-    }
+    })
+
+    # ---------------------------------------------------------
+    # القنوات القياسية وكلماتها المفتاحية (Canonical Channels & Keywords)
+    # ---------------------------------------------------------
+    # ترتيب القنوات ثابت ويستخدم كقاموس للعمود الفئوي (Categorical) للقناة.
+    CHANNELS = ('مركزي', 'الموازي', 'ذوي الشهداء')
+
+    # الكلمات المفتاحية بالأولوية: أول كلمة موجودة في اسم القناة تحدد القناة القياسية،
+    # وما لا يطابق أي كلمة يعتبر قبولاً مركزياً.
+    CHANNEL_KEYWORDS = [
+        ('شهداء', 'ذوي الشهداء'),
+        ('موازي', 'الموازي')
+    ]
 
     @staticmethod
     def get_normalized_channel(channel_name):
@@ -49,13 +66,44 @@ class Rules:
         channel_name = str(channel_name).strip()
         
         # البحث عن كلمات مفتاحية لتحديد القناة
-        if 'شهداء' in channel_name:
-            return 'ذوي الشهداء'
-        elif 'موازي' in channel_name:
-            return 'الموازي'
+        for keyword, channel in Rules.CHANNEL_KEYWORDS:
+            if keyword in channel_name:
+                return channel
+
+        # القيمة الافتراضية هي القبول المركزي
+        return 'مركزي'
+
+    @staticmethod
+    def normalize_channels(channels):
+        """
+        توحيد عمود القنوات كاملاً (Vectorized Channel Normalization)
+
+        نفس قواعد get_normalized_channel، لكن على العمود دفعة واحدة باستخدام str.contains
+        بدلاً من استدعاء الدالة لكل طالب. إذا كان العمود فئوياً (Categorical) تُوحد فئاته فقط.
+
+        المدخلات:
+            channels (Series): عمود قناة القبول (نصوص أو فئات).
+
+        المخرجات:
+            Series: عمود فئوي بقاموس ثابت هو Rules.CHANNELS.
+        """
+        if isinstance(channels.dtype, pd.CategoricalDtype):
+            # العمود موحد مسبقاً (من DataLoader)
+            if list(channels.cat.categories) == list(Rules.CHANNELS):
+                return channels
+            # توحيد الفئات فقط ثم إعادة ترميز الصفوف (الرمز -1 للقيم الفارغة يقابل آخر عنصر)
+            lookup = [Rules.CHANNELS.index(Rules.get_normalized_channel(c)) for c in channels.cat.categories]
+            lookup.append(Rules.CHANNELS.index(Rules.get_normalized_channel(np.nan)))
+            codes = np.array(lookup, dtype=np.int8)[channels.cat.codes.to_numpy()]
         else:
-            # القيمة الافتراضية هي القبول المركزي
-            return 'مركزي'
+            text = channels.astype(str)
+            conditions = [text.str.contains(keyword, regex=False, na=False).to_numpy(dtype=bool)
+                          for keyword, _ in Rules.CHANNEL_KEYWORDS]
+            choices = [Rules.CHANNELS.index(channel) for _, channel in Rules.CHANNEL_KEYWORDS]
+            codes = np.select(conditions, choices, default=Rules.CHANNELS.index('مركزي')).astype(np.int8)
+
+        return pd.Series(pd.Categorical.from_codes(codes, categories=list(Rules.CHANNELS)),
+                         index=channels.index, name=channels.name)
 
     @staticmethod
     def apply_faculty_child_exception(student, dept_min_scores):
@@ -0,0 +1,632 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from src.loader import DataLoader
+from src.name_index import NameIndex, normalize_name, normalize_names
+
+"""
+-----------------------------------------------------------
+Run Database Module (run_db.py)
+
+حفظ نتائج عمليات التوزيع في قاعدة بيانات SQLite محلية، للاستعلام عن قبول طالب معين
+("أين قُبلت؟") والبحث بالاسم، حتى بعد حذف العملية من الذاكرة أو من عامل (Worker) آخر.
+
+الجداول:
+- runs: معلومات العملية (الإحصائيات وخطة المقاعد)، ومصدرها (بصمة الملف المرفوع وإعدادات التوزيع)
+  مع رقم نسخة يزيد عند كل إعادة توزيع، لإعادة بنائها في أي عامل (انظر get_run في app.py).
+- assignments: طالب لكل صف (القسم المقبول، القناة، ترتيب الرغبة المحققة، والاسم بعد توحيد الكتابة العربية)،
+  بمفتاح (run_id, student_id).
+- departments: لكل قسم السعة والمقبولون والتجاوزات والحد الأدنى للقبول المركزي (dept_min_scores).
+- jobs: حالة المهام غير المتزامنة (/jobs) لتُقرأ من أي عامل.
+
+الكتابة:
+- طلب التوزيع يكتب صف العملية فوراً (غير مكتمل complete = 0) ليراه أي عامل آخر، ثم تجهيز صفوف الطلبة
+  (Vectorized) وكتابتها دفعة واحدة في معاملة واحدة (Bulk Insert) يتمان في خيط كتابة واحد في الخلفية،
+  فلا يتأخر رد /distribute.
+- الاستعلام عن عملية لم تكتمل كتابتها ينتظر انتهاءها (في نفس العملية أو في عامل آخر).
+- فشل الكتابة يُسجل في السجل (logging) ويُحفظ لكل عملية (write_error، وفي عمود error لبقية العمال)،
+  فيُرد الاستعلام عنها بخطأ بدلاً من نتيجة ناقصة. حفظ عملية بمعرف موجود مسبقاً يفشل ولا يستبدلها.
+- إعادة التوزيع (update) تُكتب في خيط الطلب بشرط رقم النسخة (Compare-and-Set)، فإذا سبقها عامل آخر
+  بتعديل نفس العملية تفشل دون تغيير شيء.
+- البحث بالاسم يستخدم نفس فهرس /runs/<run_id>/search (NameIndex)، يُبنى من الأسماء المخزنة
+  عند أول بحث في العملية ويُحفظ لآخر NAME_INDEX_CACHE_SIZE عمليات.
+- وضع WAL: القراءة من عدة خيوط وعمليات في نفس الوقت مع الكتابة، واتصال مستقل لكل خيط.
+- يُحتفظ بآخر max_runs عملية فقط، والأقدم تُحذف.
+-----------------------------------------------------------
+"""
+
+logger = logging.getLogger(__name__)
+
+class RunDatabase:
+    """
+    قاعدة بيانات عمليات التوزيع (SQLite Run Store)
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            student_count INTEGER NOT NULL,
+            stats TEXT,
+            capacity_plan TEXT,
+            source TEXT,
+            version INTEGER NOT NULL DEFAULT 0,
+            complete INTEGER NOT NULL DEFAULT 1,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+
+        CREATE TABLE IF NOT EXISTS assignments (
+            run_id TEXT NOT NULL,
+            student_id TEXT NOT NULL,
+            name TEXT,
+            name_key TEXT,
+            average REAL,
+            channel TEXT,
+            dept TEXT,
+            choice_rank INTEGER,
+            is_faculty_child INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (run_id, student_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS departments (
+            run_id TEXT NOT NULL,
+            dept TEXT NOT NULL,
+            capacity INTEGER,
+            assigned INTEGER,
+            overloads INTEGER,
+            cutoff REAL,
+            PRIMARY KEY (run_id, dept)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            state TEXT NOT NULL,
+            stage TEXT,
+            percent REAL,
+            run_id TEXT,
+            result TEXT,
+            error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+    """
+
+    # أعمدة أُضيفت إلى جدول runs بعد إصداره الأول (تُضاف لقواعد البيانات القديمة عند فتحها)
+    RUN_COLUMNS_ADDED = [
+        ('source', 'TEXT'),
+        ('version', 'INTEGER NOT NULL DEFAULT 0'),
+        ('complete', 'INTEGER NOT NULL DEFAULT 1'),
+        ('error', 'TEXT'),
+    ]
+
+    STUDENT_COLUMNS = ['student_id', 'name', 'average', 'channel', 'dept', 'choice_rank', 'is_faculty_child']
+
+    # عدد صفوف نتائج البحث بالاسم (افتراضي وحد أقصى)
+    DEFAULT_SEARCH_LIMIT = 20
+    MAX_SEARCH_LIMIT = 100
+
+    # مهلة انتظار اكتمال كتابة عملية قبل الاستعلام عنها (بالثواني)، والفاصل بين فحوص
+    # اكتمال عملية يكتبها عامل آخر
+    WRITE_WAIT_TIMEOUT = 60
+    WRITE_POLL_INTERVAL = 0.05
+
+    # عدد المهام المحفوظة في جدول jobs (الأقدم تُحذف)
+    MAX_JOBS = 256
+
+    # عدد فهارس البحث بالاسم المحفوظة في الذاكرة (الأحدث استخداماً)
+    NAME_INDEX_CACHE_SIZE = 4
+
+    def __init__(self, path, max_runs=50):
+        self.path = path
+        self.max_runs = max_runs
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        # منفذ بخيط كتابة واحد (SQLite يسمح بكاتب واحد في كل لحظة)، والخيط نفسه يبدأ عند أول كتابة
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='run-db')
+        self._pending = {} # {run_id: Future}
+        self._errors = {} # {run_id: رسالة آخر كتابة فاشلة}
+        self._pending_lock = threading.Lock()
+        self._name_indexes = OrderedDict() # {run_id: (NameIndex, student_ids)}
+        self._name_index_lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # الاتصال (Connections)
+    # ---------------------------------------------------------
+
+    def _connection(self):
+        """اتصال خاص بالخيط الحالي (يُنشأ مرة واحدة لكل خيط)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._ensure_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self, conn):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(self.SCHEMA)
+                existing = {row[1] for row in conn.execute('PRAGMA table_info(runs)')}
+                with conn:
+                    for column, definition in self.RUN_COLUMNS_ADDED:
+                        if column not in existing:
+                            conn.execute(f'ALTER TABLE runs ADD COLUMN {column} {definition}')
+                self._schema_ready = True
+
+    # ---------------------------------------------------------
+    # تجهيز الصفوف (Row Building) - في خيط الطلب
+    # ---------------------------------------------------------
+
+    @staticmethod
+    def student_keys(values):
+        """
+        تحويل أرقام الطلبة إلى نصوص للمفتاح (12.0 => '12' إذا كان العمود أعداداً صحيحة مخزنة كعشرية).
+
+        Returns:
+            ndarray: نصوص (object).
+        """
+        series = pd.Series(values)
+        if pd.api.types.is_float_dtype(series):
+            present = series.dropna()
+            if (present % 1 == 0).all():
+                series = series.astype('Int64')
+        return series.astype('string').fillna('').to_numpy(dtype=object)
+
+    @staticmethod
+    def name_keys(names):
+        """مفاتيح البحث بالاسم: الأسماء بعد توحيد الكتابة العربية (normalize_names)."""
+        return normalize_names(names)
+
+    @staticmethod
+    def _text_values(column):
+        """قيم عمود نصي كمصفوفة (الأعمدة الفئوية تُحول عبر الرموز Codes دون المرور على كل صف)."""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            categories = np.append(column.cat.categories.astype(str).to_numpy(dtype=object), '')
+            return categories[column.cat.codes.to_numpy()]
+        return column.astype('string').fillna('').to_numpy(dtype=object)
+
+    @classmethod
+    def assignment_rows(cls, run_id, processed, results, positions=None):
+        """
+        صفوف جدول assignments لعملية (أو لمواقع محددة منها عند تحديث بعد إعادة التوزيع).
+
+        Args:
+            processed (DataFrame): البيانات المعالجة للعملية (لا تتغير بعد التحميل).
+            results (dict): لقطة من خريطة النتائج {id: AssignedDepartment}.
+            positions (ndarray, optional): مواقع الطلبة المطلوبين فقط.
+
+        Returns:
+            list: [(run_id, student_id, name, name_key, average, channel, dept, choice_rank, is_faculty_child)]
+        """
+        if positions is not None:
+            processed = processed.iloc[positions]
+        count = len(processed)
+
+        ids = processed['id']
+        depts = ids.map(results).to_numpy(dtype=object)
+        has_dept = pd.notna(depts)
+
+        # ترتيب الرغبة المحققة (1 / 2 / 3)، أو None لغير المقبولين
+        ranks = np.zeros(count, dtype=np.int64)
+        for rank, col in enumerate(DataLoader.CHOICE_COLUMNS, start=1):
+            if col in processed.columns:
+                hit = (ranks == 0) & has_dept & (cls._text_values(processed[col]) == depts)
+                ranks[hit] = rank
+
+        names = processed['name'].astype('string').fillna('') if 'name' in processed.columns \
+            else pd.Series([''] * count, dtype='string')
+        channels = cls._text_values(processed['channel']) if 'channel' in processed.columns \
+            else np.full(count, '', dtype=object)
+        averages = processed['average'].to_numpy(dtype=np.float64)
+        faculty = processed['is_faculty_child'].to_numpy(dtype=bool) if 'is_faculty_child' in processed.columns \
+            else np.zeros(count, dtype=bool)
+
+        return list(zip(
+            [run_id] * count,
+            cls.student_keys(ids).tolist(),
+            names.to_numpy(dtype=object).tolist(),
+            cls.name_keys(names).tolist(),
+            np.round(averages, 4).tolist(),
+            channels.tolist(),
+            [d if has else None for d, has in zip(depts.tolist(), has_dept.tolist())],
+            [r if r else None for r in ranks.tolist()],
+            faculty.astype(np.int64).tolist()
+        ))
+
+    @staticmethod
+    def _processed_frame(run):
+        if run.processed_df is not None:
+            return run.processed_df
+        return run.original_df.rename(columns=DataLoader.COLUMN_MAP)
+
+    @staticmethod
+    def department_rows(run):
+        """صفوف جدول departments: السعة والمقبولون والتجاوزات والحد الأدنى للقبول المركزي."""
+        distributor = run.distributor
+        cutoffs = distributor.central_cutoffs() if distributor is not None else {}
+        rows = []
+        for dept in (run.capacity_plan or {}).get('departments', []):
+            name = dept['name']
+            assigned = overloads = None
+            if distributor is not None and name in distributor.dept_usage_total:
+                assigned = int(distributor.dept_usage_total[name])
+                overloads = int(distributor.dept_overloads.get(name, 0))
+            # الحد الأدنى موجود فقط إذا قُبل طالب مركزي واحد على الأقل
+            rows.append((run.run_id, name, dept.get('capacity'), assigned, overloads, cutoffs.get(name)))
+        return rows
+
+    # ---------------------------------------------------------
+    # الكتابة (Writes) - في خيط الكتابة
+    # ---------------------------------------------------------
+
+    def _submit(self, run_id, fn, *args):
+        future = self._writer.submit(fn, *args)
+        with self._pending_lock:
+            self._pending[run_id] = future
+
+        def done(f):
+            if f.exception() is not None:
+                self._record_error(run_id, f.exception())
+                self._mark_failed(run_id, f.exception())
+            with self._pending_lock:
+                if self._pending.get(run_id) is f:
+                    del self._pending[run_id]
+        future.add_done_callback(done)
+        return future
+
+    def _record_error(self, run_id, error):
+        """تسجيل فشل كتابة عملية (في السجل، وفي حالة العملية لترد الاستعلامات عنها بخطأ)."""
+        logger.error("Failed to save run %s", run_id, exc_info=error)
+        with self._pending_lock:
+            self._errors.pop(run_id, None)
+            self._errors[run_id] = str(error)
+            while len(self._errors) > self.max_runs:
+                del self._errors[next(iter(self._errors))]
+
+    def _mark_failed(self, run_id, error):
+        """تسجيل فشل الكتابة في صف العملية (لبقية العمال)، إذا لم تكتمل كتابتها."""
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('UPDATE runs SET error = ? WHERE run_id = ? AND complete = 0', (str(error), run_id))
+        except Exception:
+            logger.exception("Failed to record the save error of run %s", run_id)
+
+    @staticmethod
+    def _source_json(run):
+        source = getattr(run, 'source', None)
+        return json.dumps(source, ensure_ascii=False) if source is not None else None
+
+    def save(self, run):
+        """
+        حفظ عملية توزيع كاملة.
+
+        في خيط الطلب يُكتب صف العملية (غير مكتمل) وتُؤخذ لقطة من النتائج وخطة المقاعد فقط (سريعة)،
+        وتجهيز صفوف الطلبة والكتابة يتمان في خيط الكتابة، فلا يتأثر زمن الرد بحجم الملف.
+
+        Returns:
+            Future، أو None عند الفشل (لا يُفشل طلب التوزيع بسبب الحفظ).
+        """
+        try:
+            meta = (run.run_id, run.created_at, len(run.original_df),
+                    json.dumps(run.stats, ensure_ascii=False), json.dumps(run.capacity_plan, ensure_ascii=False),
+                    self._source_json(run), getattr(run, 'version', 0))
+            conn = self._connection()
+            # عملية جديدة فقط: المعرف المكرر يفشل (IntegrityError) ولا تُكتب صفوف طلبتها
+            with conn:
+                conn.execute('INSERT INTO runs (run_id, created_at, student_count, stats, capacity_plan, source, version, complete) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, 0)', meta)
+            return self._submit(run.run_id, self._write_run, run.run_id, self._processed_frame(run),
+                                dict(run.results), self.department_rows(run))
+        except sqlite3.IntegrityError:
+            # المعرف مستخدم: العملية المحفوظة سليمة، فلا يُسجل الخطأ عليها (write_error)
+            logger.error("Run %s is already saved, the new save was refused", run.run_id)
+            return None
+        except Exception as e:
+            self._record_error(run.run_id, e)
+            return None
+
+    def update(self, run, changes, source=None):
+        """
+        حفظ إعادة التوزيع: الطلبة الذين تغير قبولهم، الأقسام، الإحصائيات، والمصدر الجديد (الإعدادات).
+
+        تُكتب في خيط الطلب (التغييرات عادة قليلة) في معاملة واحدة بشرط أن تكون النسخة المحفوظة
+        هي نفس نسخة العملية في الذاكرة (run.version)، ثم تزيد النسخة.
+
+        Returns:
+            int: رقم النسخة الجديدة.
+
+        Raises:
+            LookupError: إذا لم تكن العملية محفوظة.
+            RuntimeError: إذا عدّل عامل آخر العملية بعد قراءتها (لا يُكتب شيء).
+        """
+        run_id = run.run_id
+        self.wait(run_id)
+        processed = self._processed_frame(run)
+        results = {student_id: run.results.get(student_id) for student_id in changes}
+        rows = []
+        if results:
+            positions = DataLoader.id_positions(processed['id'], list(results))
+            rows = self.assignment_rows(run_id, processed, results, positions[positions >= 0])
+        departments = self.department_rows(run)
+        source_json = json.dumps(source, ensure_ascii=False) if source is not None else None
+
+        conn = self._connection()
+        with conn:
+            updated = conn.execute(
+                'UPDATE runs SET stats = ?, capacity_plan = ?, source = COALESCE(?, source), version = version + 1 '
+                'WHERE run_id = ? AND version = ?',
+                (json.dumps(run.stats, ensure_ascii=False), json.dumps(run.capacity_plan, ensure_ascii=False),
+                 source_json, run_id, run.version)
+            ).rowcount
+            if updated == 0:
+                if conn.execute('SELECT 1 FROM runs WHERE run_id = ?', (run_id,)).fetchone() is None:
+                    raise LookupError(f"Run {run_id} is not saved")
+                raise RuntimeError("The run was changed by another request, please reload it")
+            conn.executemany('INSERT OR REPLACE INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.execute('DELETE FROM departments WHERE run_id = ?', (run_id,))
+            conn.executemany('INSERT OR REPLACE INTO departments VALUES (?, ?, ?, ?, ?, ?)', departments)
+        return run.version + 1
+
+    def _write_run(self, run_id, processed, results, departments):
+        rows = self.assignment_rows(run_id, processed, results)
+        conn = self._connection()
+        with conn:
+            # رقم الطالب المكرر في الملف: يُحفظ أول صف له (نفس صف التحديث في update)
+            conn.executemany('INSERT OR IGNORE INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            conn.executemany('INSERT INTO departments VALUES (?, ?, ?, ?, ?, ?)', departments)
+            if conn.execute('UPDATE runs SET complete = 1 WHERE run_id = ?', (run_id,)).rowcount == 0:
+                raise LookupError(f"Run {run_id} was removed before it was saved")
+        self._prune(conn)
+
+    def _prune(self, conn):
+        """حذف العمليات الأقدم من آخر max_runs عملية."""
+        stale = [row[0] for row in conn.execute(
+            'SELECT run_id FROM runs ORDER BY created_at DESC LIMIT -1 OFFSET ?', (self.max_runs,))]
+        if not stale:
+            return
+        with conn:
+            for run_id in stale:
+                conn.execute('DELETE FROM assignments WHERE run_id = ?', (run_id,))
+                conn.execute('DELETE FROM departments WHERE run_id = ?', (run_id,))
+                conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+
+    def wait(self, run_id, timeout=None):
+        """
+        انتظار اكتمال كتابة عملية (إن كانت معلقة): في هذه العملية عبر الـ Future،
+        وفي عامل آخر بفحص عمود complete حتى يكتمل أو يُسجل فشله أو تنتهي المهلة.
+        """
+        timeout = timeout if timeout is not None else self.WRITE_WAIT_TIMEOUT
+        with self._pending_lock:
+            future = self._pending.get(run_id)
+            failed = run_id in self._errors
+        if future is not None:
+            if future.exception(timeout=timeout) is not None:
+                return
+        elif failed:
+            return
+
+        deadline = time.monotonic() + timeout
+        conn = self._connection()
+        while True:
+            row = conn.execute('SELECT complete, error FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+            if row is None or row['complete'] or row['error'] is not None or time.monotonic() >= deadline:
+                return
+            time.sleep(self.WRITE_POLL_INTERVAL)
+
+    def write_error(self, run_id):
+        """
+        رسالة فشل آخر كتابة للعملية (بعد انتظار الكتابة المعلقة).
+
+        Returns:
+            str أو None إذا نجحت جميع كتابات العملية.
+        """
+        with self._pending_lock:
+            future = self._pending.get(run_id)
+        if future is not None:
+            # من الـ Future مباشرة: قد ينتهي قبل أن يسجل done خطأه
+            error = future.exception(timeout=self.WRITE_WAIT_TIMEOUT)
+            if error is not None:
+                return str(error)
+        with self._pending_lock:
+            error = self._errors.get(run_id)
+        if error is not None:
+            return error
+
+        # فشل كتابة عملية في عامل آخر
+        self.wait(run_id)
+        row = self._connection().execute('SELECT error FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return row['error'] if row is not None else None
+
+    # ---------------------------------------------------------
+    # القراءة (Reads)
+    # ---------------------------------------------------------
+
+    def has_run(self, run_id):
+        self.wait(run_id)
+        return self._connection().execute('SELECT 1 FROM runs WHERE run_id = ?', (run_id,)).fetchone() is not None
+
+    def run_source(self, run_id):
+        """
+        مصدر العملية ورقم نسختها (لإعادة بنائها في عامل لا يحملها في ذاكرته).
+        لا ينتظر كتابة صفوف الطلبة: صف العملية يُكتب قبل الرد على /distribute.
+
+        Returns:
+            tuple: (source, version, created_at) حيث source قاموس أو None (عملية بدون مصدر محفوظ)،
+            أو None إذا لم تكن العملية محفوظة.
+        """
+        row = self._connection().execute(
+            'SELECT source, version, created_at FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        if row is None:
+            return None
+        source = json.loads(row['source']) if row['source'] else None
+        return source, row['version'], row['created_at']
+
+    def get_student(self, run_id, student_id):
+        """
+        قبول طالب واحد في عملية (بالمفتاح الأساسي، استعلام واحد).
+
+        Returns:
+            dict أو None إذا لم يوجد الطالب في العملية.
+        """
+        self.wait(run_id)
+        row = self._connection().execute(
+            'SELECT a.student_id, a.name, a.average, a.channel, a.dept, a.choice_rank, a.is_faculty_child, d.cutoff '
+            'FROM assignments a LEFT JOIN departments d ON d.run_id = a.run_id AND d.dept = a.dept '
+            'WHERE a.run_id = ? AND a.student_id = ?',
+            (run_id, str(student_id).strip())
+        ).fetchone()
+        return self._student_record(row) if row is not None else None
+
+    def get_students(self, run_id, student_ids):
+        """
+        سجلات عدة طلبة في عملية باستعلام واحد، بنفس ترتيب student_ids (غير الموجود يُتجاوز).
+
+        Returns:
+            list: سجلات الطلبة.
+        """
+        if not student_ids:
+            return []
+        self.wait(run_id)
+        keys = [str(student_id).strip() for student_id in student_ids]
+        rows = self._connection().execute(
+            'SELECT a.student_id, a.name, a.average, a.channel, a.dept, a.choice_rank, a.is_faculty_child, d.cutoff '
+            'FROM assignments a LEFT JOIN departments d ON d.run_id = a.run_id AND d.dept = a.dept '
+            f'WHERE a.run_id = ? AND a.student_id IN ({", ".join("?" * len(keys))})',
+            (run_id, *keys)
+        ).fetchall()
+        records = {row['student_id']: self._student_record(row) for row in rows}
+        return [records[key] for key in keys if key in records]
+
+    def name_index(self, run_id):
+        """
+        فهرس البحث بالاسم لعملية محفوظة (يُبنى من الأسماء الموحدة المخزنة عند أول بحث).
+
+        Returns:
+            tuple: (NameIndex, student_ids)، أو None إذا لم توجد العملية.
+        """
+        with self._name_index_lock:
+            cached = self._name_indexes.get(run_id)
+            if cached is not None:
+                self._name_indexes.move_to_end(run_id)
+                return cached
+
+        self.wait(run_id)
+        rows = self._connection().execute(
+            'SELECT student_id, name_key FROM assignments WHERE run_id = ?', (run_id,)).fetchall()
+        if not rows:
+            return None
+        student_ids = np.array([row[0] for row in rows], dtype=object)
+        cached = (NameIndex([row[1] for row in rows]), student_ids)
+
+        with self._name_index_lock:
+            self._name_indexes[run_id] = cached
+            while len(self._name_indexes) > self.NAME_INDEX_CACHE_SIZE:
+                self._name_indexes.popitem(last=False)
+        return cached
+
+    def search_names(self, run_id, query, limit=None):
+        """
+        البحث بالاسم بنفس قواعد /runs/<run_id>/search (انظر NameIndex): توحيد الكتابة العربية،
+        والترتيب حسب قرب المطابقة (مطابق تماماً، ثم بداية الاسم، ثم بدايات الكلمات، ثم أجزاؤها).
+
+        Returns:
+            list: سجلات الطلبة المطابقين مع نوع المطابقة (match).
+        """
+        limit = max(1, min(int(limit or self.DEFAULT_SEARCH_LIMIT), self.MAX_SEARCH_LIMIT))
+        if not normalize_name(query):
+            return []
+        stored = self.name_index(run_id)
+        if stored is None:
+            return []
+        index, student_ids = stored
+        positions, scores = index.rank(query)
+        top = positions[:limit]
+        records = self.get_students(run_id, student_ids[top].tolist())
+        labels = dict(zip(student_ids[top].tolist(), scores[:limit].tolist()))
+        for record in records:
+            record['match'] = NameIndex.MATCH_LABELS[labels[record['id']]]
+        return records
+
+    # ---------------------------------------------------------
+    # المهام (Jobs) - حالة /jobs المشتركة بين العمال
+    # ---------------------------------------------------------
+
+    def save_job(self, job):
+        """
+        حفظ حالة مهمة (Job.to_dict مع وقت إنشائها)، مع حذف الأقدم بعد MAX_JOBS.
+        الفشل يُسجل فقط: المهمة تبقى متاحة من العامل الذي ينفذها.
+        """
+        try:
+            record = job.to_dict()
+            conn = self._connection()
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+                    record['job_id'], job.created_at, record['state'], record['stage'], record['percent'],
+                    record['run_id'], json.dumps(record['result'], ensure_ascii=False) if record['result'] is not None else None,
+                    record['error']
+                ))
+                conn.execute('DELETE FROM jobs WHERE job_id IN ('
+                             'SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT -1 OFFSET ?)', (self.MAX_JOBS,))
+        except Exception:
+            logger.exception("Failed to save job %s", job.job_id)
+
+    def get_job(self, job_id):
+        """
+        حالة مهمة محفوظة (بنفس شكل Job.to_dict).
+
+        Returns:
+            dict أو None إذا لم توجد.
+        """
+        row = self._connection().execute(
+            'SELECT job_id, state, stage, percent, run_id, result, error FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row['job_id'],
+            "state": row['state'],
+            "stage": row['stage'],
+            "percent": row['percent'],
+            "run_id": row['run_id'],
+            "result": json.loads(row['result']) if row['result'] else None,
+            "error": row['error']
+        }
+
+    @staticmethod
+    def _student_record(row):
+        return {
+            "id": row['student_id'],
+            "name": row['name'],
+            "average": row['average'],
+            "channel": row['channel'],
+            "dept": row['dept'],
+            "status": 'assigned' if row['dept'] is not None else 'unassigned',
+            "choice_rank": row['choice_rank'],
+            "is_faculty_child": bool(row['is_faculty_child']),
+            "cutoff": row['cutoff']
+        }
@@ -0,0 +1,227 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from src.loader import DataLoader
+
+"""
+-----------------------------------------------------------
+Run Diff Module (run_diff.py)
+
+الفرق بين عمليتي توزيع (مثلاً قبل وبعد تعديل السعات أو النسب): من تغير قبوله؟
+
+- الربط بين العمليتين يتم برقم الطالب (Vectorized Join)، والأقسام تُرمز كأعداد (Categorical Codes)
+  فتتم المقارنة والعد على مصفوفات أعداد دون المرور على كل طالب.
+- أنواع التغيير:
+    gained:   غير مقبول => مقبول
+    lost:     مقبول => غير مقبول
+    switched: من قسم إلى قسم آخر
+- لكل قسم: المقبولون قبل وبعد، الداخلون (Inflow) والخارجون (Outflow)، وتغير الحد الأدنى للقبول المركزي.
+- النتيجة تُرسل على دفعات (Streaming) بصيغة JSON أو CSV: كل دفعة تُبنى من شريحة الطلبة الخاصة بها فقط،
+  دون بناء جدول التغييرات أو الاستجابة كاملة في الذاكرة.
+- رقم الطالب المكرر في الملف يأخذ الاسم والمعدل من أول صف له.
+-----------------------------------------------------------
+"""
+
+class RunDiff:
+    """
+    الفرق بين عمليتي توزيع (Run Diff)
+    """
+
+    CHANGE_TYPES = ('gained', 'lost', 'switched')
+    COLUMNS = ['id', 'name', 'average', 'before', 'after', 'change']
+
+    # عدد الصفوف في كل دفعة من الاستجابة المتدفقة
+    CHUNK_SIZE = 50_000
+
+    def __init__(self, before, after, before_cutoffs=None, after_cutoffs=None, students=None):
+        """
+        Args:
+            before, after (dict): نتائج العمليتين {id: AssignedDepartment أو None} (ناتج Distributor.distribute).
+            before_cutoffs, after_cutoffs (dict, optional): الحد الأدنى للقبول المركزي {dept: cutoff}
+                (ناتج Distributor.central_cutoffs).
+            students (DataFrame, optional): البيانات المعالجة (id, name, average) لإضافة الاسم والمعدل لكل تغيير.
+        """
+        # أسماء الأقسام كنصوص: الأقسام المرقمة (مثل 101) قد تُقرأ كأعداد من الملف
+        self.before_cutoffs = {str(dept): cutoff for dept, cutoff in (before_cutoffs or {}).items()}
+        self.after_cutoffs = {str(dept): cutoff for dept, cutoff in (after_cutoffs or {}).items()}
+
+        # 1. ترميز الأقسام بأعداد مشتركة بين العمليتين (-1 = غير مقبول: None أو NaN)
+        before_ids, before_values = self._as_arrays(before)
+        after_ids, after_values = self._as_arrays(after)
+        before_codes, before_depts = pd.factorize(before_values)
+        after_codes, after_depts = pd.factorize(after_values)
+        # التحويل إلى نص على القيم الفريدة فقط (عدد الأقسام)، لا على كل طالب
+        before_depts = [str(dept) for dept in before_depts]
+        after_depts = [str(dept) for dept in after_depts]
+        departments = set(before_depts) | set(after_depts) | set(self.before_cutoffs) | set(self.after_cutoffs)
+        self.departments = sorted(departments)
+        before_codes = self._recode(before_codes, before_depts, self.departments)
+        after_codes = self._recode(after_codes, after_depts, self.departments)
+
+        # 2. الربط برقم الطالب (الطلبة الموجودون في عملية واحدة فقط يعتبرون غير مقبولين في الأخرى)
+        if len(before_ids) == len(after_ids) and np.array_equal(before_ids, after_ids):
+            self.ids = before_ids
+        else:
+            index = pd.Index(before_ids).union(pd.Index(after_ids), sort=False)
+            self.ids = index.to_numpy()
+            before_codes = self._align(index, before_ids, before_codes)
+            after_codes = self._align(index, after_ids, after_codes)
+        self.before_codes, self.after_codes = before_codes, after_codes
+
+        # 3. الطلبة الذين تغير قبولهم ونوع التغيير
+        self.changed = np.flatnonzero(self.before_codes != self.after_codes)
+        before_changed = self.before_codes[self.changed]
+        after_changed = self.after_codes[self.changed]
+        self.change_codes = np.where(before_changed < 0, 0, np.where(after_changed < 0, 1, 2)).astype(np.int8)
+
+        self._students = students
+
+    @staticmethod
+    def _as_arrays(results):
+        """خريطة النتائج => (مصفوفة أرقام الطلبة، مصفوفة الأقسام)."""
+        ids = np.array(list(results.keys()))
+        depts = np.fromiter(results.values(), dtype=object, count=len(results))
+        return ids, depts
+
+    @staticmethod
+    def _recode(codes, uniques, departments):
+        """تحويل رموز factorize (لكل عملية) إلى مواقع الأقسام في القائمة المشتركة المرتبة."""
+        lookup = np.append(pd.Index(departments, dtype=object).get_indexer(pd.Index(uniques, dtype=object)), -1).astype(np.int32)
+        return lookup[codes] # الرمز -1 (غير مقبول) => آخر عنصر (-1)
+
+    @staticmethod
+    def _align(index, ids, codes):
+        """رموز عملية بترتيب الطلبة الموحد (غير الموجود في العملية => -1)."""
+        aligned = np.full(len(index), -1, dtype=np.int32)
+        aligned[index.get_indexer(ids)] = codes
+        return aligned
+
+    @classmethod
+    def from_runs(cls, before_run, after_run):
+        """الفرق بين عمليتين محفوظتين (DistributionRun)، مع الحدود الدنيا من موزع كل عملية إن وجد."""
+        def cutoffs(run):
+            return run.distributor.central_cutoffs() if run.distributor is not None else {}
+
+        return cls(
+            dict(before_run.results), dict(after_run.results),
+            cutoffs(before_run), cutoffs(after_run),
+            students=after_run.processed_df
+        )
+
+    @property
+    def total(self):
+        return len(self.ids)
+
+    def summary(self):
+        """
+        ملخص الفرق: عدد كل نوع تغيير، وحركة كل قسم وتغير حده الأدنى.
+
+        Returns:
+            dict: {total, changed, gained, lost, switched, departments: [...]}
+        """
+        count = len(self.departments)
+        before_changed = self.before_codes[self.changed]
+        after_changed = self.after_codes[self.changed]
+
+        assigned_before = np.bincount(self.before_codes[self.before_codes >= 0], minlength=count)
+        assigned_after = np.bincount(self.after_codes[self.after_codes >= 0], minlength=count)
+        outflow = np.bincount(before_changed[before_changed >= 0], minlength=count)
+        inflow = np.bincount(after_changed[after_changed >= 0], minlength=count)
+        change_counts = np.bincount(self.change_codes, minlength=len(self.CHANGE_TYPES))
+
+        departments = []
+        for i, dept in enumerate(self.departments):
+            cutoff_before = self.before_cutoffs.get(dept)
+            cutoff_after = self.after_cutoffs.get(dept)
+            shift = None
+            if cutoff_before is not None and cutoff_after is not None:
+                shift = round(cutoff_after - cutoff_before, 4)
+            departments.append({
+                "dept": dept,
+                "before": int(assigned_before[i]),
+                "after": int(assigned_after[i]),
+                "inflow": int(inflow[i]),
+                "outflow": int(outflow[i]),
+                "net": int(inflow[i] - outflow[i]),
+                "cutoff_before": cutoff_before,
+                "cutoff_after": cutoff_after,
+                "cutoff_shift": shift
+            })
+
+        return {
+            "total": self.total,
+            "changed": int(len(self.changed)),
+            **{change: int(change_counts[i]) for i, change in enumerate(self.CHANGE_TYPES)},
+            "departments": departments
+        }
+
+    def changes(self, start=0, stop=None):
+        """
+        جدول الطلبة الذين تغير قبولهم (بترتيب الطلبة في العمليتين)، أو شريحة منه [start:stop].
+
+        Returns:
+            DataFrame: الأعمدة COLUMNS (None للقسم يعني غير مقبول).
+        """
+        labels = np.array(self.departments + [None], dtype=object) # الرمز -1 => None
+        changed = self.changed[start:stop]
+        ids = self.ids[changed]
+
+        names = np.full(len(ids), None, dtype=object)
+        averages = np.full(len(ids), np.nan)
+        students = self._students
+        if students is not None and len(ids):
+            positions = DataLoader.id_positions(students['id'], ids)
+            found = positions >= 0
+            if 'name' in students.columns:
+                # أخذ الصفوف المطلوبة فقط قبل التحويل (تحويل عمود النصوص كاملاً مكلف)
+                names[found] = students['name'].iloc[positions[found]].to_numpy(dtype=object)
+            if 'average' in students.columns:
+                averages[found] = students['average'].to_numpy(dtype=np.float64)[positions[found]].round(2)
+
+        return pd.DataFrame({
+            'id': ids,
+            'name': names,
+            'average': averages,
+            'before': labels[self.before_codes[changed]],
+            'after': labels[self.after_codes[changed]],
+            'change': np.array(self.CHANGE_TYPES, dtype=object)[self.change_codes[start:stop]]
+        }, columns=self.COLUMNS)
+
+    def _chunks(self, chunk_size=None):
+        """جدول التغييرات على دفعات، كل دفعة تُبنى عند طلبها فقط."""
+        size = chunk_size or self.CHUNK_SIZE
+        for start in range(0, len(self.changed), size):
+            yield self.changes(start, start + size)
+
+    def iter_json(self, chunk_size=None):
+        """
+        الفرق بصيغة JSON على دفعات: {status, summary, changes: [...]}.
+
+        Yields:
+            str
+        """
+        yield '{"status": "success", "summary": ' + json.dumps(self.summary(), ensure_ascii=False) + ', "changes": ['
+        separator = ''
+        for chunk in self._chunks(chunk_size):
+            yield separator + chunk.to_json(orient='records', force_ascii=False)[1:-1]
+            separator = ','
+        yield ']}'
+
+    def iter_csv(self, chunk_size=None):
+        """
+        جدول التغييرات بصيغة CSV على دفعات (مع BOM ليفتح Excel النص العربي بشكل صحيح).
+
+        Yields:
+            str
+        """
+        yield '\ufeff' + ','.join(self.COLUMNS) + '\n'
+        for chunk in self._chunks(chunk_size):
+            yield chunk.to_csv(index=False, header=False)
@@ -0,0 +1,335 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from src.exporter import Exporter
+from src.loader import DataLoader
+from src.name_index import NameIndex
+from src.rules import Rules
+
+class DistributionRun:
+    """
+    نتيجة عملية توزيع واحدة (Distribution Run)
+
+    تحتفظ بالبيانات اللازمة لخدمة النتائج بعد انتهاء طلب /distribute:
+    البيانات الأصلية، خريطة النتائج، خطة المقاعد، والإحصائيات.
+    ملف الإكسل لا يُنشأ إلا عند أول طلب تحميل، ثم يُحفظ لإعادة استخدامه.
+
+    إذا حُفظ معها الموزع (Distributor)، يمكن تعديل السعات أو النسب وإعادة التوزيع
+    تزايدياً على نفس العملية (redistribute) دون إعادة التوزيع كاملاً.
+
+    عرض النتائج يتم على صفحات (Pagination) من جهة الخادم:
+    مصفوفات الترتيب (Sorted Index Arrays) تُحسب مرة واحدة لكل حقل ترتيب وتُحفظ،
+    والتصفية تتم بأقنعة منطقية (Boolean Masks) فوق الترتيب المحفوظ.
+
+    البحث بالاسم يتم عبر فهرس الأسماء الموحدة (NameIndex) الذي يُبنى عند أول بحث ويُحفظ،
+    ويمكن ترتيب نتائج البحث حسب قرب المطابقة (sort='relevance').
+
+    source: مصدر العملية (بصمة الملف المرفوع وإعدادات التوزيع الحالية) و version: رقم نسختها في
+    قاعدة البيانات، لإعادة بنائها في عامل آخر ومعرفة ما إذا كانت النسخة في الذاكرة قديمة.
+    """
+
+    # حقول الترتيب المتاحة: {اسم_الحقل: اسم_العمود في البيانات المعالجة}
+    SORT_FIELDS = {
+        'average': 'average',
+        'name': 'name',
+        'id': 'id',
+        'dept': None # عمود النتيجة
+    }
+    DEFAULT_SORT = '-average'
+    RELEVANCE_SORT = 'relevance' # ترتيب حسب قرب المطابقة (مع البحث بالاسم فقط)
+    MAX_PAGE_SIZE = 500
+    DEFAULT_SEARCH_LIMIT = 20
+
+    def __init__(self, original_df, results, capacity_plan=None, stats=None, processed_df=None, distributor=None):
+        self.run_id = uuid.uuid4().hex
+        self.created_at = time.time()
+        self.original_df = original_df
+        self.processed_df = processed_df
+        self.results = results
+        self.capacity_plan = capacity_plan
+        self.stats = stats if stats else {}
+        self.distributor = distributor
+        self.source = None # {token, mode, capacity_input, quotas}
+        self.version = 0
+        self._redistribute_lock = threading.Lock()
+        self._export = None
+        self._export_lock = threading.Lock()
+
+        # أعمدة العرض (تُبنى عند أول استعلام)
+        self._assigned = None
+        self._channels = None
+        self._sort_orders = {} # {sort_key: ndarray}
+        self._view_lock = threading.Lock()
+
+        # فهرس البحث بالاسم (يُبنى عند أول بحث، والأسماء لا تتغير بإعادة التوزيع)
+        self._name_index = None
+        self._name_index_lock = threading.Lock()
+
+    def get_export(self):
+        """
+        ملف الإكسل الخاص بالنتائج (يُبنى عند أول طلب فقط، بالكتابة المتدفقة).
+
+        Returns:
+            bytes: محتوى ملف الإكسل.
+        """
+        with self._export_lock:
+            if self._export is None:
+                output = Exporter.export_to_buffer(self.original_df, self.results, self.capacity_plan, streaming=True)
+                self._export = output.getvalue()
+            return self._export
+
+    def redistribute(self, mode, capacity_input, quotas=None, persist=None):
+        """
+        إعادة التوزيع التزايدية بعد تعديل السعات أو النسب (Incremental Re-distribution).
+        تُحدّث النتائج والإحصائيات وخطة المقاعد في مكانها، ويُلغى ملف الإكسل وأعمدة العرض المحفوظة.
+
+        Args:
+            persist (callable, optional): persist(changes) لحفظ التعديل وإرجاع رقم النسخة الجديد،
+                يُستدعى داخل نفس القفل (فتُحفظ إعادات التوزيع المتتالية بنفس ترتيبها). إذا فشل
+                تصبح النسخة في الذاكرة غير مطابقة للمحفوظة (version = None) ويُمرر الخطأ.
+
+        Returns:
+            dict: {id: AssignedDepartment} للطلبة الذين تغير قبولهم فقط.
+
+        Raises:
+            RuntimeError: إذا لم يُحفظ الموزع مع هذه العملية.
+        """
+        if self.distributor is None:
+            raise RuntimeError("This run does not support redistribution")
+
+        with self._redistribute_lock:
+            changes = self.distributor.redistribute(mode, capacity_input, quotas)
+
+            with self._export_lock, self._view_lock:
+                assigned_delta = 0
+                for student_id, dept in changes.items():
+                    assigned_delta += (dept is not None) - (self.results.get(student_id) is not None)
+                self.results.update(changes)
+                self.capacity_plan = self.distributor.plan.to_dict()
+                if self.stats:
+                    self.stats = dict(self.stats)
+                    self.stats['assigned'] += assigned_delta
+                    self.stats['unassigned'] -= assigned_delta
+
+                # الملف وأعمدة العرض تُبنى من جديد عند الطلب التالي
+                self._export = None
+                self._assigned = None
+                self._sort_orders = {key: order for key, order in self._sort_orders.items() if key.lstrip('-') != 'dept'}
+
+            if persist is not None:
+                try:
+                    self.version = persist(changes)
+                except Exception:
+                    self.version = None
+                    raise
+
+        return changes
+
+    def _processed_frame(self):
+        """البيانات المعالجة (بأسماء الأعمدة الداخلية) للاستخدام في الترتيب والتصفية."""
+        if self.processed_df is not None:
+            return self.processed_df
+        return self.original_df.rename(columns=DataLoader.COLUMN_MAP)
+
+    def _build_view(self):
+        """تجهيز عمودي القسم المقبول والقناة الموحدة (مرة واحدة لكل عملية)."""
+        if self._assigned is not None:
+            return
+        self._assigned = self.original_df['ت'].map(self.results).to_numpy(dtype=object)
+        processed = self._processed_frame()
+        if 'channel' in processed.columns:
+            self._channels = Rules.normalize_channels(processed['channel']).to_numpy(dtype=object)
+        else:
+            self._channels = np.full(len(self.original_df), 'مركزي', dtype=object)
+
+    def get_name_index(self):
+        """فهرس البحث بالاسم (يُبنى مرة واحدة لكل عملية)."""
+        with self._name_index_lock:
+            if self._name_index is None:
+                processed = self._processed_frame()
+                names = processed['name'] if 'name' in processed.columns else [''] * len(processed)
+                self._name_index = NameIndex(names)
+            return self._name_index
+
+    def search(self, query, limit=None):
+        """
+        البحث عن الطلبة بالاسم مرتبين حسب قرب المطابقة (انظر NameIndex).
+
+        Returns:
+            dict: {total, matches: [{id, name, average, channel, dept, match}]}
+        """
+        limit = max(1, min(int(limit or self.DEFAULT_SEARCH_LIMIT), self.MAX_PAGE_SIZE))
+        positions, scores = self.get_name_index().rank(query)
+        if positions is None:
+            return {"total": 0, "matches": []}
+
+        with self._view_lock:
+            self._build_view()
+            assigned, channels = self._assigned, self._channels
+
+        top = positions[:limit]
+        processed = self._processed_frame().iloc[top]
+        names = processed['name'] if 'name' in processed.columns else pd.Series([''] * len(top))
+        matches = [
+            {
+                "id": student_id,
+                "name": name,
+                "average": average,
+                "channel": channel,
+                "dept": dept,
+                "match": NameIndex.MATCH_LABELS[score]
+            }
+            for student_id, name, average, channel, dept, score in zip(
+                processed['id'].tolist(),
+                names.astype(object).where(pd.notna(names), '').tolist(),
+                processed['average'].astype(float).round(2).tolist(),
+                channels[top].tolist(),
+                pd.Series(assigned[top], dtype=object).where(pd.notna(assigned[top]), None).tolist(),
+                scores[:limit].tolist()
+            )
+        ]
+        return {"total": int(len(positions)), "matches": matches}
+
+    def _sort_values(self, field):
+        """القيم المستخدمة للترتيب حسب الحقل."""
+        if field == 'dept':
+            return self._assigned
+        return self._processed_frame()[self.SORT_FIELDS[field]]
+
+    def _get_sort_order(self, sort):
+        """
+        مصفوفة الترتيب لحقل معين (تُحسب مرة واحدة ثم تُحفظ).
+        الصيغة: 'average' تصاعدي، '-average' تنازلي. القيم الفارغة دائماً في النهاية.
+        """
+        if sort in self._sort_orders:
+            return self._sort_orders[sort]
+
+        descending = sort.startswith('-')
+        field = sort.lstrip('-')
+        if field not in self.SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {field}")
+
+        # ترميز القيم كأعداد مرتبة (Factorize) ليعمل نفس المنطق على الأرقام والنصوص
+        codes, _ = pd.factorize(self._sort_values(field), sort=True)
+        codes = codes.astype(np.int64)
+        if descending:
+            codes = -codes
+        codes[codes == (1 if descending else -1)] = np.iinfo(np.int64).max
+        order = np.argsort(codes, kind='stable')
+
+        self._sort_orders[sort] = order
+        return order
+
+    def query(self, page=1, size=50, sort=None, dept=None, channel=None, status=None, name=None):
+        """
+        استعلام صفحة من النتائج (Paginated Results Query)
+
+        Args:
+            page (int): رقم الصفحة (يبدأ من 1).
+            size (int): عدد الصفوف في الصفحة (بحد أقصى MAX_PAGE_SIZE).
+            sort (str): حقل الترتيب، مثل '-average' أو 'name'، أو 'relevance' (قرب المطابقة مع البحث بالاسم).
+            dept (str): تصفية حسب القسم المقبول.
+            channel (str): تصفية حسب القناة الموحدة ('مركزي', 'الموازي', 'ذوي الشهداء').
+            status (str): 'assigned' أو 'unassigned'.
+            name (str): البحث بالاسم (مع توحيد الكتابة العربية).
+
+        Returns:
+            dict: {page, size, total, pages, data}
+        """
+        size = max(1, min(int(size), self.MAX_PAGE_SIZE))
+        page = max(1, int(page))
+
+        # البحث بالاسم: ترتيب حسب قرب المطابقة، أو قناع فوق الترتيب المختار
+        relevance = sort == self.RELEVANCE_SORT
+        name_index = self.get_name_index() if name else None
+        ranked = name_index.rank(name)[0] if name_index is not None and relevance else None
+
+        with self._view_lock:
+            self._build_view()
+            if ranked is not None:
+                order = ranked
+            else:
+                # 'relevance' بدون نص بحث => الترتيب الافتراضي
+                order = self._get_sort_order(self.DEFAULT_SORT if relevance or not sort else sort)
+            assigned, channels = self._assigned, self._channels
+
+        # التصفية (Filtering) بأقنعة منطقية فوق الترتيب المحفوظ
+        mask = None
+        if name_index is not None and ranked is None:
+            mask = name_index.mask(name)
+        if dept:
+            dept_mask = assigned == dept
+            mask = dept_mask if mask is None else (mask & dept_mask)
+        if channel:
+            channel_mask = channels == channel
+            mask = channel_mask if mask is None else (mask & channel_mask)
+        if status in ('assigned', 'unassigned'):
+            is_assigned = pd.notna(assigned)
+            status_mask = is_assigned if status == 'assigned' else ~is_assigned
+            mask = status_mask if mask is None else (mask & status_mask)
+        if mask is not None:
+            order = order[mask[order]]
+
+        total = len(order)
+        page_rows = order[(page - 1) * size:page * size]
+
+        # بناء سجلات الصفحة فقط
+        page_df = self.original_df.iloc[page_rows].copy()
+        page_df[Exporter.RESULT_COLUMN] = pd.Series(assigned[page_rows], index=page_df.index).fillna(Exporter.UNASSIGNED_LABEL)
+        page_df['القناة'] = channels[page_rows]
+
+        return {
+            "page": page,
+            "size": size,
+            "total": total,
+            "pages": math.ceil(total / size) if total else 0,
+            "data": page_df.astype(object).where(pd.notna(page_df), '').to_dict(orient='records')
+        }
+
+class RunStore:
+    """
+    مخزن عمليات التوزيع (In-Process Run Store)
+
+    يحفظ آخر عمليات التوزيع في الذاكرة بمعرف فريد (run_id)، مع حذف الأقدم
+    عند تجاوز الحد الأقصى (LRU).
+    """
+
+    def __init__(self, max_runs=16):
+        self.max_runs = max_runs
+        self._runs = OrderedDict() # {run_id: DistributionRun}
+        self._lock = threading.Lock()
+
+    def add(self, run):
+        """إضافة عملية توزيع جديدة، وإعادة معرفها."""
+        with self._lock:
+            self._runs[run.run_id] = run
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return run.run_id
+
+    def get(self, run_id):
+        """
+        Returns:
+            DistributionRun أو None إذا لم تكن العملية موجودة (أو حُذفت).
+        """
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                self._runs.move_to_end(run_id)
+            return run
+
+    def __len__(self):
+        with self._lock:
+            return len(self._runs)
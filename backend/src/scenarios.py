@@ -0,0 +1,173 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from src.distributor import Distributor
+from src.loader import DataLoader
+from src.pipeline import normalize_quotas
+from src.rules import Rules
+
+"""
+-----------------------------------------------------------
+What-If Scenarios Module (scenarios.py)
+
+تشغيل عدة سيناريوهات توزيع (نسب قبول وخطط سعات مختلفة) على نفس البيانات بالتوازي،
+وإرجاع جدول مقارنة: عدد المقبولين وغير المقبولين لكل قناة، والحد الأدنى للقبول لكل قسم.
+
+مجموعة العمليات (Process Pool) واحدة للخادم كله، تُنشأ عند أول طلب وتُعاد للطلبات التالية.
+عملياتها تبدأ بطريقة forkserver (أو spawn حيث لا تتوفر) وليس fork: الطلب يُنفذ داخل عامل متعدد الخيوط،
+ونسخ عملية قد يحمل أحد خيوطها قفلاً (مثل خيط الكتابة في RunDatabase) قد يعلق العملية الجديدة.
+
+البيانات لا تُشارك فعلياً بين العمليات (لا ذاكرة مشتركة): في كل طلب تُنسخ إلى كل عملية مرة واحدة
+مع دفعة سيناريوهاتها. لتقليل الكلفة تُرسل أعمدة التوزيع فقط (بدون الأسماء والملاحظات)،
+وتُحول إلى bytes (Pickle) مرة واحدة للطلب بدلاً من مرة لكل دفعة.
+لا توجد حالة مشتركة بين الطلبات (طلبان متزامنان لا يتبادلان البيانات).
+-----------------------------------------------------------
+"""
+
+# الأعمدة التي يقرأها الموزع (ما يُرسل إلى عمليات السيناريوهات)
+DISTRIBUTION_COLUMNS = ['id', 'average', 'channel', 'is_faculty_child'] + DataLoader.CHOICE_COLUMNS
+
+# مجموعة العمليات المشتركة (تُنشأ عند أول استخدام بواسطة _get_pool)
+_pool = None
+_pool_lock = threading.Lock()
+
+def _pool_context():
+    """طريقة بدء العمليات: forkserver إن توفرت (Linux / macOS)، وإلا spawn (Windows)."""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+def _get_pool():
+    """مجموعة العمليات المشتركة بعدد المعالجات (تُعاد إنشاؤها إذا تعطلت إحدى عملياتها)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or getattr(_pool, '_broken', False):
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=_pool_context())
+        return _pool
+
+def _run_scenario(index, config, processed_df, channels):
+    """تنفيذ سيناريو واحد على البيانات الممررة."""
+    try:
+        return summarize_scenario(index, config, processed_df, channels)
+    except Exception as e:
+        return {"name": config.get('name', f"scenario_{index + 1}"), "error": str(e)}
+
+def _run_batch(processed_df, items):
+    """تنفيذ دفعة سيناريوهات [(index, config), ...] على نفس البيانات (القنوات الموحدة تُحسب مرة واحدة)."""
+    if isinstance(processed_df, bytes):
+        processed_df = pickle.loads(processed_df)
+    channels = Rules.normalize_channels(processed_df['channel'])
+    return [(index, _run_scenario(index, config, processed_df, channels)) for index, config in items]
+
+def scenario_capacity_input(config):
+    """
+    استخراج مدخلات السعة من إعدادات السيناريو.
+
+    Returns:
+        tuple: (mode, capacity_input)
+    """
+    mode = config.get('mode', 'EQUAL')
+    if mode == 'MANUAL':
+        return mode, config.get('capacities') or {}
+    total_capacity = config.get('total_capacity')
+    return mode, int(total_capacity) if total_capacity is not None else None
+
+def summarize_scenario(index, config, processed_df, channels):
+    """
+    تنفيذ التوزيع لسيناريو واحد وتلخيص نتيجته.
+
+    Returns:
+        dict: {name, config, assigned, unassigned, total, channels, departments}
+        حيث departments: {اسم_القسم: {capacity, assigned, overloads, cutoff}}
+    """
+    name = config.get('name', f"scenario_{index + 1}")
+    mode, capacity_input = scenario_capacity_input(config)
+    quotas = normalize_quotas(config.get('quotas')) or dict(Rules.QUOTAS)
+
+    distributor = Distributor(processed_df, {}, dict(quotas))
+    distributor.calculate_capacities(mode, capacity_input)
+    results = distributor.distribute()
+
+    # ربط النتائج بصفوف البيانات (نفس ترتيب processed_df)
+    assigned = processed_df['id'].map(results)
+    is_assigned = assigned.notna()
+
+    # ملخص القنوات
+    channel_summary = {}
+    for ch_name, group in is_assigned.groupby(channels.to_numpy()):
+        channel_summary[ch_name] = {
+            "assigned": int(group.sum()),
+            "unassigned": int((~group).sum()),
+            "total": int(len(group))
+        }
+
+    # ملخص الأقسام (السعة، المقبولون، التجاوزات، الحد الأدنى للقبول المركزي)
+    # عدادات الموزع تشمل تجاوزات أبناء التدريسيين، فلا حاجة لإعادة العد من النتائج
+    # الحد الأدنى بنفس دقة /runs/<run_id>/students (central_cutoffs)
+    cutoffs = distributor.central_cutoffs()
+    departments = {}
+    for dept in distributor.plan.departments:
+        departments[dept] = {
+            "capacity": distributor.plan.total(dept),
+            "assigned": distributor.dept_usage_total[dept],
+            "overloads": distributor.dept_overloads[dept],
+            "cutoff": cutoffs.get(dept)
+        }
+
+    total = len(processed_df)
+    assigned_count = int(is_assigned.sum())
+    return {
+        "name": name,
+        "config": {"mode": mode, "capacity_input": capacity_input, "quotas": dict(distributor.plan.quotas)},
+        "assigned": assigned_count,
+        "unassigned": total - assigned_count,
+        "total": total,
+        "channels": channel_summary,
+        "departments": departments
+    }
+
+def run_scenarios(processed_df, configs, max_workers=None):
+    """
+    تشغيل مجموعة سيناريوهات على نفس البيانات بالتوازي (Process Pool).
+
+    Args:
+        processed_df (DataFrame): البيانات المعالجة من DataLoader.
+        configs (list): قائمة إعدادات، كل عنصر مثل:
+            {"name": "60/30/10", "mode": "EQUAL", "total_capacity": 300, "quotas": {...}}
+            {"name": "يدوي", "mode": "MANUAL", "capacities": {"علوم الحاسوب": 120, ...}}
+        max_workers (int, optional): عدد العمليات (الافتراضي: عدد المعالجات).
+
+    Returns:
+        list: ملخص كل سيناريو بنفس ترتيب الإدخال (أو {name, error} عند فشله).
+    """
+    if not configs:
+        return []
+
+    items = list(enumerate(configs))
+    workers = min(len(configs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [summary for _, summary in _run_batch(processed_df, items)]
+
+    # أعمدة التوزيع فقط، محولة إلى bytes مرة واحدة لجميع الدفعات
+    columns = [col for col in DISTRIBUTION_COLUMNS if col in processed_df.columns]
+    payload = pickle.dumps(processed_df[columns], protocol=pickle.HIGHEST_PROTOCOL)
+
+    # دفعة لكل عملية بالتناوب (السيناريوهات المتتالية تتوزع على العمليات)
+    try:
+        futures = [_get_pool().submit(_run_batch, payload, items[w::workers]) for w in range(workers)]
+        results = dict(pair for future in futures for pair in future.result())
+    except BrokenProcessPool:
+        # تعطلت إحدى العمليات: التنفيذ داخل العملية الحالية (المجموعة تُعاد إنشاؤها في الطلب التالي)
+        results = dict(_run_batch(processed_df, items))
+    return [results[i] for i in range(len(configs))]
@@ -0,0 +1,96 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+class UploadCache:
+    """
+    ذاكرة مؤقتة للملفات المرفوعة (Parsed Upload Cache)
+
+    تحتفظ بنتيجة DataLoader.load() أي (original_df, processed_df) لكل ملف مرفوع،
+    بمفتاح هو بصمة SHA-256 لمحتوى الملف. الواجهة تستدعي /scan ثم /distribute بنفس الملف،
+    فيُستخدم المفتاح (Token) في الطلب الثاني بدلاً من إعادة قراءة الإكسل.
+
+    السياسة: LRU (الأقدم استخداماً يُحذف أولاً) مع حد أقصى لعدد الملفات ولحجمها في الذاكرة.
+    ملاحظة: الجداول المخزنة مشتركة بين الطلبات، لذا يجب عدم تعديلها في مكانها (In-place).
+    """
+
+    def __init__(self, max_entries=8, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            max_entries (int): أقصى عدد من الملفات المحفوظة.
+            max_bytes (int): أقصى حجم تقريبي (بالبايت) لجميع الجداول المحفوظة.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # {token: (original_df, processed_df, size)}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_token(content):
+        """حساب بصمة المحتوى (SHA-256) لاستخدامها كمفتاح."""
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def make_key(token, sheet=None):
+        """مفتاح الجداول المحللة: البصمة للورقة الأولى، أو البصمة مع اسم الورقة لورقة محددة."""
+        return token if sheet is None else f"{token}:{sheet}"
+
+    @staticmethod
+    def _estimate_size(original_df, processed_df):
+        """تقدير حجم الجدولين في الذاكرة."""
+        return int(original_df.memory_usage(deep=True).sum() + processed_df.memory_usage(deep=True).sum())
+
+    def get(self, token):
+        """
+        استرجاع البيانات المحفوظة.
+
+        Returns:
+            tuple: (original_df, processed_df) أو None إذا لم يكن المفتاح موجوداً.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            self._entries.move_to_end(token)
+            return entry[0], entry[1]
+
+    def put(self, token, original_df, processed_df):
+        """
+        حفظ بيانات ملف محلل، مع حذف الأقدم عند تجاوز الحدود.
+        الملف الذي يتجاوز الحد الأقصى وحده لا يُحفظ.
+        """
+        size = self._estimate_size(original_df, processed_df)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if token in self._entries:
+                self._total_bytes -= self._entries.pop(token)[2]
+            self._entries[token] = (original_df, processed_df, size)
+            self._total_bytes += size
+
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted[2]
+
+    def __contains__(self, token):
+        with self._lock:
+            return token in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,148 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+
+"""
+-----------------------------------------------------------
+Upload Store Module (upload_store.py)
+
+حفظ الملفات المرفوعة على القرص باسم بصمتها (SHA-256)، لتكون مشتركة بين عمليات الخادم (Workers).
+ذاكرة الملفات المحللة (UploadCache) خاصة بكل عملية، فإذا وصل token من /scan أو عملية توزيع
+إلى عامل آخر يُقرأ الملف من هنا ويُحلل مرة أخرى بدلاً من رفض الطلب.
+
+- اسم الملف: <token><الامتداد الأصلي>، والامتداد يحدد الصيغة للملفات النصية (CSV).
+- الكتابة ذرية (ملف مؤقت + إعادة تسمية)، فلا يقرأ عامل آخر ملفاً نصف مكتوب.
+- يُحتفظ بآخر max_files ملف وبحد أقصى max_bytes، والأقدم استخداماً يُحذف أولاً (حسب وقت التعديل،
+  ويُحدّث عند كل استخدام).
+- فشل الحفظ (مثل امتلاء القرص) يُسجل فقط: الطلب الحالي لا يحتاج الملف، وعامل آخر يرد بـ 410.
+-----------------------------------------------------------
+"""
+
+logger = logging.getLogger(__name__)
+
+class UploadStore:
+    """
+    مخزن الملفات المرفوعة على القرص (Disk Upload Store)
+    """
+
+    TOKEN_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+    DEFAULT_EXTENSION = '.csv'
+
+    def __init__(self, directory, max_files=64, max_bytes=2 * 1024 * 1024 * 1024):
+        """
+        Args:
+            directory (str): مجلد الملفات (مشترك بين العمليات).
+            max_files (int): أقصى عدد من الملفات المحفوظة.
+            max_bytes (int): أقصى حجم لجميع الملفات.
+        """
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def is_token(cls, token):
+        """التحقق من أن token بصمة SHA-256 (يمنع استخدامه كمسار خارج المجلد)."""
+        return isinstance(token, str) and cls.TOKEN_PATTERN.match(token) is not None
+
+    def _find(self, token):
+        """مسار ملف البصمة، أو None إذا لم يوجد."""
+        if not self.is_token(token):
+            return None
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return None
+        for name in names:
+            if name.startswith(token) and not name.endswith('.tmp'):
+                return os.path.join(self.directory, name)
+        return None
+
+    def save(self, token, content, filename=None):
+        """
+        حفظ محتوى ملف مرفوع (إذا لم يكن محفوظاً مسبقاً)، ثم حذف الأقدم عند تجاوز الحدود.
+        الملف الذي يتجاوز الحد الأقصى وحده لا يُحفظ.
+        """
+        if not self.is_token(token) or len(content) > self.max_bytes:
+            return
+        existing = self._find(token)
+        if existing is not None:
+            self._touch(existing)
+            return
+
+        ext = os.path.splitext(str(filename))[1].lower() if filename else ''
+        ext = ext if re.match(r'^\.[0-9a-z]{1,8}$', ext) else self.DEFAULT_EXTENSION
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=f'.{token}-', suffix='.tmp', dir=self.directory)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(temp_path, os.path.join(self.directory, token + ext))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self._prune()
+        except OSError:
+            logger.exception("Failed to store upload %s", token)
+
+    def load(self, token):
+        """
+        قراءة ملف محفوظ.
+
+        Returns:
+            tuple: (content, filename) أو None إذا لم يوجد (أو حُذف).
+        """
+        path = self._find(token)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return content, os.path.basename(path)
+
+    def __contains__(self, token):
+        return self._find(token) is not None
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _prune(self):
+        """حذف الملفات الأقدم استخداماً عند تجاوز عدد الملفات أو حجمها."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+            entries.sort(reverse=True)
+
+            total = 0
+            for index, (_, size, name) in enumerate(entries):
+                total += size
+                if index >= self.max_files or total > self.max_bytes:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
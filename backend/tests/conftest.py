@@ -0,0 +1,49 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import os
+import tempfile
+import pytest
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Shared Test Fixtures (conftest.py)
+
+- cohort_bytes: دفعة طلبة مولدة كملف CSV (bytes) بنفس أعمدة ملف الإدخال.
+- client: عميل اختبار Flask بإعدادات وقاعدة بيانات عمليات (SQLite) ومجلد ملفات مرفوعة مؤقتة،
+  مع تفريغ ذاكرة الملفات ومخزن العمليات قبل كل اختبار.
+-----------------------------------------------------------
+"""
+
+# قاعدة بيانات العمليات تُنشأ عند استيراد app، لذا يجب توجيهها لمجلد مؤقت قبل الاستيراد
+os.environ.setdefault('SSDS_RUNS_DB', os.path.join(tempfile.mkdtemp(prefix='ssds-tests-'), 'runs.sqlite3'))
+
+@pytest.fixture
+def cohort_bytes():
+    """دالة تولد دفعة CSV: cohort_bytes(rows, seed=0, **options)."""
+    def make(rows=300, seed=0, **options):
+        options.setdefault('departments', 6)
+        raw = generate_cohort(rows, seed=seed, **options)
+        return raw.to_csv(index=False).encode('utf-8')
+    return make
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app as app_module
+    from src.config_manager import ConfigManager
+    from src.run_store import RunStore
+    from src.upload_store import UploadStore
+
+    monkeypatch.setattr(app_module, 'config_manager', ConfigManager(str(tmp_path / 'config.json')))
+    monkeypatch.setattr(app_module, 'run_store', RunStore())
+    monkeypatch.setattr(app_module, 'upload_store', UploadStore(str(tmp_path / 'uploads')))
+    app_module.upload_cache.clear()
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as test_client:
+        yield test_client
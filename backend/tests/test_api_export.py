@@ -0,0 +1,64 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import pandas as pd
+from src.exporter import Exporter
+
+"""
+-----------------------------------------------------------
+Result Download Endpoint Tests (test_api_export.py)
+
+/distribute تعيد run_id بدون الملف (لا Base64 داخل JSON)،
+والملف يُحمل كملف ثنائي من /runs/<run_id>/export.
+-----------------------------------------------------------
+"""
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def distribute(client, content):
+    return client.post('/distribute', data={
+        'file': (io.BytesIO(content), 'cohort.csv'),
+        'mode': 'EQUAL',
+        'total_capacity': '90'
+    })
+
+def test_distribute_returns_run_id_without_file(client, cohort_bytes):
+    response = distribute(client, cohort_bytes(200))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['run_id']
+    assert 'file' not in body and 'excel' not in body
+
+def test_export_downloads_results_workbook(client, cohort_bytes):
+    body = distribute(client, cohort_bytes(200)).get_json()
+
+    response = client.get(f"/runs/{body['run_id']}/export")
+    assert response.status_code == 200
+    assert response.mimetype == XLSX_MIMETYPE
+    assert 'distribution_result.xlsx' in response.headers['Content-Disposition']
+
+    sheet = pd.read_excel(io.BytesIO(response.data), sheet_name=Exporter.SHEET_NAME)
+    assert len(sheet) == 200
+    assert (sheet[Exporter.RESULT_COLUMN] != Exporter.UNASSIGNED_LABEL).sum() == body['stats']['assigned']
+
+def test_export_is_built_once(client, cohort_bytes, monkeypatch):
+    calls = []
+    export_to_buffer = Exporter.export_to_buffer
+    monkeypatch.setattr(Exporter, 'export_to_buffer', lambda *args, **kwargs: calls.append(1) or export_to_buffer(*args, **kwargs))
+
+    run_id = distribute(client, cohort_bytes(100)).get_json()['run_id']
+    assert not calls # الملف لا يُبنى أثناء /distribute
+    first = client.get(f"/runs/{run_id}/export").data
+    second = client.get(f"/runs/{run_id}/export").data
+    assert first == second and len(calls) == 1
+
+def test_export_unknown_run(client):
+    response = client.get('/runs/unknown/export')
+    assert response.status_code == 404
+    assert response.get_json()['status'] == 'error'
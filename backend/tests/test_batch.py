@@ -0,0 +1,62 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import json
+import pandas as pd
+from batch import process_file, resolve_capacity
+from src.loader import DataLoader
+
+"""
+-----------------------------------------------------------
+Batch Runner Tests (test_batch.py)
+
+سعات ورقة Settings تُطبق بأسماء الأقسام كما هي، حتى الرقمية منها (101)، والصفوف الناقصة تُتجاوز،
+ثم ملف كامل من القراءة حتى ملف النتائج والملخص.
+-----------------------------------------------------------
+"""
+
+SETTINGS = {"quotas": {"مركزي": 1.0}, "manual_mode": False, "manual_capacities": {}, "total_capacity": 0}
+
+def write_workbook(path):
+    students = pd.DataFrame({
+        'ت': [1, 2, 3, 4, 5],
+        'اسم الطالب': ['أ', 'ب', 'ج', 'د', 'ه'],
+        'المعدل': [95.0, 90.0, 85.0, 80.0, 75.0],
+        'قناة القبول': ['مركزي'] * 5,
+        'الاختيار الأول': [101, 101, 101, 102, 102],
+        'الاختيار الثاني': [102, 102, 102, 101, 101],
+        'الاختيار الثالث': [None] * 5,
+        'ملاحظات': [''] * 5,
+    })
+    settings = pd.DataFrame({'Dept_Name': [101, 102, None], 'Capacity': [2, 1, 5]})
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        students.to_excel(writer, sheet_name='Sheet1', index=False)
+        settings.to_excel(writer, sheet_name=DataLoader.SETTINGS_SHEET, index=False)
+
+def test_numeric_settings_departments_keep_their_keys(tmp_path):
+    path = tmp_path / 'college.xlsx'
+    write_workbook(path)
+    loader = DataLoader(str(path))
+    _, processed_df = loader.load()
+
+    mode, capacities, source = resolve_capacity(loader, SETTINGS)
+    assert (mode, source) == ('MANUAL', 'settings_sheet')
+    assert capacities == {101: 2, 102: 1}
+    assert set(capacities) == set(DataLoader.get_departments(processed_df))
+
+def test_process_file_applies_settings_capacities(tmp_path):
+    path = tmp_path / 'college.xlsx'
+    write_workbook(path)
+
+    summary = process_file(str(path), str(tmp_path), 'college', SETTINGS)
+    assert 'error' not in summary
+    assert {dept['name']: dept['capacity'] for dept in summary['capacity_plan']['departments']} == {101: 2, 102: 1}
+    assert summary['stats']['assigned'] == 3
+
+    with open(tmp_path / 'college_summary.json', encoding='utf-8') as f:
+        assert json.load(f)['capacity_input'] == {"101": 2, "102": 1}
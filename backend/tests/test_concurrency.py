@@ -0,0 +1,61 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import random
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from src.loader import DataLoader
+from src.distributor import Distributor
+from src.rules import Rules
+from benchmarks.cohort import generate_cohort
+from benchmarks.concurrency import build_frames, build_scenarios
+
+"""
+-----------------------------------------------------------
+Concurrent Distribution Tests (test_concurrency.py)
+
+نفس سيناريوهات benchmarks/concurrency.py (نسب وسعات مختلفة، وضعان، محركان، إعادة توزيع)
+تُشغل عدة مرات بالتوازي على نفس الجدول المعالج، ويجب أن تطابق كل نتيجة وكل عداد
+نتيجة التشغيل المتسلسل، وأن تبقى Rules.QUOTAS والجدول المشترك كما هما.
+-----------------------------------------------------------
+"""
+
+ROWS = 1_200
+THREADS = 8
+ROUNDS = 4
+
+def run_scenario(frames, scenario):
+    """تشغيل سيناريو بكائن Distributor خاص به، وإرجاع النتيجة وجميع العدادات وخطة المقاعد."""
+    name, frame, mode, input_value, quotas, engine, redistribution = scenario
+    distributor = Distributor(frames[frame], {}, quotas, engine=engine)
+    distributor.calculate_capacities(mode, input_value)
+    results = distributor.distribute()
+    if redistribution is not None:
+        results = {**results, **distributor.redistribute(*redistribution)}
+    return (results, distributor.dept_channel_usage, distributor.dept_usage_total,
+            distributor.dept_min_scores, distributor.dept_overloads, distributor.plan.to_dict())
+
+def test_concurrent_runs_match_serial():
+    raw = generate_cohort(ROWS, departments=8, faculty_rate=0.05, blank_rate=0.1, seed=11)
+    _, processed_df = DataLoader(raw.to_csv(index=False).encode('utf-8'), filename='c.csv').load()
+    frames = build_frames(processed_df)
+    scenarios = build_scenarios(DataLoader.get_departments(processed_df), ROWS)
+    quotas_before = dict(Rules.QUOTAS)
+    snapshot = processed_df.copy(deep=True)
+
+    expected = [run_scenario(frames, scenario) for scenario in scenarios]
+
+    jobs = [i for i in range(len(scenarios)) for _ in range(ROUNDS)]
+    random.Random(0).shuffle(jobs)
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        outcomes = list(pool.map(lambda i: run_scenario(frames, scenarios[i]), jobs))
+
+    for i, outcome in zip(jobs, outcomes):
+        assert outcome == expected[i], scenarios[i][0]
+    assert dict(Rules.QUOTAS) == quotas_before
+    pd.testing.assert_frame_equal(processed_df, snapshot) # الجدول المشترك لم يُعدل
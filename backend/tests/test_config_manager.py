@@ -0,0 +1,104 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import json
+import os
+import pytest
+from src.config_manager import ConfigManager
+
+"""
+-----------------------------------------------------------
+Configuration Manager Tests (test_config_manager.py)
+
+- الدفعة (batch) تُحفظ بكتابة واحدة، والدفعات المتداخلة تُدمج في الخارجية.
+- الخطأ داخل الدفعة أو فشل الكتابة لا يغير النسخة في الذاكرة ولا الملف، والخطأ يصل للمستدعي.
+- التعديل من عملية أخرى (نسخة أخرى على نفس الملف) يظهر عند القراءة التالية.
+-----------------------------------------------------------
+"""
+
+QUOTAS = {'مركزي': 0.8, 'الموازي': 0.1, 'ذوي الشهداء': 0.1}
+
+@pytest.fixture
+def config_path(tmp_path):
+    return str(tmp_path / 'config.json')
+
+def read_file(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def count_replaces(monkeypatch):
+    calls = []
+    replace = os.replace
+    def counting_replace(src, dst):
+        calls.append(dst)
+        replace(src, dst)
+    monkeypatch.setattr(os, 'replace', counting_replace)
+    return calls
+
+def test_nested_batches_write_once(config_path, monkeypatch):
+    manager = ConfigManager(config_path)
+    writes = count_replaces(monkeypatch)
+
+    with manager.batch():
+        manager.set_quotas(QUOTAS)
+        manager.set_total_capacity('120')
+        with manager.batch() as config:
+            config['manual_mode'] = True
+        assert not writes # لا كتابة قبل نهاية الدفعة الخارجية
+
+    assert len(writes) == 1
+    assert read_file(config_path) == manager.get_config()
+    assert manager.get_quotas() == QUOTAS and manager.get_total_capacity() == 120 and manager.get_manual_mode()
+
+def test_error_in_nested_batch_discards_everything(config_path):
+    manager = ConfigManager(config_path)
+    manager.set_total_capacity(50)
+
+    with pytest.raises(ValueError):
+        with manager.batch():
+            manager.set_quotas(QUOTAS)
+            manager.set_total_capacity('not a number')
+
+    assert manager.get_total_capacity() == 50
+    assert manager.get_quotas() != QUOTAS
+    assert read_file(config_path) == manager.get_config()
+
+def test_failed_write_keeps_memory_and_file(config_path, monkeypatch):
+    manager = ConfigManager(config_path)
+    manager.set_total_capacity(50)
+    before = read_file(config_path)
+
+    def fail(src, dst):
+        raise OSError(28, 'No space left on device')
+    monkeypatch.setattr(os, 'replace', fail)
+
+    with pytest.raises(OSError):
+        manager.set_total_capacity(75)
+
+    assert manager.get_total_capacity() == 50
+    assert read_file(config_path) == before
+    assert not [name for name in os.listdir(os.path.dirname(config_path)) if name.endswith('.tmp')] # لا ملفات مؤقتة متبقية
+
+def test_changes_from_another_process_are_reloaded(config_path):
+    first, second = ConfigManager(config_path), ConfigManager(config_path)
+    first.get_config()
+    second.set_quotas(QUOTAS)
+    assert first.get_quotas() == QUOTAS
+
+def test_config_endpoint_reports_failed_write(client, monkeypatch):
+    assert client.post('/config', json={'total_capacity': 40}).status_code == 200
+
+    def fail(src, dst):
+        raise OSError(30, 'Read-only file system')
+    monkeypatch.setattr(os, 'replace', fail)
+
+    response = client.post('/config', json={'total_capacity': 90, 'manual_mode': True})
+    assert response.status_code == 500
+    assert response.get_json()['status'] == 'error'
+    config = client.get('/config').get_json()['data']
+    assert config['total_capacity'] == 40 and 'manual_mode' not in config
@@ -0,0 +1,135 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import random
+import pytest
+from src.loader import DataLoader
+from src.distributor import Distributor
+from src.rules import Rules
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Distributor Engine Equivalence Tests (test_distributor_engines.py)
+
+التحقق من أن المحرك السريع (vectorized) وإعادة التوزيع التزايدية (redistribute)
+يعطيان نفس نتيجة المحرك المرجعي (reference) تماماً، على دفعات مولدة تشمل:
+- معدلات متساوية كثيرة (Ties): المعدلات مقربة إلى عدد صحيح.
+- أقساماً غير مفعلة: غير موجودة في قاموس السعات اليدوي (سعتها صفر).
+- سعات صفرية صريحة، وقنوات بنسبة صفر، وقناة خالية من الطلبة (موازنة الحصص).
+
+التشغيل (من مجلد backend):
+    python -m pytest
+-----------------------------------------------------------
+"""
+
+ROWS = 1_500
+SEEDS = (0, 1, 2)
+
+def load_cohort(seed, rows=ROWS, central_only=False):
+    """دفعة مولدة محملة عبر DataLoader (نفس الأعمدة الفئوية التي يستخدمها الخادم)."""
+    raw = generate_cohort(rows, departments=10, faculty_rate=0.05, blank_rate=0.1, seed=seed)
+    raw['المعدل'] = raw['المعدل'].round(0) # معدلات متساوية كثيرة
+    if central_only:
+        raw['قناة القبول'] = 'مركزي'
+    content = raw.to_csv(index=False).encode('utf-8')
+    _, processed_df = DataLoader(content, filename='cohort.csv').load()
+    return processed_df
+
+def manual_capacities(departments, rng, rows=ROWS):
+    """سعات يدوية: بعض الأقسام غير مفعلة (محذوفة) وبعضها بسعة صفر."""
+    capacities = {}
+    for dept in departments:
+        roll = rng.random()
+        if roll < 0.2:
+            continue # قسم غير مفعل
+        capacities[dept] = 0 if roll < 0.35 else rng.randint(1, rows // 8)
+    return capacities
+
+def random_quotas(rng):
+    central = rng.choice([0.5, 0.7, 1.0])
+    parallel = rng.choice([0.0, round((1 - central) / 2, 4), 1 - central])
+    return {'مركزي': central, 'الموازي': parallel, 'ذوي الشهداء': round(1 - central - parallel, 4)}
+
+def run(processed_df, engine, mode, input_value, quotas):
+    distributor = Distributor(processed_df, {}, quotas, engine=engine)
+    distributor.calculate_capacities(mode, input_value)
+    return distributor.distribute(), distributor
+
+def counters(distributor):
+    return (distributor.dept_channel_usage, distributor.dept_usage_total,
+            distributor.dept_min_scores, distributor.dept_overloads)
+
+def scenarios(departments, seed):
+    rng = random.Random(seed)
+    return [
+        ('EQUAL', ROWS // 3, None),
+        ('EQUAL', ROWS * 2, None),
+        ('EQUAL', ROWS // 2, {'مركزي': 0.7, 'الموازي': 0.0, 'ذوي الشهداء': 0.3}),
+        ('MANUAL', manual_capacities(departments, rng), None),
+        ('MANUAL', manual_capacities(departments, rng), random_quotas(rng)),
+    ]
+
+@pytest.mark.parametrize('central_only', [False, True])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_vectorized_matches_reference(seed, central_only):
+    processed_df = load_cohort(seed, central_only=central_only)
+    for mode, input_value, quotas in scenarios(DataLoader.get_departments(processed_df), seed):
+        expected, reference = run(processed_df, 'reference', mode, input_value, quotas)
+        results, vectorized = run(processed_df, 'vectorized', mode, input_value, quotas)
+
+        assert list(results.items()) == list(expected.items()), (mode, input_value, quotas)
+        assert counters(vectorized) == counters(reference), (mode, input_value, quotas)
+
+@pytest.mark.parametrize('seats_per_student', [0.5, 1.2])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_redistribute_matches_reference(seed, seats_per_student):
+    # 0.5: معظم الأقسام تمتلئ في الدورة الأساسية، 1.2: شواغر كثيرة لدورة الشواغر
+    processed_df = load_cohort(seed)
+    departments = DataLoader.get_departments(processed_df)
+    rng = random.Random(seed)
+
+    quotas = dict(Rules.QUOTAS)
+    capacities = {dept: int(ROWS * seats_per_student) // len(departments) for dept in departments}
+    current, distributor = run(processed_df, 'vectorized', 'MANUAL', capacities, quotas)
+
+    for step in range(12):
+        # تعديل سعة قسم (قد تصبح صفراً)، أو إلغاء تفعيله، أو تغيير النسب
+        dept = rng.choice(departments)
+        if step % 4 == 1:
+            capacities.pop(dept, None)
+        else:
+            capacities[dept] = max(0, capacities.get(dept, 0) + rng.randint(-60, 60))
+        if step % 5 == 3:
+            quotas = random_quotas(rng)
+
+        changes = distributor.redistribute('MANUAL', dict(capacities), dict(quotas))
+        assert all(current[sid] != dept for sid, dept in changes.items())
+        current.update(changes)
+
+        expected, reference = run(processed_df, 'reference', 'MANUAL', dict(capacities), dict(quotas))
+        assert current == expected, (step, capacities, quotas)
+        assert counters(distributor) == counters(reference), (step, capacities, quotas)
+
+def test_quotas_unchanged():
+    quotas_before = dict(Rules.QUOTAS)
+    processed_df = load_cohort(0, rows=300, central_only=True)
+    run(processed_df, 'vectorized', 'EQUAL', 150, None)
+    run(processed_df, 'reference', 'EQUAL', 150, None)
+    assert dict(Rules.QUOTAS) == quotas_before
+
+def test_usage_matrix_matches_counters():
+    processed_df = load_cohort(1, rows=300)
+    distributor = Distributor(processed_df, {}, None)
+    assert distributor.usage is None # قبل distribute
+
+    distributor.calculate_capacities('EQUAL', 150)
+    distributor.distribute()
+    depts = list(distributor.dept_channel_usage)
+    assert distributor.usage.shape[0] == len(depts)
+    assert distributor.usage.sum(axis=1).tolist() == [distributor.dept_usage_total[d] for d in depts]
@@ -0,0 +1,70 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import pytest
+import pandas as pd
+from src.loader import DataLoader
+from src.distributor import Distributor
+from src.exporter import Exporter
+from src.rules import Rules
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Exporter Output Tests (test_exporter.py)
+
+الكتابة المتدفقة (export_streaming) تعطي نفس محتوى الكتابة العادية (export_to_buffer):
+نفس الأعمدة والقيم، عمود النتيجة مع "غير مقبول"، وورقة خطة المقاعد.
+-----------------------------------------------------------
+"""
+
+@pytest.fixture(scope='module')
+def distributed():
+    raw = generate_cohort(250, departments=5, blank_rate=0.1, seed=4)
+    original_df, processed_df = DataLoader(raw.to_csv(index=False).encode('utf-8'), filename='c.csv').load()
+    distributor = Distributor(processed_df, {}, dict(Rules.QUOTAS))
+    distributor.calculate_capacities('EQUAL', 120)
+    results = distributor.distribute()
+    return original_df, results, distributor.plan.to_dict()
+
+def read_sheets(buffer):
+    return pd.read_excel(buffer, sheet_name=None, engine='openpyxl')
+
+def test_streaming_matches_buffered_export(distributed, monkeypatch):
+    original_df, results, plan = distributed
+    monkeypatch.setattr(Exporter, 'STREAM_CHUNK_SIZE', 64) # عدة دفعات
+    streamed = read_sheets(Exporter.export_streaming(original_df, results, plan))
+    buffered = read_sheets(Exporter.export_to_buffer(original_df, results, plan))
+
+    assert list(streamed) == [Exporter.SHEET_NAME, Exporter.PLAN_SHEET_NAME]
+    for name in streamed:
+        pd.testing.assert_frame_equal(streamed[name], buffered[name])
+
+def test_result_column(distributed):
+    original_df, results, plan = distributed
+    sheet = read_sheets(Exporter.export_streaming(original_df, results))[Exporter.SHEET_NAME]
+
+    assert list(sheet.columns) == [str(c) for c in original_df.columns] + [Exporter.RESULT_COLUMN]
+    expected = original_df['ت'].map(results).fillna(Exporter.UNASSIGNED_LABEL)
+    assert sheet[Exporter.RESULT_COLUMN].tolist() == expected.tolist()
+    assert (sheet[Exporter.RESULT_COLUMN] == Exporter.UNASSIGNED_LABEL).sum() == len(original_df) - len([v for v in results.values() if v])
+
+def test_capacity_plan_sheet(distributed):
+    original_df, results, plan = distributed
+    sheet = read_sheets(Exporter.export_streaming(original_df, results, plan))[Exporter.PLAN_SHEET_NAME]
+
+    assert sheet['القسم'].tolist() == [dept['name'] for dept in plan['departments']]
+    assert sheet['السعة الكلية'].tolist() == [dept['capacity'] for dept in plan['departments']]
+
+def test_export_sheets_titles_are_valid_and_unique(distributed):
+    original_df, results, plan = distributed
+    sheets = [('كلية/العلوم', original_df, results, plan), ('كلية:العلوم', original_df, results, None)]
+    workbook = read_sheets(Exporter.export_sheets(sheets))
+
+    assert list(workbook) == ['كلية_العلوم', 'كلية_العلوم (2)', f"{Exporter.PLAN_SHEET_NAME} - كلية_العلوم"]
+    assert len(workbook['كلية_العلوم (2)']) == len(original_df)
@@ -0,0 +1,127 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import threading
+import time
+import pytest
+from src.jobs import Job, JobManager
+
+"""
+-----------------------------------------------------------
+Asynchronous Job Tests (test_jobs.py)
+
+دورة حياة المهمة (queued → running → done / failed)، حد قائمة الانتظار،
+حذف المهام المنتهية الأقدم، ونسبة الإنجاز، ثم /jobs من الطلب حتى تحميل الملف.
+-----------------------------------------------------------
+"""
+
+TIMEOUT = 10
+
+def wait_for(predicate, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for job")
+        time.sleep(0.01)
+
+def blocking_job(started, release, result=('run-1', {'ok': True})):
+    def func(job):
+        started.set()
+        release.wait(TIMEOUT)
+        return result
+    return func
+
+def test_lifecycle_queued_running_done():
+    manager = JobManager(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    first = manager.submit(blocking_job(started, release))
+    second = manager.submit(lambda job: ('run-2', {}))
+
+    assert started.wait(TIMEOUT)
+    assert first.state == 'running'
+    assert second.state == 'queued' # عامل واحد مشغول
+
+    release.set()
+    wait_for(lambda: second.state == 'done')
+    assert first.to_dict() == {
+        "job_id": first.job_id, "state": "done", "stage": None, "percent": 100.0,
+        "run_id": "run-1", "result": {"ok": True}, "error": None
+    }
+    assert manager.get(first.job_id) is first
+
+def test_failed_job_keeps_error(capsys):
+    manager = JobManager()
+    def fail(job):
+        raise ValueError("bad input")
+    job = manager.submit(fail)
+
+    wait_for(lambda: job.state == 'failed')
+    assert job.error == "bad input" and job.run_id is None
+
+def test_queue_full_raises():
+    manager = JobManager(max_workers=1, max_pending=2)
+    started, release = threading.Event(), threading.Event()
+    try:
+        manager.submit(blocking_job(started, release))
+        manager.submit(blocking_job(threading.Event(), release))
+        with pytest.raises(RuntimeError):
+            manager.submit(lambda job: ('run', {}))
+    finally:
+        release.set()
+
+def test_finished_jobs_evicted_oldest_first():
+    manager = JobManager(max_workers=1, max_jobs=2)
+    jobs = [manager.submit(lambda job: ('run', {})) for _ in range(2)]
+    wait_for(lambda: all(job.state == 'done' for job in jobs))
+
+    newest = manager.submit(lambda job: ('run', {}))
+    assert manager.get(jobs[0].job_id) is None
+    assert manager.get(jobs[1].job_id) is jobs[1]
+    assert manager.get(newest.job_id) is newest
+
+def test_running_jobs_are_not_evicted():
+    manager = JobManager(max_workers=2, max_jobs=1)
+    started, release = threading.Event(), threading.Event()
+    try:
+        running = manager.submit(blocking_job(started, release))
+        assert started.wait(TIMEOUT)
+        manager.submit(lambda job: ('run', {}))
+        assert manager.get(running.job_id) is running
+    finally:
+        release.set()
+
+def test_progress_is_weighted_and_monotonic():
+    job = Job()
+    job.report('load', 0.5)
+    assert job.percent == 10.0
+    job.report('main_pass', 0.5)
+    assert job.stage == 'main_pass' and job.percent == 45.0
+    job.report('load', 1.0) # لا تتراجع
+    assert job.percent == 45.0
+
+def test_job_endpoint_runs_distribution(client, cohort_bytes):
+    response = client.post('/jobs', data={
+        'file': (io.BytesIO(cohort_bytes(150)), 'cohort.csv'),
+        'mode': 'EQUAL',
+        'total_capacity': '60'
+    })
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    def finished():
+        return client.get(f"/jobs/{job_id}").get_json()['job']['state'] in ('done', 'failed')
+    wait_for(finished)
+
+    job = client.get(f"/jobs/{job_id}").get_json()['job']
+    assert job['state'] == 'done' and job['percent'] == 100.0
+    assert job['result']['stats']['assigned'] + job['result']['stats']['unassigned'] == 150
+    assert client.get(f"/runs/{job['run_id']}/export").status_code == 200
+
+def test_unknown_job(client):
+    assert client.get('/jobs/unknown').status_code == 404
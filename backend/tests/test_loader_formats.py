@@ -0,0 +1,90 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import pytest
+import pandas as pd
+from src.loader import DataLoader
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Loader Format Tests (test_loader_formats.py)
+
+- نفس الدفعة بصيغ Excel / CSV / Parquet / Arrow تعطي نفس الجدول المعالج.
+- الصيغة تُحدد من البايتات الأولى (Magic Bytes) قبل الامتداد، والملف غير المعروف يُقرأ كـ CSV.
+-----------------------------------------------------------
+"""
+
+COMPARED_COLUMNS = ['id', 'name', 'average', 'channel', 'choice_1', 'choice_2', 'choice_3']
+
+def write_excel(df):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+def write_csv(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+def write_parquet(df):
+    pytest.importorskip('pyarrow')
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+def write_arrow(df):
+    pytest.importorskip('pyarrow')
+    buffer = io.BytesIO()
+    df.to_feather(buffer)
+    return buffer.getvalue()
+
+WRITERS = {
+    'excel': (write_excel, 'cohort.xlsx'),
+    'csv': (write_csv, 'cohort.csv'),
+    'parquet': (write_parquet, 'cohort.parquet'),
+    'arrow': (write_arrow, 'cohort.arrow'),
+}
+
+@pytest.fixture(scope='module')
+def cohort():
+    return generate_cohort(120, departments=5, blank_rate=0.1, seed=3)
+
+def comparable(processed_df):
+    """أعمدة المقارنة كقيم عادية (أنواع الأعمدة تختلف بين الصيغ، والقيم لا)."""
+    frame = processed_df[COMPARED_COLUMNS].astype(object)
+    return frame.where(frame.notna(), None).reset_index(drop=True)
+
+@pytest.mark.parametrize('file_format', list(WRITERS))
+def test_formats_load_identically(cohort, file_format):
+    writer, filename = WRITERS[file_format]
+    loader = DataLoader(writer(cohort), filename=filename)
+    _, processed_df = loader.load()
+    _, expected = DataLoader(write_csv(cohort), filename='cohort.csv').load()
+
+    assert loader.file_format == file_format
+    pd.testing.assert_frame_equal(comparable(processed_df), comparable(expected))
+    assert DataLoader.get_departments(processed_df) == DataLoader.get_departments(expected)
+
+@pytest.mark.parametrize('file_format', ['excel', 'parquet', 'arrow'])
+def test_magic_bytes_override_wrong_extension(cohort, file_format):
+    content = WRITERS[file_format][0](cohort)
+    assert DataLoader(content, filename='students.csv').detect_format() == file_format
+
+@pytest.mark.parametrize('filename, expected', [
+    ('students.xlsx', 'excel'),
+    ('students.PARQUET', 'parquet'),
+    ('students.feather', 'arrow'),
+    ('students.txt', 'csv'),
+    ('students.unknown', 'csv'),
+    (None, 'csv'),
+])
+def test_extension_used_when_content_is_text(filename, expected):
+    assert DataLoader(b'a,b\n1,2\n', filename=filename).detect_format() == expected
+
+def test_settings_only_read_from_excel(cohort):
+    assert DataLoader(write_csv(cohort), filename='cohort.csv').get_settings() is None
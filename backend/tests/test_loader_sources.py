@@ -0,0 +1,71 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import pandas as pd
+from src.loader import DataLoader
+
+"""
+-----------------------------------------------------------
+Loader Source Tests (test_loader_sources.py)
+
+القراءة من الذاكرة مباشرة (bytes، كائن ملف، كائن غير قابل للإرجاع) يجب أن تعطي
+نفس الجداول التي تعطيها القراءة من مسار على القرص، دون ملفات مؤقتة.
+-----------------------------------------------------------
+"""
+
+class NonSeekable(io.RawIOBase):
+    """كائن ملف يُقرأ مرة واحدة فقط (مثل تدفق الطلب)."""
+
+    def __init__(self, content):
+        self._buffer = io.BytesIO(content)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def readinto(self, b):
+        return self._buffer.readinto(b)
+
+@pytest.fixture
+def cohort_file(tmp_path, cohort_bytes):
+    path = tmp_path / 'cohort.csv'
+    path.write_bytes(cohort_bytes(150))
+    return path
+
+def assert_same_load(left, right):
+    pd.testing.assert_frame_equal(left[0], right[0])
+    pd.testing.assert_frame_equal(left[1], right[1])
+
+@pytest.mark.parametrize('wrap', [bytes, bytearray, io.BytesIO, NonSeekable], ids=lambda w: w.__name__)
+def test_in_memory_source_matches_path(cohort_file, wrap):
+    expected = DataLoader(str(cohort_file)).load()
+    actual = DataLoader(wrap(cohort_file.read_bytes()), filename='cohort.csv').load()
+    assert_same_load(actual, expected)
+
+def test_file_object_is_rewound_before_reading(cohort_file):
+    stream = io.BytesIO(cohort_file.read_bytes())
+    stream.read(100) # قراءة سابقة (مثل فحص الحجم) لا تؤثر على التحميل
+    original_df, _ = DataLoader(stream, filename='cohort.csv').load()
+    assert len(original_df) == 150
+
+def test_missing_path_raises():
+    with pytest.raises(FileNotFoundError):
+        DataLoader('/nonexistent/students.xlsx').load()
+
+def test_concurrent_uploads_do_not_share_files(cohort_bytes):
+    # قبل القراءة من الذاكرة كانت الطلبات تكتب إلى نفس الملف المؤقت
+    uploads = {rows: cohort_bytes(rows, seed=rows) for rows in (40, 60, 80, 100)}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        loaded = dict(zip(uploads, pool.map(lambda content: DataLoader(content, filename='c.csv').load(), uploads.values())))
+    for rows, (original_df, _) in loaded.items():
+        assert len(original_df) == rows
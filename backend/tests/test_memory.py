@@ -0,0 +1,69 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import pandas as pd
+import pytest
+from src.memory import MemoryWindow, frame_memory_bytes, memory_report
+
+"""
+-----------------------------------------------------------
+Memory Report Tests (test_memory.py)
+
+الطلبات المتداخلة في نفس العملية لا تُنسب لها زيادة الذاكرة (scope = process)،
+والنسبة growth_to_input مقسومة على حجم البيانات في الذاكرة.
+-----------------------------------------------------------
+"""
+
+def test_single_window_reports_request_growth():
+    with MemoryWindow() as window:
+        pass
+    report = window.report(input_bytes=10, input_memory_bytes=100)
+
+    assert window.exclusive
+    if report['peak_rss_bytes'] is not None:
+        assert report['scope'] == 'request'
+        assert report['peak_growth_bytes'] >= 0
+
+def test_overlapping_windows_report_process_peak_only():
+    outer = MemoryWindow()
+    with outer:
+        with MemoryWindow() as inner:
+            pass
+    for window in (outer, inner):
+        report = window.report(input_bytes=10, input_memory_bytes=100)
+        assert not window.exclusive
+        assert report['scope'] == 'process'
+        assert report['peak_growth_bytes'] is None and report['growth_to_input'] is None
+
+def test_window_after_overlap_is_exclusive_again():
+    with pytest.raises(ValueError):
+        with MemoryWindow():
+            raise ValueError # الخطأ يغلق النافذة أيضاً
+    with MemoryWindow() as window:
+        pass
+    assert window.exclusive and MemoryWindow._active == 0
+
+def test_growth_divided_by_memory_size():
+    report = memory_report(baseline=1_000, input_bytes=50, input_memory_bytes=400, peak=1_800)
+    assert report['peak_growth_bytes'] == 800
+    assert report['growth_to_input'] == 2.0
+
+def test_frame_memory_bytes_is_deep():
+    df = pd.DataFrame({'name': ['طالب ' * 20] * 100})
+    assert frame_memory_bytes(df) == int(df.memory_usage(deep=True).sum())
+    assert frame_memory_bytes(df, df) == 2 * frame_memory_bytes(df)
+
+def test_distribute_reports_input_memory(client, cohort_bytes):
+    content = cohort_bytes(200)
+    response = client.post('/distribute', data={'file': (io.BytesIO(content), 'c.csv'), 'total_capacity': '80'})
+    memory = response.get_json()['memory']
+
+    assert memory['input_bytes'] == len(content)
+    assert memory['input_memory_bytes'] > 0
+    assert memory['scope'] in ('request', 'process')
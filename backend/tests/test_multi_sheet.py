@@ -0,0 +1,102 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import pandas as pd
+import pytest
+import app as app_module
+from src.exporter import Exporter
+from src.loader import DataLoader
+from src.multi_sheet import distribute_sheets
+from src.pipeline import normalize_quotas
+from src.rules import Rules
+from src.run_store import RunStore
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Multi-Sheet Workbook Tests (test_multi_sheet.py)
+
+ملف إكسل بورقة طلبة لكل كلية: اكتشاف الأوراق من الترويسة، تحميل ورقة محددة أو أول ورقة طلبة.
+في الواجهة البرمجية: توزيع كل ورقة بطلب /distribute مع sheet بنفس نتيجة distribute_sheets
+(batch.py --sheets)، ثم ملف واحد لجميع الأوراق من /runs/export.
+-----------------------------------------------------------
+"""
+
+SHEETS = {'كلية العلوم': (180, 1), 'كلية الهندسة': (120, 2)}
+CAPACITY = 60
+
+@pytest.fixture(scope='module')
+def workbook():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
+        pd.DataFrame({'ملاحظة': ['ورقة تعليمات']}).to_excel(writer, sheet_name='تعليمات', index=False)
+        for name, (rows, seed) in SHEETS.items():
+            generate_cohort(rows, departments=4, seed=seed).to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+def test_student_sheets_and_sheet_selection(workbook):
+    assert DataLoader(workbook, filename='u.xlsx').student_sheets() == list(SHEETS)
+    assert DataLoader(b'id\n1\n', filename='c.csv').student_sheets() == []
+
+    frames = DataLoader(workbook, filename='u.xlsx').load_sheets()
+    original_df, _ = DataLoader(workbook, filename='u.xlsx', sheet='كلية الهندسة').load()
+    pd.testing.assert_frame_equal(original_df, frames['كلية الهندسة'][0])
+    # بدون sheet: أول ورقة طلبة (الورقة الأولى هنا ورقة تعليمات)
+    original_df, _ = DataLoader(workbook, filename='u.xlsx').load()
+    pd.testing.assert_frame_equal(original_df, frames['كلية العلوم'][0])
+
+def test_distribute_each_sheet_matches_batch(client, workbook):
+    scan = client.post('/scan', data={'file': (io.BytesIO(workbook), 'u.xlsx')}).get_json()
+    assert scan['sheets'] == list(SHEETS)
+
+    run_ids = []
+    for name in scan['sheets']:
+        response = client.post('/distribute', data={
+            'token': scan['token'], 'sheet': name, 'mode': 'EQUAL', 'total_capacity': str(CAPACITY)
+        })
+        assert response.status_code == 200
+        run_ids.append(response.get_json()['run_id'])
+
+    frames = DataLoader(workbook, filename='u.xlsx').load_sheets()
+    outcomes = distribute_sheets({name: processed_df for name, (_, processed_df) in frames.items()},
+                                 {name: ('EQUAL', CAPACITY) for name in frames},
+                                 normalize_quotas(dict(Rules.QUOTAS)), max_workers=1)
+    for run_id, outcome in zip(run_ids, outcomes):
+        run = app_module.run_store.get(run_id)
+        assert run.stats['total'] == SHEETS[outcome['name']][0]
+        assert run.results == outcome['results']
+
+    response = client.get('/runs/export', query_string=[('run_id', run_id) for run_id in run_ids])
+    assert response.status_code == 200
+    sheets = pd.read_excel(io.BytesIO(response.data), sheet_name=None)
+    assert list(sheets)[:2] == list(SHEETS)
+    assert [len(sheets[name]) for name in SHEETS] == [rows for rows, _ in SHEETS.values()]
+    assert f"{Exporter.PLAN_SHEET_NAME} - كلية العلوم" in sheets
+
+def test_sheet_run_is_rebuilt_in_another_worker(client, workbook, monkeypatch):
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(workbook), 'u.xlsx'), 'sheet': 'كلية الهندسة', 'mode': 'EQUAL', 'total_capacity': '40'
+    })
+    run_id = response.get_json()['run_id']
+    expected = app_module.run_store.get(run_id).results
+
+    monkeypatch.setattr(app_module, 'run_store', RunStore())
+    app_module.upload_cache.clear()
+    assert app_module.get_run(run_id).results == expected
+
+def test_export_requires_known_runs(client):
+    assert client.get('/runs/export').status_code == 400
+    assert client.get('/runs/export', query_string={'run_id': 'unknown'}).status_code == 404
+
+def test_unknown_sheet_fails(client, workbook):
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(workbook), 'u.xlsx'), 'sheet': 'غير موجودة', 'mode': 'EQUAL', 'total_capacity': '40'
+    })
+    assert response.status_code == 500
+    assert response.get_json()['status'] == 'error'
@@ -0,0 +1,100 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import pandas as pd
+from src.loader import DataLoader
+from src.name_index import NameIndex, normalize_name, normalize_names
+
+"""
+-----------------------------------------------------------
+Name Search Tests (test_name_index.py)
+
+توحيد الكتابة العربية (الهمزات، ة/ه، ى/ي، التشكيل والتطويل، المسافات)، بنفس النتيجة للاسم الواحد
+وللعمود، وترتيب النتائج: مطابق تماماً، ثم بداية الاسم، ثم بدايات الكلمات، ثم أجزاؤها.
+ثم /runs/<run_id>/search وتصفية /runs/<run_id>/results بالاسم.
+-----------------------------------------------------------
+"""
+
+NAMES = [
+    'أُسامة علي',       # 0
+    'إسراء  محمد',      # 1 (مسافتان)
+    'علي محمد عباس',    # 2
+    'مُصْطَفى كريم',     # 3 (تشكيل)
+    'اسامه',            # 4
+    'عبد الله مرتضى',   # 5
+    None,               # 6
+    'أسامة',            # 7 (نفس 4 بعد التوحيد)
+    'محـــمد جاسم',     # 8 (تطويل)
+]
+
+def test_normalization_rules():
+    assert normalize_name('أُسامة') == 'اسامه'
+    assert normalize_name('إسراء  محمد') == 'اسراء محمد'
+    assert normalize_name('آمنة') == 'امنه'
+    assert normalize_name('مُصْطَفى') == 'مصطفي'
+    assert normalize_name('محـــمد') == 'محمد'
+    assert normalize_name(' Ali\tHASAN ') == 'ali hasan'
+    assert normalize_name(None) == '' and normalize_name(float('nan')) == ''
+
+def test_vectorized_normalization_matches_single_name():
+    names = NAMES + ['\tعلي\n  حسن ', 'ٱلاء']
+    assert normalize_names(names).tolist() == [normalize_name(name) for name in names]
+
+def test_rank_orders_by_match_kind():
+    index = NameIndex(NAMES)
+    positions, scores = index.rank('اسامة')
+    labels = [NameIndex.MATCH_LABELS[score] for score in scores]
+
+    # المطابق تماماً (4 و 7 بترتيب الملف)، ثم الاسم الذي يبدأ بالنص
+    assert positions.tolist()[:3] == [4, 7, 0]
+    assert labels[:3] == ['exact', 'exact', 'prefix']
+
+    positions, scores = index.rank('محمد ع')
+    assert positions.tolist() == [2]
+    assert NameIndex.MATCH_LABELS[scores[0]] == 'word_prefix'
+
+    positions, scores = index.rank('حمد')
+    assert set(positions.tolist()) == {1, 2, 8}
+    assert all(NameIndex.MATCH_LABELS[score] == 'contains' for score in scores)
+
+def test_mask_and_empty_query():
+    index = NameIndex(NAMES)
+    assert index.mask('مصطفى').tolist() == [i == 3 for i in range(len(NAMES))]
+    assert index.mask('  ') is None
+    assert index.rank('') == (None, None)
+    assert len(index.rank('غير موجود')[0]) == 0
+
+def test_search_endpoints(client):
+    rows = len(NAMES)
+    frame = pd.DataFrame({
+        'ت': range(1, rows + 1),
+        'اسم الطالب': NAMES,
+        'المعدل': [90 - i for i in range(rows)],
+        'قناة القبول': ['مركزي'] * rows,
+        'الاختيار الأول': ['قسم أ'] * rows,
+        'الاختيار الثاني': ['قسم ب'] * rows,
+        'الاختيار الثالث': [None] * rows,
+        'ملاحظات': [''] * rows,
+    })
+    assert list(frame.columns) == list(DataLoader.COLUMN_MAP)
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(frame.to_csv(index=False).encode('utf-8')), 'names.csv'),
+        'mode': 'EQUAL', 'total_capacity': '20'
+    })
+    run_id = response.get_json()['run_id']
+
+    matches = client.get(f"/runs/{run_id}/search", query_string={'q': 'اسامة'}).get_json()['matches']
+    assert [m['id'] for m in matches] == [5, 8, 1]
+    assert [m['match'] for m in matches] == ['exact', 'exact', 'prefix']
+
+    page = client.get(f"/runs/{run_id}/results", query_string={'name': 'مصطفي', 'size': 50}).get_json()
+    assert page['total'] == 1 and page['data'][0]['ت'] == 4
+
+    stored = client.get(f"/runs/{run_id}/students", query_string={'q': 'اسامة'}).get_json()['matches']
+    assert [m['id'] for m in stored] == ['5', '8', '1']
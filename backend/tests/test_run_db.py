@@ -0,0 +1,125 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import pytest
+import app as app_module
+from src.loader import DataLoader
+from src.pipeline import normalize_quotas, run_distribution
+from src.rules import Rules
+from src.run_db import RunDatabase
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Run Database Tests (test_run_db.py)
+
+حفظ عملية كاملة وقراءة قبول كل طالب (القسم، ترتيب الرغبة، الحد الأدنى)، رفض الحفظ بمعرف موجود
+دون المساس بالعملية المحفوظة، حذف العمليات الأقدم، وفشل الكتابة (في نفس العامل وفي عامل آخر)،
+ثم /runs/<run_id>/students.
+-----------------------------------------------------------
+"""
+
+@pytest.fixture(scope='module')
+def loaded():
+    raw = generate_cohort(150, departments=4, seed=3)
+    return DataLoader(raw.to_csv(index=False).encode('utf-8'), filename='c.csv').load()
+
+def make_run(loaded, capacity=60):
+    original_df, processed_df = loaded
+    return run_distribution(original_df, processed_df, 'EQUAL', capacity, normalize_quotas(dict(Rules.QUOTAS)))
+
+def test_saved_students_match_the_run(tmp_path, loaded):
+    database = RunDatabase(str(tmp_path / 'runs.sqlite3'))
+    run = make_run(loaded)
+    database.save(run).result()
+
+    cutoffs = run.distributor.central_cutoffs()
+    choices = run.processed_df.set_index('id')[DataLoader.CHOICE_COLUMNS].astype(object)
+    for student_id in run.processed_df['id'].tolist()[:40]:
+        student = database.get_student(run.run_id, student_id)
+        dept = run.results.get(student_id)
+        assert student['dept'] == dept
+        if dept is None:
+            assert student['choice_rank'] is None and student['cutoff'] is None
+        else:
+            assert choices.loc[student_id].tolist()[student['choice_rank'] - 1] == dept
+            assert student['cutoff'] == cutoffs.get(dept)
+    assert database.get_student(run.run_id, 'missing') is None
+    assert database.write_error(run.run_id) is None
+
+def test_duplicate_run_id_is_refused(tmp_path, loaded):
+    database = RunDatabase(str(tmp_path / 'runs.sqlite3'))
+    run = make_run(loaded, capacity=60)
+    database.save(run).result()
+    student_id = run.processed_df['id'].iloc[0]
+    saved = database.get_student(run.run_id, student_id)
+
+    other = make_run(loaded, capacity=10)
+    other.run_id = run.run_id
+    assert database.save(other) is None
+    assert database.get_student(run.run_id, student_id) == saved
+    assert database.write_error(run.run_id) is None
+
+def test_oldest_runs_are_pruned(tmp_path, loaded):
+    database = RunDatabase(str(tmp_path / 'runs.sqlite3'), max_runs=2)
+    runs = [make_run(loaded) for _ in range(3)]
+    for created_at, run in enumerate(runs, start=1):
+        run.created_at = float(created_at)
+        database.save(run).result()
+
+    assert not database.has_run(runs[0].run_id)
+    assert database.get_student(runs[0].run_id, runs[0].processed_df['id'].iloc[0]) is None
+    assert database.has_run(runs[1].run_id) and database.has_run(runs[2].run_id)
+
+def test_write_error_is_reported_to_every_worker(tmp_path, loaded, monkeypatch):
+    path = str(tmp_path / 'runs.sqlite3')
+    database = RunDatabase(path)
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(database, '_write_run', fail)
+
+    run = make_run(loaded)
+    future = database.save(run)
+    with pytest.raises(OSError):
+        future.result()
+
+    assert database.write_error(run.run_id) == "disk full"
+    assert RunDatabase(path).write_error(run.run_id) == "disk full"
+
+def test_students_endpoints(client, cohort_bytes):
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(cohort_bytes(120)), 'cohort.csv'), 'mode': 'EQUAL', 'total_capacity': '50'
+    })
+    run_id = response.get_json()['run_id']
+    run = app_module.run_store.get(run_id)
+    student_id = run.processed_df['id'].iloc[0]
+    name = run.processed_df['name'].iloc[0]
+
+    student = client.get(f"/runs/{run_id}/students/{student_id}").get_json()['student']
+    assert student['id'] == str(student_id) and student['dept'] == run.results.get(student_id)
+
+    matches = client.get(f"/runs/{run_id}/students", query_string={'q': name}).get_json()['matches']
+    assert matches[0]['name'] == name and matches[0]['match'] == 'exact'
+
+    missing = client.get(f"/runs/{run_id}/students/missing")
+    assert missing.status_code == 404 and missing.get_json()['message'] == "Student not found"
+    assert client.get("/runs/unknown/students/1").get_json()['message'] == "Run not found"
+    assert client.get("/runs/unknown/students", query_string={'q': name}).status_code == 404
+
+def test_students_endpoint_reports_failed_save(client, cohort_bytes, monkeypatch):
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(app_module.run_db, '_write_run', fail)
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(cohort_bytes(60)), 'cohort.csv'), 'mode': 'EQUAL', 'total_capacity': '30'
+    })
+    run_id = response.get_json()['run_id']
+
+    failed = client.get(f"/runs/{run_id}/students/1")
+    assert failed.status_code == 500 and "disk full" in failed.get_json()['message']
@@ -0,0 +1,120 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import json
+import pandas as pd
+from src.run_diff import RunDiff
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+Run Diff Tests (test_run_diff.py)
+
+أنواع التغيير وحركة كل قسم وتغير حده الأدنى، الطلبة الموجودون في عملية واحدة فقط،
+الأرقام المكررة في الملف، والإرسال على دفعات تُبنى كل منها من شريحتها فقط (JSON / CSV)،
+ثم /runs/<run_id>/diff/<other_run_id>.
+-----------------------------------------------------------
+"""
+
+BEFORE = {1: 'قسم أ', 2: 'قسم أ', 3: None, 4: 'قسم ب', 5: 101}
+AFTER = {1: 'قسم أ', 2: 'قسم ب', 3: 'قسم ب', 4: None, 5: 101}
+STUDENTS = pd.DataFrame({'id': [1, 2, 3, 4, 5], 'name': ['أ', 'ب', 'ج', 'د', 'ه'],
+                         'average': [90.123, 85.0, 80.0, 75.0, 70.0]})
+
+def test_change_types_and_departments():
+    diff = RunDiff(BEFORE, AFTER, {'قسم أ': 85.0, 'قسم ب': 75.0}, {'قسم أ': 90.0, 'قسم ب': 80.0}, students=STUDENTS)
+    summary = diff.summary()
+    assert (summary['total'], summary['changed']) == (5, 3)
+    assert (summary['gained'], summary['lost'], summary['switched']) == (1, 1, 1)
+
+    departments = {dept['dept']: dept for dept in summary['departments']}
+    assert list(departments) == sorted(['101', 'قسم أ', 'قسم ب'])
+    assert departments['قسم ب'] == {
+        "dept": 'قسم ب', "before": 1, "after": 2, "inflow": 2, "outflow": 1, "net": 1,
+        "cutoff_before": 75.0, "cutoff_after": 80.0, "cutoff_shift": 5.0
+    }
+    assert departments['101']['net'] == 0 and departments['101']['cutoff_shift'] is None
+
+    changes = diff.changes()
+    assert changes['id'].tolist() == [2, 3, 4]
+    assert changes['change'].tolist() == ['switched', 'gained', 'lost']
+    assert changes['before'].isna().tolist() == [False, True, False] # غير مقبول
+    assert changes['before'].dropna().tolist() == ['قسم أ', 'قسم ب']
+    assert changes['name'].tolist() == ['ب', 'ج', 'د']
+
+def test_students_in_one_run_only():
+    diff = RunDiff({1: 'قسم أ', 2: 'قسم أ'}, {2: 'قسم أ', 3: 'قسم ب'})
+    changes = diff.changes()
+    assert diff.total == 3
+    assert dict(zip(changes['id'], changes['change'])) == {1: 'lost', 3: 'gained'}
+
+def test_duplicate_student_ids_use_first_row():
+    students = pd.DataFrame({'id': [1, 2, 2, 3], 'name': ['أ', 'ب', 'مكرر', 'ج'], 'average': [90.0, 80.0, 70.0, 60.0]})
+    changes = RunDiff({1: 'قسم أ', 2: None, 3: None}, {1: 'قسم أ', 2: 'قسم أ', 3: None}, students=students).changes()
+    assert changes[['id', 'name', 'average']].values.tolist() == [[2, 'ب', 80.0]]
+
+def test_chunks_are_built_per_slice(monkeypatch):
+    before = {i: 'قسم أ' for i in range(10)}
+    after = {i: ('قسم ب' if i % 2 else 'قسم أ') for i in range(10)}
+    diff = RunDiff(before, after)
+    full = diff.changes()
+
+    slices = []
+    changes = RunDiff.changes
+    def recorded(self, start=0, stop=None):
+        slices.append((start, stop))
+        return changes(self, start, stop)
+    monkeypatch.setattr(RunDiff, 'changes', recorded)
+
+    body = json.loads(''.join(diff.iter_json(chunk_size=2)))
+    assert slices == [(0, 2), (2, 4), (4, 6)]
+    assert [change['id'] for change in body['changes']] == full['id'].tolist()
+    assert body['summary'] == diff.summary()
+
+    lines = ''.join(diff.iter_csv(chunk_size=2)).lstrip('\ufeff').splitlines()
+    assert lines[0] == ','.join(RunDiff.COLUMNS)
+    assert [int(line.split(',')[0]) for line in lines[1:]] == full['id'].tolist()
+
+def test_empty_diff_streams_valid_json():
+    diff = RunDiff({1: 'قسم أ'}, {1: 'قسم أ'})
+    assert json.loads(''.join(diff.iter_json()))['changes'] == []
+
+def distribute(client, content, capacity):
+    return client.post('/distribute', data={
+        'file': (io.BytesIO(content), 'cohort.csv'), 'mode': 'EQUAL', 'total_capacity': str(capacity)
+    }).get_json()['run_id']
+
+def test_diff_endpoint(client, cohort_bytes):
+    content = cohort_bytes(150)
+    before, after = distribute(client, content, 60), distribute(client, content, 90)
+
+    body = json.loads(client.get(f"/runs/{before}/diff/{after}").get_data(as_text=True))
+    assert body['summary']['total'] == 150
+    assert body['summary']['changed'] == len(body['changes']) > 0
+
+    csv = client.get(f"/runs/{before}/diff/{after}", query_string={'format': 'csv'})
+    assert csv.mimetype == 'text/csv'
+    assert len(csv.get_data(as_text=True).strip().splitlines()) == len(body['changes']) + 1
+
+    assert client.get(f"/runs/{before}/diff/unknown").status_code == 404
+    assert client.get(f"/runs/{before}/diff/{after}", query_string={'format': 'xml'}).status_code == 400
+
+def test_duplicate_ids_in_uploaded_file(client):
+    raw = generate_cohort(80, departments=4, seed=6)
+    raw.loc[5, 'ت'] = raw.loc[4, 'ت']
+    content = raw.to_csv(index=False).encode('utf-8')
+    before, after = distribute(client, content, 30), distribute(client, content, 60)
+
+    response = client.get(f"/runs/{before}/diff/{after}")
+    assert json.loads(response.get_data(as_text=True))['status'] == 'success'
+
+    redistributed = client.post(f"/runs/{before}/redistribute", data={'mode': 'EQUAL', 'total_capacity': '50'})
+    assert redistributed.status_code == 200
+    student = client.get(f"/runs/{before}/students/{raw.loc[4, 'ت']}").get_json()['student']
+    assert student['name'] == raw.loc[4, 'اسم الطالب']
@@ -0,0 +1,74 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import json
+import os
+import pytest
+from src import scenarios
+from src.distributor import Distributor
+from src.loader import DataLoader
+from src.rules import Rules
+from src.scenarios import run_scenarios
+from benchmarks.cohort import generate_cohort
+
+"""
+-----------------------------------------------------------
+What-If Scenario Tests (test_scenarios.py)
+
+السيناريوهات المنفذة على مجموعة العمليات تعطي نفس الملخص الذي يعطيه التنفيذ داخل العملية الحالية،
+ومجموعة العمليات لا تُبدأ بطريقة fork (الخادم متعدد الخيوط).
+الحد الأدنى للأقسام بنفس دقة الموزع، و /scenarios تُسجل في /metrics.
+-----------------------------------------------------------
+"""
+
+CONFIGS = [
+    {"name": "equal", "mode": "EQUAL", "total_capacity": 120},
+    {"name": "central", "mode": "EQUAL", "total_capacity": 120, "quotas": {"مركزي": 1.0, "الموازي": 0.0, "ذوي الشهداء": 0.0}},
+    {"name": "bad", "mode": "EQUAL", "total_capacity": "many"},
+]
+
+@pytest.fixture(scope='module')
+def processed_df():
+    raw = generate_cohort(400, departments=6, faculty_rate=0.05, seed=5)
+    _, processed_df = DataLoader(raw.to_csv(index=False).encode('utf-8'), filename='c.csv').load()
+    return processed_df
+
+def test_pool_does_not_fork():
+    assert scenarios._pool_context().get_start_method() != 'fork'
+    assert scenarios._get_pool().submit(os.getpid).result() != os.getpid()
+
+def test_process_pool_matches_serial(processed_df):
+    serial = run_scenarios(processed_df, CONFIGS, max_workers=1)
+    parallel = run_scenarios(processed_df, CONFIGS, max_workers=2)
+
+    assert parallel == serial
+    assert [s['name'] for s in serial] == ['equal', 'central', 'bad']
+    assert 'error' in serial[2]
+
+def test_cutoffs_use_distributor_precision(processed_df):
+    summary = run_scenarios(processed_df, CONFIGS[:1], max_workers=1)[0]
+    distributor = Distributor(processed_df, {}, dict(Rules.QUOTAS))
+    distributor.calculate_capacities('EQUAL', 120)
+    distributor.distribute()
+
+    cutoffs = {dept: info['cutoff'] for dept, info in summary['departments'].items() if info['cutoff'] is not None}
+    assert cutoffs == distributor.central_cutoffs()
+
+def test_scenarios_endpoint_records_metrics(client, cohort_bytes):
+    response = client.post('/scenarios', data={
+        'file': (io.BytesIO(cohort_bytes(150)), 'cohort.csv'),
+        'scenarios': json.dumps(CONFIGS[:2])
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [s['name'] for s in body['scenarios']] == ['equal', 'central']
+    assert {'load', 'scenarios'} <= set(body['timings'])
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'ssds_requests_total{endpoint="scenarios",status="success"}' in metrics
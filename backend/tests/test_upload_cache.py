@@ -0,0 +1,89 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import hashlib
+import io
+import pandas as pd
+from src.upload_cache import UploadCache
+
+"""
+-----------------------------------------------------------
+Upload Cache Tests (test_upload_cache.py)
+
+سياسة الحذف في ذاكرة الملفات المحللة (LRU بحد لعدد الملفات ولحجمها)،
+وإعادة استخدام البصمة (token) بين /scan و /distribute.
+-----------------------------------------------------------
+"""
+
+def frames(rows=10):
+    df = pd.DataFrame({'id': range(rows), 'average': [90.0] * rows})
+    return df, df.copy()
+
+def entry_size(rows=10):
+    return UploadCache._estimate_size(*frames(rows))
+
+def test_token_is_content_sha256():
+    content = b'student,average\n'
+    assert UploadCache.make_token(content) == hashlib.sha256(content).hexdigest()
+
+def test_evicts_least_recently_used_entry():
+    cache = UploadCache(max_entries=2)
+    cache.put('a', *frames())
+    cache.put('b', *frames())
+    assert cache.get('a') is not None # 'a' أصبح الأحدث استخداماً
+    cache.put('c', *frames())
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert len(cache) == 2
+
+def test_evicts_to_stay_under_byte_limit():
+    cache = UploadCache(max_entries=10, max_bytes=entry_size() * 2)
+    for token in ('a', 'b', 'c'):
+        cache.put(token, *frames())
+
+    assert 'a' not in cache
+    assert 'b' in cache and 'c' in cache
+    assert cache._total_bytes <= cache.max_bytes
+
+def test_oversized_entry_is_not_stored():
+    cache = UploadCache(max_bytes=entry_size() * 2)
+    cache.put('small', *frames())
+    cache.put('large', *frames(rows=1_000))
+
+    assert 'large' not in cache
+    assert 'small' in cache # لا يُحذف شيء بسبب ملف لا يُحفظ أصلاً
+
+def test_put_same_token_replaces_entry():
+    cache = UploadCache()
+    cache.put('a', *frames())
+    cache.put('a', *frames(rows=20))
+
+    assert len(cache) == 1
+    assert cache._total_bytes == entry_size(rows=20)
+    assert len(cache.get('a')[1]) == 20
+
+def test_clear():
+    cache = UploadCache()
+    cache.put('a', *frames())
+    cache.clear()
+    assert len(cache) == 0 and cache.get('a') is None
+
+def test_scan_token_reused_by_distribute(client, cohort_bytes):
+    scan = client.post('/scan', data={'file': (io.BytesIO(cohort_bytes(200)), 'cohort.csv')})
+    assert scan.status_code == 200
+    token = scan.get_json()['token']
+
+    response = client.post('/distribute', data={'token': token, 'mode': 'EQUAL', 'total_capacity': '100'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['stats']['assigned'] + body['stats']['unassigned'] == 200
+
+def test_expired_token_returns_410(client):
+    response = client.post('/distribute', data={'token': 'missing', 'mode': 'EQUAL', 'total_capacity': '10'})
+    assert response.status_code == 410
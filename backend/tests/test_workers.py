@@ -0,0 +1,161 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import io
+import os
+import sqlite3
+import threading
+import pandas as pd
+import pytest
+import app as app_module
+from src.exporter import Exporter
+from src.jobs import JobManager
+from src.run_db import RunDatabase
+from src.run_store import RunStore
+from src.upload_cache import UploadCache
+from src.upload_store import UploadStore
+
+"""
+-----------------------------------------------------------
+Multi-Worker State Tests (test_workers.py)
+
+عامل آخر (Worker) يُحاكى بمخزن عمليات جديد وذاكرة ملفات فارغة، مع نفس قاعدة البيانات ومجلد الملفات:
+token من /scan و run_id من /distribute يعملان فيه، وإعادة التوزيع في عامل تظهر في الآخر،
+والحفظ بنسخة قديمة يُرفض. حالة المهام مقروءة من أي عامل، ومخزن الملفات وترحيل جدول runs.
+-----------------------------------------------------------
+"""
+
+def other_worker(monkeypatch):
+    """تبديل الحالة الخاصة بالعملية (ذاكرة الملفات ومخزن العمليات) كأن الطلب التالي وصل لعامل آخر."""
+    store = RunStore()
+    monkeypatch.setattr(app_module, 'run_store', store)
+    app_module.upload_cache.clear()
+    return store
+
+def distribute(client, content, capacity='90'):
+    response = client.post('/distribute', data={
+        'file': (io.BytesIO(content), 'cohort.csv'),
+        'mode': 'EQUAL',
+        'total_capacity': capacity
+    })
+    assert response.status_code == 200
+    return response.get_json()
+
+def results(client, run_id):
+    response = client.get(f"/runs/{run_id}/results", query_string={'size': 500, 'sort': 'id'})
+    assert response.status_code == 200
+    return [(row['ت'], row[Exporter.RESULT_COLUMN]) for row in response.get_json()['data']]
+
+def test_scan_token_works_in_another_worker(client, cohort_bytes, monkeypatch):
+    token = client.post('/scan', data={'file': (io.BytesIO(cohort_bytes(120)), 'cohort.csv')}).get_json()['token']
+    other_worker(monkeypatch)
+
+    response = client.post('/distribute', data={'token': token, 'mode': 'EQUAL', 'total_capacity': '60'})
+    assert response.status_code == 200
+    stats = response.get_json()['stats']
+    assert stats['assigned'] + stats['unassigned'] == 120
+
+def test_unknown_token_is_expired(client):
+    response = client.post('/distribute', data={'token': '0' * 64, 'mode': 'EQUAL', 'total_capacity': '60'})
+    assert response.status_code == 410
+
+def test_run_is_rebuilt_in_another_worker(client, cohort_bytes, monkeypatch):
+    body = distribute(client, cohort_bytes(200))
+    expected = results(client, body['run_id'])
+    export = pd.read_excel(io.BytesIO(client.get(f"/runs/{body['run_id']}/export").data), sheet_name=None)
+
+    store = other_worker(monkeypatch)
+    assert results(client, body['run_id']) == expected
+    assert store.get(body['run_id']) is not None
+    # محتوى الأوراق (بيانات الملف تتضمن وقت إنشائه)
+    rebuilt = pd.read_excel(io.BytesIO(client.get(f"/runs/{body['run_id']}/export").data), sheet_name=None)
+    assert list(rebuilt) == list(export)
+    for name in export:
+        pd.testing.assert_frame_equal(rebuilt[name], export[name])
+    assert client.get(f"/runs/{body['run_id']}/search", query_string={'q': 'طالب'}).status_code == 200
+
+def test_redistribute_is_visible_to_other_workers(client, cohort_bytes, monkeypatch):
+    run_id = distribute(client, cohort_bytes(200), capacity='90')['run_id']
+    before = results(client, run_id)
+    first_store = app_module.run_store
+
+    other_worker(monkeypatch)
+    response = client.post(f"/runs/{run_id}/redistribute", data={'mode': 'EQUAL', 'total_capacity': '150'})
+    assert response.status_code == 200
+    after = results(client, run_id)
+    assert after != before
+
+    # العامل الأول يحمل النسخة القديمة في ذاكرته، فيعيد بناءها بالإعدادات الجديدة
+    monkeypatch.setattr(app_module, 'run_store', first_store)
+    assert results(client, run_id) == after
+
+    fresh = distribute(client, cohort_bytes(200), capacity='150')['run_id']
+    assert results(client, fresh) == after
+
+def test_stale_version_is_rejected(client, cohort_bytes):
+    run_id = distribute(client, cohort_bytes(100))['run_id']
+    run = app_module.get_run(run_id)
+    source = dict(run.source, capacity_input=80)
+
+    version = app_module.run_db.update(run, {}, source)
+    assert version == run.version + 1
+    with pytest.raises(RuntimeError):
+        app_module.run_db.update(run, {}, source) # run.version لم يتغير (نسخة قديمة)
+
+    response = client.post(f"/runs/{run_id}/redistribute", data={'mode': 'EQUAL', 'total_capacity': '80'})
+    assert response.status_code == 200 # get_run أعاد بناءها بالنسخة المحفوظة
+
+def test_job_status_is_shared(tmp_path):
+    database = RunDatabase(str(tmp_path / 'runs.sqlite3'))
+    release = threading.Event()
+    worker = JobManager(store=database)
+    def func(job):
+        release.wait(10)
+        return 'run-1', {'ok': True}
+    job = worker.submit(func)
+
+    other = JobManager(store=database)
+    assert other.get(job.job_id) is None
+    assert other.get_status(job.job_id)['state'] in ('queued', 'running')
+
+    release.set()
+    worker._executor.shutdown(wait=True)
+    assert other.get_status(job.job_id) == job.to_dict()
+    assert other.get_status('unknown') is None
+
+def test_upload_store_tokens_and_pruning(tmp_path):
+    store = UploadStore(str(tmp_path), max_files=2)
+    contents = [f'id\n{i}\n'.encode() for i in range(3)]
+    tokens = [UploadCache.make_token(content) for content in contents]
+
+    store.save('../escape', b'x', 'a.csv')
+    assert os.listdir(tmp_path) == []
+    assert store.load('../escape') is None
+
+    store.save(tokens[0], contents[0], 'a.XLSX')
+    assert store.load(tokens[0]) == (contents[0], tokens[0] + '.xlsx')
+    for token, content in zip(tokens[1:], contents[1:]):
+        os.utime(os.path.join(tmp_path, tokens[0] + '.xlsx'), (1, 1)) # الأقدم استخداماً
+        store.save(token, content, 'b.csv')
+
+    assert tokens[0] not in store
+    assert tokens[1] in store and tokens[2] in store
+
+def test_old_runs_table_is_migrated(tmp_path):
+    path = str(tmp_path / 'runs.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE runs (run_id TEXT PRIMARY KEY, created_at REAL NOT NULL, student_count INTEGER NOT NULL, '
+                 'stats TEXT, capacity_plan TEXT)')
+    conn.execute("INSERT INTO runs VALUES ('old', 1.0, 0, '{}', '{}')")
+    conn.commit()
+    conn.close()
+
+    database = RunDatabase(path)
+    assert database.run_source('old') == (None, 0, 1.0)
+    database.wait('old', timeout=1) # complete = 1 للعمليات القديمة
+    assert database.write_error('old') is None
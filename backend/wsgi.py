@@ -0,0 +1,58 @@
+"""
+-----------------------------------------------------------
+Smart Student Distribution System (S.S.D.S)
+Copyright (C) 2026 Ali Abbas & Ali Alaa. All Rights Reserved.
+Proprietary and confidential.
+-----------------------------------------------------------
+"""
+
+import gc
+import io
+import os
+import pandas as pd
+from app import create_app
+from src.loader import DataLoader
+from src.pipeline import normalize_quotas, run_distribution
+from src.rules import Rules
+
+"""
+-----------------------------------------------------------
+WSGI Entry Point (wsgi.py)
+
+نقطة الدخول لوضع الإنتاج (gunicorn، راجع gunicorn.conf.py لعدد العمليات):
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+مع preload_app في gunicorn.conf.py تُستورد هذه الوحدة مرة واحدة في العملية الرئيسية (Master)
+قبل التفرع (Fork)، فيحصل كل عامل (Worker) على المكتبات الثقيلة (pandas, numpy, xlsxwriter,
+محرك قراءة الإكسل) جاهزة ومشتركة في الذاكرة بدلاً من استيرادها من جديد.
+
+warm_up: دورة صغيرة كاملة (كتابة إكسل، قراءته، توزيع، تصدير) في العملية الرئيسية،
+لتحميل المكتبات والوحدات التي لا تُستورد إلا عند أول استخدام. ثم gc.freeze() لنقل الكائنات
+المحملة خارج جامع القمامة، فلا يلمسها في العمال ولا تُنسخ صفحاتها (Copy-on-Write).
+التعطيل: SSDS_WARM_UP=0.
+-----------------------------------------------------------
+"""
+
+def warm_up():
+    """تشغيل توزيع صغير كامل (قراءة + توزيع + تصدير) دون المرور بذاكرة الملفات أو مخزن العمليات."""
+    columns = list(DataLoader.COLUMN_MAP)
+    sample = pd.DataFrame([
+        [1, 'طالب 1', 90.5, 'مركزي', 'قسم أ', 'قسم ب', 'قسم ج', ''],
+        [2, 'طالب 2', 85.0, 'الموازي', 'قسم ب', 'قسم أ', None, ''],
+        [3, 'طالب 3', 80.0, 'ذوي الشهداء', 'قسم ج', 'قسم أ', 'قسم ب', 'أبناء الأساتذة']
+    ], columns=columns)
+
+    buffer = io.BytesIO()
+    sample.to_excel(buffer, index=False, engine='xlsxwriter')
+    original_df, processed_df = DataLoader(buffer.getvalue(), filename='warm_up.xlsx').load()
+    run_distribution(original_df, processed_df, 'EQUAL', 2, normalize_quotas(dict(Rules.QUOTAS)), build_export=True)
+
+if os.environ.get('SSDS_WARM_UP', '1').strip().lower() not in ('0', 'false', 'no', 'off'):
+    warm_up()
+
+app = create_app()
+
+# الكائنات المحملة حتى الآن تبقى طوال عمر العملية، فلا داعي لفحصها في كل دورة لجامع القمامة
+if hasattr(gc, 'freeze'):
+    gc.collect()
+    gc.freeze()
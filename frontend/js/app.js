@@ -13,6 +13,8 @@ const state = {
         shuhada: 10
     },
     studentFile: null,
+    uploadToken: null, // بصمة الملف من /scan لتجنب إعادة رفعه عند التوزيع
+    resultsQuery: null, // حالة جدول النتائج (الصفحة، الترتيب، التصفية)
     departments: [] // [{name: 'Dept', capacity: 100, is_active: true}]
 };
 
@@ -156,7 +158,7 @@ function updateValidationUI() {
     if (total === 100) {
         msgEl.textContent = `المجموع: ${total}%`;
         msgEl.style.color = 'var(--success-color)';
-        if (elements.startDistributionBtn.textContent !== 'جاري التوزيع...') {
+        if (elements.startDistributionBtn.textContent.includes('جاري التوزيع...') === false) {
             elements.startDistributionBtn.disabled = false;
         }
     } else {
@@ -182,6 +184,8 @@ function initFileUpload() {
         if (!file) return;
 
         state.studentFile = file;
+        state.uploadToken = null;
+        state.resultsQuery = null; // نتائج الملف السابق لا تصلح لإعادة التوزيع التزايدية
         elements.fileInfo.textContent = `جاري الفحص: ${file.name}...`;
         elements.startDistributionBtn.textContent = 'بدء عملية التوزيع';
         elements.resultsSection.style.display = 'none'; // Hide results of old file
@@ -189,6 +193,7 @@ function initFileUpload() {
         try {
             const scanResult = await uploadFileForScan(file);
             if (scanResult.status === 'success') {
+                state.uploadToken = scanResult.token || null;
                 elements.fileInfo.textContent = `${file.name} (تم الفحص: ${scanResult.student_count} طالب)`;
                 elements.fileSelect.innerHTML = `<option value="${file.name}" selected>${file.name}</option>`;
 
@@ -237,7 +242,213 @@ function collectFormData() {
     };
 }
 
+// ============ Results Table (Server-side Pagination) ============
+function buildResultsControls(departments) {
+    const controls = document.createElement('div');
+    controls.className = 'results-controls';
+    controls.style.display = 'flex';
+    controls.style.flexWrap = 'wrap';
+    controls.style.gap = '0.75rem';
+    controls.style.marginTop = '1rem';
+
+    const deptOptions = departments.map(d => `<option value="${d}">${d}</option>`).join('');
+    controls.innerHTML = `
+        <input type="search" id="results-name" placeholder="بحث بالاسم" list="results-name-suggestions" autocomplete="off">
+        <datalist id="results-name-suggestions"></datalist>
+        <select id="results-sort">
+            <option value="-average">المعدل (تنازلي)</option>
+            <option value="average">المعدل (تصاعدي)</option>
+            <option value="name">الاسم</option>
+            <option value="id">التسلسل</option>
+            <option value="dept">القسم المقبول</option>
+            <option value="relevance">الأقرب لنص البحث</option>
+        </select>
+        <select id="results-dept">
+            <option value="">كل الأقسام</option>
+            ${deptOptions}
+        </select>
+        <select id="results-channel">
+            <option value="">كل القنوات</option>
+            <option value="مركزي">مركزي</option>
+            <option value="الموازي">الموازي</option>
+            <option value="ذوي الشهداء">ذوي الشهداء</option>
+        </select>
+        <select id="results-status">
+            <option value="">الكل</option>
+            <option value="assigned">المقبولون</option>
+            <option value="unassigned">غير المقبولين</option>
+        </select>
+    `;
+
+    const bind = (id, key) => {
+        controls.querySelector(`#${id}`).addEventListener('change', (e) => {
+            state.resultsQuery[key] = e.target.value;
+            state.resultsQuery.page = 1;
+            loadResultsPage();
+        });
+    };
+    bind('results-sort', 'sort');
+    bind('results-dept', 'dept');
+    bind('results-channel', 'channel');
+    bind('results-status', 'status');
+
+    // البحث بالاسم: يصفي الجدول (مع توحيد الكتابة العربية في الخادم) ويقترح أقرب الأسماء
+    const nameInput = controls.querySelector('#results-name');
+    let searchTimer = null;
+    nameInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => {
+            const q = state.resultsQuery;
+            const name = nameInput.value.trim();
+            q.name = name;
+            q.page = 1;
+            // عند بدء البحث مع الترتيب الافتراضي، تُعرض النتائج الأقرب أولاً
+            if (name && q.sort === '-average') {
+                q.sort = 'relevance';
+                controls.querySelector('#results-sort').value = 'relevance';
+            }
+            loadResultsPage();
+            loadNameSuggestions(name, controls.querySelector('#results-name-suggestions'));
+        }, 250);
+    });
+    return controls;
+}
+
+async function loadNameSuggestions(name, datalist) {
+    const q = state.resultsQuery;
+    datalist.innerHTML = '';
+    if (!q || !name) return;
+
+    try {
+        const params = new URLSearchParams({ q: name, limit: 8 });
+        const res = await fetch(`${API_BASE_URL}/runs/${q.runId}/search?${params}`);
+        const result = await res.json();
+        if (result.status !== 'success') return;
+
+        const seen = new Set();
+        result.matches.forEach(match => {
+            if (seen.has(match.name)) return;
+            seen.add(match.name);
+            const option = document.createElement('option');
+            option.value = match.name;
+            datalist.appendChild(option);
+        });
+    } catch (e) {
+        console.error('Failed to load name suggestions:', e);
+    }
+}
+
+async function loadResultsPage() {
+    const q = state.resultsQuery;
+    if (!q) return;
+
+    const params = new URLSearchParams({ page: q.page, size: q.size, sort: q.sort });
+    if (q.dept) params.append('dept', q.dept);
+    if (q.channel) params.append('channel', q.channel);
+    if (q.status) params.append('status', q.status);
+    if (q.name) params.append('name', q.name);
+
+    const container = document.getElementById('results-table-container');
+    const pager = document.getElementById('results-pager');
+
+    try {
+        const res = await fetch(`${API_BASE_URL}/runs/${q.runId}/results?${params}`);
+        const page = await res.json();
+        if (page.status !== 'success') {
+            container.innerHTML = `<p class="validation-error">خطأ: ${page.message}</p>`;
+            return;
+        }
+
+        let tableHtml = `
+            <div style="margin-bottom: 1rem; color: var(--text-muted); font-size: 0.9em;">
+                ملاحظة: يتم إشغال المقاعد حسب النسب المحددة، وفي حال بقاء شواغر في أي قناة (مثل الموازي) يتم ملؤها تلقائياً بالأعلى معدلاً من القنوات الأخرى لضمان عدم ضياع أي مقعد.
+            </div>
+            <table class="results-table">
+                <thead>
+                    <tr>
+                        <th>ت</th>
+                        <th>الاسم</th>
+                        <th>المعدل</th>
+                        <th>فئة القبول</th>
+                        <th>القسم المقبول</th>
+                    </tr>
+                </thead>
+                <tbody>
+        `;
+
+        page.data.forEach(student => {
+            const isUnassigned = student['القسم المقبول'] === 'غير مقبول';
+            // Try to find the name from common column headers
+            const studentName = student['الاسم الرباعي'] || student['اسم الطالب'] || student['الاسم'] || student['Name'] || '';
+            const channel = student['قناة القبول'] || student['channel'] || '-';
+
+            tableHtml += `
+                <tr class="${isUnassigned ? 'unassigned-row' : ''}" style="${isUnassigned ? 'background-color: #fee2e2;' : ''}">
+                    <td>${student['ت'] || ''}</td>
+                    <td>${studentName}</td>
+                    <td>${student['المعدل'] || ''}</td>
+                    <td>${channel}</td>
+                    <td style="${isUnassigned ? 'color: var(--danger-color); font-weight: bold;' : 'font-weight: bold;'}">${student['القسم المقبول']}</td>
+                </tr>
+            `;
+        });
+
+        tableHtml += `</tbody></table>`;
+        container.innerHTML = tableHtml;
+
+        // أزرار التنقل بين الصفحات
+        pager.innerHTML = `
+            <button type="button" class="btn" id="results-prev" ${page.page <= 1 ? 'disabled' : ''}>السابق</button>
+            <span style="margin: 0 1rem;">صفحة ${page.pages ? page.page : 0} من ${page.pages} (${page.total} طالب)</span>
+            <button type="button" class="btn" id="results-next" ${page.page >= page.pages ? 'disabled' : ''}>التالي</button>
+        `;
+        pager.querySelector('#results-prev').addEventListener('click', () => {
+            q.page -= 1;
+            loadResultsPage();
+        });
+        pager.querySelector('#results-next').addEventListener('click', () => {
+            q.page += 1;
+            loadResultsPage();
+        });
+    } catch (e) {
+        console.error('Failed to load results page:', e);
+        container.innerHTML = '<p class="validation-error">فشل تحميل النتائج</p>';
+    }
+}
+
 // ============ Distribution Logic ============
+const JOB_STAGE_LABELS = {
+    load: 'قراءة الملف',
+    capacities: 'حساب السعات',
+    main_pass: 'التوزيع الأساسي',
+    vacancy_pass: 'ملء الشواغر',
+    exception_pass: 'الاستثناءات',
+    export: 'تجهيز ملف النتائج'
+};
+
+// متابعة مهمة التوزيع حتى انتهائها، مع عرض المرحلة ونسبة الإنجاز على الزر
+async function waitForJob(jobId) {
+    while (true) {
+        const res = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+        const body = await res.json();
+        if (body.status !== 'success') {
+            return { status: 'error', message: body.message };
+        }
+
+        const job = body.job;
+        if (job.state === 'done') {
+            return { status: 'success', run_id: job.run_id, ...job.result };
+        }
+        if (job.state === 'failed') {
+            return { status: 'error', message: job.error };
+        }
+
+        const stageLabel = JOB_STAGE_LABELS[job.stage] || 'في الانتظار';
+        elements.startDistributionBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> جاري التوزيع... ${stageLabel} (${Math.round(job.percent)}%)`;
+        await new Promise(resolve => setTimeout(resolve, 500));
+    }
+}
+
 async function startDistribution() {
     elements.acceptanceError.textContent = '';
     const data = collectFormData();
@@ -265,7 +476,12 @@ async function startDistribution() {
     elements.resultsSection.style.display = 'none';
 
     const formData = new FormData();
-    formData.append('file', state.studentFile);
+    // إرسال بصمة الملف إن وجدت، وإلا نرفع الملف نفسه
+    if (state.uploadToken) {
+        formData.append('token', state.uploadToken);
+    } else {
+        formData.append('file', state.studentFile);
+    }
     formData.append('mode', data.manualSeats ? 'MANUAL' : 'EQUAL');
     formData.append('total_capacity', data.totalSeats);
 
@@ -286,111 +502,102 @@ async function startDistribution() {
 
     // Send to Backend
     try {
-        const response = await fetch(`${API_BASE_URL}/distribute`, {
-            method: 'POST',
-            body: formData
-        });
+        // نفس الملف سبق توزيعه: إعادة توزيع تزايدية على نفس العملية (تعيد الطلبة المتغيرين فقط)
+        let result = null;
+        if (state.resultsQuery && state.resultsQuery.runId) {
+            const response = await fetch(`${API_BASE_URL}/runs/${state.resultsQuery.runId}/redistribute`, {
+                method: 'POST',
+                body: formData
+            });
+            // 404: العملية حُذفت من الخادم، فنرجع للتوزيع الكامل
+            if (response.status !== 404) {
+                result = await response.json();
+            }
+        }
+
+        // توزيع كامل (مهمة غير متزامنة + متابعة التقدم)
+        if (!result) {
+            let response = await fetch(`${API_BASE_URL}/jobs`, {
+                method: 'POST',
+                body: formData
+            });
 
-        if (response.ok) {
-            const result = await response.json();
-
-            if (result.status === 'success') {
-                elements.resultsSection.style.display = 'block';
-                elements.startDistributionBtn.textContent = 'إعادة التوزيع';
-
-                // 1. Show Success Message & Stats
-                elements.resultsContent.innerHTML = `
-                    <div class="success-message">
-                        <h3>✅ تم التوزيع بنجاح!</h3>
-                        <p>تم توزيع ${result.stats.assigned} طالب من أصل ${result.stats.total}</p>
-                        <p>طلاب غير مقبولين: ${result.stats.unassigned}</p>
-                    </div>
-                `;
-
-                // 2. Build Results Table
-                const tableContainer = document.createElement('div');
-                tableContainer.className = 'results-table-container';
-                tableContainer.style.marginTop = '20px';
-                tableContainer.style.overflowX = 'auto';
-
-                // Sort data by Average (descending) for better visibility
-                result.data.sort((a, b) => (b['المعدل'] || 0) - (a['المعدل'] || 0));
-
-                let tableHtml = `
-                    <div style="margin-bottom: 1rem; color: var(--text-muted); font-size: 0.9em;">
-                        ملاحظة: النتائج مرتبة حسب المعدل. يتم إشغال المقاعد حسب النسب المحددة، وفي حال بقاء شواغر في أي قناة (مثل الموازي) يتم ملؤها تلقائياً بالأعلى معدلاً من القنوات الأخرى لضمان عدم ضياع أي مقعد.
-                    </div>
-                    <table class="results-table">
-                        <thead>
-                            <tr>
-                                <th>ت</th>
-                                <th>الاسم</th>
-                                <th>المعدل</th>
-                                <th>فئة القبول</th>
-                                <th>القسم المقبول</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                `;
-
-                result.data.forEach(student => {
-                    const isUnassigned = student['القسم المقبول'] === 'غير مقبول';
-                    const trStyle = isUnassigned ? 'background-color: #ffebee;' : '';
-
-                    // Try to find the name from common column headers
-                    const studentName = student['الاسم الرباعي'] || student['اسم الطالب'] || student['الاسم'] || student['Name'] || '';
-                    const channel = student['قناة القبول'] || student['channel'] || '-';
-
-                    tableHtml += `
-                        <tr class="${isUnassigned ? 'unassigned-row' : ''}" style="${isUnassigned ? 'background-color: #fee2e2;' : ''}">
-                            <td>${student['ت'] || ''}</td>
-                            <td>${studentName}</td>
-                            <td>${student['المعدل'] || ''}</td>
-                            <td>${channel}</td>
-                            <td style="${isUnassigned ? 'color: var(--danger-color); font-weight: bold;' : 'font-weight: bold;'}">${student['القسم المقبول']}</td>
-                        </tr>
-                    `;
+            // انتهت صلاحية البصمة في الخادم: نعيد المحاولة برفع الملف
+            if (response.status === 410) {
+                state.uploadToken = null;
+                formData.delete('token');
+                formData.append('file', state.studentFile);
+                response = await fetch(`${API_BASE_URL}/jobs`, {
+                    method: 'POST',
+                    body: formData
                 });
+            }
 
-                tableHtml += `</tbody></table>`;
-                tableContainer.innerHTML = tableHtml;
-                elements.resultsContent.appendChild(tableContainer);
-
-                // 3. Setup Export Button
-                if (elements.exportExcelBtn) {
-                    elements.exportExcelBtn.style.display = 'inline-block';
-                    elements.exportExcelBtn.onclick = () => {
-                        if (result.file_b64) {
-                            // Decode Base64 to Blob
-                            const binaryString = window.atob(result.file_b64);
-                            const len = binaryString.length;
-                            const bytes = new Uint8Array(len);
-                            for (let i = 0; i < len; i++) {
-                                bytes[i] = binaryString.charCodeAt(i);
-                            }
-                            const blob = new Blob([bytes], { type: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' });
-
-                            // Download
-                            const url = window.URL.createObjectURL(blob);
-                            const a = document.createElement('a');
-                            a.href = url;
-                            a.download = result.file_name || 'distribution_result.xlsx';
-                            document.body.appendChild(a);
-                            a.click();
-                            a.remove();
-                            window.URL.revokeObjectURL(url);
-                        } else {
-                            alert('لا يوجد ملف جاهز للتصدير');
-                        }
-                    };
-                }
+            const submitted = await response.json();
+            result = response.ok ? await waitForJob(submitted.job_id) : submitted;
+        }
 
-            } else {
-                alert(`خطأ: ${result.message}`);
+        if (result.status === 'success') {
+            elements.resultsSection.style.display = 'block';
+            elements.startDistributionBtn.textContent = 'إعادة التوزيع';
+
+            // 1. Show Success Message & Stats
+            elements.resultsContent.innerHTML = `
+                <div class="success-message">
+                    <h3>✅ تم التوزيع بنجاح!</h3>
+                    <p>تم توزيع ${result.stats.assigned} طالب من أصل ${result.stats.total}</p>
+                    <p>طلاب غير مقبولين: ${result.stats.unassigned}</p>
+                </div>
+            `;
+
+            // 2. Build Results Table (صفحات من الخادم)
+            state.resultsQuery = {
+                runId: result.run_id,
+                page: 1,
+                size: 50,
+                sort: '-average',
+                dept: '',
+                channel: '',
+                status: '',
+                name: ''
+            };
+            const departments = (result.capacity_plan && result.capacity_plan.departments || []).map(d => d.name);
+            elements.resultsContent.appendChild(buildResultsControls(departments));
+
+            const tableContainer = document.createElement('div');
+            tableContainer.className = 'results-table-container';
+            tableContainer.id = 'results-table-container';
+            tableContainer.style.marginTop = '20px';
+            tableContainer.style.overflowX = 'auto';
+            elements.resultsContent.appendChild(tableContainer);
+
+            const pager = document.createElement('div');
+            pager.id = 'results-pager';
+            pager.className = 'results-pager';
+            elements.resultsContent.appendChild(pager);
+
+            await loadResultsPage();
+
+            // 3. Setup Export Button
+            if (elements.exportExcelBtn) {
+                elements.exportExcelBtn.style.display = 'inline-block';
+                elements.exportExcelBtn.onclick = () => {
+                    if (result.run_id) {
+                        // الملف يُحمل مباشرة من الخادم (يُبنى عند أول طلب)
+                        const a = document.createElement('a');
+                        a.href = `${API_BASE_URL}/runs/${result.run_id}/export`;
+                        a.download = 'distribution_result.xlsx';
+                        document.body.appendChild(a);
+                        a.click();
+                        a.remove();
+                    } else {
+                        alert('لا يوجد ملف جاهز للتصدير');
+                    }
+                };
             }
+
         } else {
-            const err = await response.json();
-            alert(`خطأ: ${err.message}`);
+            alert(`خطأ: ${result.message}`);
         }
     } catch (e) {
         console.error(e);
@@ -399,7 +606,7 @@ async function startDistribution() {
     } finally {
         elements.startDistributionBtn.disabled = false;
         // Keep 'Redistribute' text on success, reset only on error (handled above)
-        if (elements.startDistributionBtn.textContent === 'جاري التوزيع...') {
+        if (elements.startDistributionBtn.textContent.includes('جاري التوزيع...')) {
             elements.startDistributionBtn.textContent = 'بدء عملية التوزيع';
         }
     }